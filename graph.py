@@ -3,6 +3,7 @@
 
 from langgraph.graph import StateGraph, END
 from state import ConversionState
+from tools import profiling
 from nodes import (
     planner_node,
     discovery_node,
@@ -11,25 +12,35 @@ from nodes import (
     integration_node,
 )
 
-def build_graph():
+NODE_ORDER = ["planner", "discovery", "converter", "builder", "integration"]
+
+
+def build_graph(start_at: str = "planner"):
     """
     Build and compile the Rails → Django conversion pipeline using LangGraph.
     Execution flow:
         planner → discovery → converter → builder → integration → END
+
+    `start_at` lets a run resume from a restored snapshot at a later stage.
+    PROFILE_CPU / PROFILE_MEMORY wrap the nodes with tools.profiling.
     """
+    if start_at not in NODE_ORDER:
+        raise ValueError(f"Unknown start node {start_at!r}; expected one of {NODE_ORDER}")
 
     # Initialize LangGraph with the ConversionState model as schema
     graph = StateGraph(ConversionState)
 
-    # Register pipeline nodes (each node must expose a .run(state) method)
-    graph.add_node("planner", planner_node.run)
-    graph.add_node("discovery", discovery_node.run)
-    graph.add_node("converter", converter_node.run)
-    graph.add_node("builder", builder_node.run)
-    graph.add_node("integration", integration_node.run)
+    # Register pipeline nodes (each node must expose a .run(state) method);
+    # profiling wrappers are only installed when enabled
+    profile_opts = profiling.settings()
+    graph.add_node("planner", profiling.maybe_wrap("planner", planner_node.run, profile_opts))
+    graph.add_node("discovery", profiling.maybe_wrap("discovery", discovery_node.run, profile_opts))
+    graph.add_node("converter", profiling.maybe_wrap("converter", converter_node.run, profile_opts))
+    graph.add_node("builder", profiling.maybe_wrap("builder", builder_node.run, profile_opts))
+    graph.add_node("integration", profiling.maybe_wrap("integration", integration_node.run, profile_opts))
 
     # Define the execution order of the pipeline
-    graph.set_entry_point("planner")
+    graph.set_entry_point(start_at)
     graph.add_edge("planner", "discovery")
     graph.add_edge("discovery", "converter")
     graph.add_edge("converter", "builder")
@@ -1,12 +1,30 @@
 import os
+import time
 from graph import build_graph
 from state import ConversionState
-from tools import file_tools
+from tools import log_utils, snapshot, estimator
+import watch
 from rich.console import Console
 from rich.table import Table
 
 console = Console()
 
+
+def run_graph(graph, state):
+    """Run the compiled graph, printing each stage as it finishes; returns the final state."""
+    console.print("🧠 Executing graph...")
+    # Stream node updates so progress shows as each stage finishes
+    started = time.perf_counter()
+    final_state = None
+    for mode, chunk in graph.stream(state, stream_mode=["updates", "values"]):
+        if mode == "values":
+            final_state = chunk
+            continue
+        for node in chunk:
+            console.print(f"[dim]⏱️ {node} finished at t+{time.perf_counter() - started:.1f}s[/dim]")
+    return final_state
+
+
 def main():
     console.print("\n====================================")
     console.print("🚀 Starting Rails → Django conversion")
@@ -18,12 +36,30 @@ def main():
     console.print(f"Input directory:  {input_dir}")
     console.print(f"Output directory: {output_dir}\n")
 
-    state = ConversionState(input_dir=input_dir, output_dir=output_dir)
-    graph = build_graph()
+    # DRY_RUN=1: predict calls, tokens, cost and wall time without calling the LLM
+    if os.getenv("DRY_RUN") == "1":
+        concurrency = int(os.getenv("ESTIMATE_CONCURRENCY", "1"))
+        estimator.run_dry(input_dir, output_dir, concurrency=concurrency)
+        return
+
+    # Structured, append-only event log (LLM calls, node states) written off-thread
+    event_log = log_utils.open_event_log(os.path.join(output_dir, "logs"))
+    console.print(f"Event log:        {event_log.path}\n")
+
+    # Optional resume: RESUME_SNAPSHOT=<final_state snapshot> RESUME_FROM=<node>
+    resume_path = os.getenv("RESUME_SNAPSHOT")
+    if resume_path:
+        start_at = os.getenv("RESUME_FROM", "converter")
+        console.print(f"♻️ Resuming from {resume_path} at '{start_at}'")
+        state = snapshot.load_state(resume_path)
+        state.output_dir = output_dir
+        graph = build_graph(start_at=start_at)
+    else:
+        state = ConversionState(input_dir=input_dir, output_dir=output_dir)
+        graph = build_graph()
 
     try:
-        console.print("🧠 Executing graph...")
-        final_state = graph.invoke(state)
+        final_state = run_graph(graph, state)
     except Exception as e:
         console.print(f"❌ Graph execution failed: {e}")
         return
@@ -56,11 +92,22 @@ def main():
     logs_dir = os.path.join(output_dir, "logs")
     os.makedirs(logs_dir, exist_ok=True)
 
-    final_state_path = os.path.join(logs_dir, "final_state.json")
-    file_tools.write_json(final_state_path, final_state_dict, makedirs=True)
+    final_state_path = snapshot.save_snapshot(os.path.join(logs_dir, "final_state"), final_state_dict)
 
     console.print(f"📝 Final state written to: {final_state_path}\n")
 
+    # WATCH=1: stay up with the compiled graph and final state warm, reconverting only what changes
+    if os.getenv("WATCH") == "1":
+        full_graph = graph if not resume_path else build_graph()
+
+        def run_full():
+            result = run_graph(full_graph, ConversionState(input_dir=input_dir, output_dir=output_dir))
+            return result.dict() if hasattr(result, "dict") else result
+
+        watch.Watcher(final_state_dict, run_full).loop()
+
+    log_utils.close_event_log()
+
 
 if __name__ == "__main__":
     main()
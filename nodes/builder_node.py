@@ -5,11 +5,16 @@ builder_node.py — Django project generation step.
 This node calls tools/django_builder.create_core_files() to build
 the Django project skeleton using both static templates and LLM context.
 It then updates the ConversionState and logs a summary.
+With STREAM_BUILD=1 the apps were already built by tools/app_stream while
+the converter ran; this node waits for them and writes the project files.
+Finally it writes the background task app when the Rails app had jobs or
+mailers (tools/job_hints) and per-app query-count regression tests
+(tools/query_tests).
 """
 
 from rich.console import Console
 from rich.table import Table
-from tools import django_builder, log_utils
+from tools import django_builder, log_utils, app_stream, query_tests, job_hints
 
 
 console = Console()
@@ -20,12 +25,47 @@ def run(state):
     state.current_node = "builder_node"
     console.print("[bold cyan]🏗️ Building Django project structure...[/bold cyan]")
 
+    stream = None
     try:
-        result = django_builder.create_core_files(state)
+        stream = app_stream.close()
+        if stream:
+            # Apps were already being built while the converter ran (STREAM_BUILD=1)
+            result = stream.finish(state.get("django_blueprint", {}) or {})
+            state.generated_files = result["generated"]
+            state.project_root = str(stream.project_root)
+            summary = result["stream"]
+            console.print(
+                f"[green]⏱️ Streamed build: first file after {summary['time_to_first_file_s']}s, "
+                f"{len(summary['apps'])} apps done at {summary['total_s']}s[/green]"
+            )
+        else:
+            result = django_builder.create_core_files(state)
     except Exception as e:
+        if stream:
+            stream.abort()
         console.print(f"[bold red]❌ Builder node failed:[/bold red] {e}")
         raise
 
+    # Background task layer: @task registry, thread/DB backends, Celery/RQ adapters
+    task_files = job_hints.write_task_layer(
+        state.project_root, state.get("django_blueprint", {}) or {}, state.get("job_hints") or {}
+    )
+    if task_files:
+        console.print(
+            "[green]📬 Background tasks: wrote background/ (ThreadBackend by default; "
+            "DatabaseBackend + `manage.py run_tasks`, CeleryBackend and RQBackend via BACKGROUND_TASKS)[/green]"
+        )
+
+    # Query-count regression tests for every routed GET view
+    test_files, query_test_report = query_tests.write(state.project_root, state.get("django_blueprint", {}) or {})
+    if test_files:
+        console.print(
+            f"[green]🧪 Query-count tests: {query_test_report['tests']} views in {len(query_test_report['apps'])} apps "
+            f"({len(query_test_report['skipped'])} skipped) — run `python query_report.py`[/green]"
+        )
+    result["generated"] = result.get("generated", []) + task_files + test_files
+    state.generated_files = result["generated"]
+
     generated = result.get("generated", [])
     console.print(f"[green]✅ Generated {len(generated)} core Django files.[/green]\n")
 
@@ -42,7 +82,13 @@ def run(state):
     # 🧾 Log the result for debugging
     log_utils.log_state(
         "builder_node",
-        {"generated_files": generated, "project_root": state.project_root},
+        {
+            "generated_files": generated,
+            "project_root": state.project_root,
+            "template_dedup": result.get("template_dedup"),
+            "stream": result.get("stream"),
+            "query_tests": query_test_report,
+        },
         f"{state.output_dir}/logs/builder.json"
     )
 
@@ -9,11 +9,111 @@ Now ensures that:
 """
 
 import json
+import time
 from openai import OpenAI
-from tools import log_utils
+from tools import (
+    log_utils, llm_utils, routes_compiler, schema_importer, unit_graph, app_stream, scaffold_clusters, orm_hints,
+    cache_hints, job_hints, async_views, chunking, template_dedup,
+)
 
 client = OpenAI()
 
+# Static prompt prefixes. They are byte-identical across runs and calls so that
+# provider-side prompt caching can reuse them; every variable part (routes,
+# schema, Rails data, the blueprint being refined) goes after them in the
+# user message.
+BLUEPRINT_SYSTEM = """You are a senior Django architect. You convert Rails apps to complete Django project blueprints.
+Given the Rails summary and units, produce a complete JSON Django blueprint.
+
+Output JSON with this exact structure:
+{
+  "project_name": "<django_project_name>",
+  "settings_code": "<full valid Django 5.x settings.py>",
+  "urls_code": "<root urls.py including admin and app includes>",
+  "apps": [
+    {
+      "name": "<app_name>",
+      "models": ["<model class names owned by this app>"],
+      "models_code": "<Django models>",
+      "views_code": "<Django class-based views>",
+      "urls_code": "<Django urls.py for the app>",
+      "admin_code": "<Django admin registration>",
+      "templates": [{"name": "template_name.html", "content": "<valid Django HTML template>"}]
+    }
+  ],
+  "settings_overrides": {"MEDIA": true, "STATIC": true},
+  "requirements": ["Django>=5,<6", "Pillow"]
+}
+
+Rules:
+- Always include both 'settings_code' and 'urls_code' at the top level.
+- settings_code must include BASE_DIR, INSTALLED_APPS, MIDDLEWARE, STATIC_URL, MEDIA_URL.
+- urls_code must include admin route and includes for all apps.
+- Include converted templates for layouts, devise, and action_text if present in Rails views.
+- Do NOT include markdown, comments, or extra text — only valid JSON.
+- If a REQUIRED VIEWS section is given: URL routing is compiled locally from config/routes.rb,
+  so app and root 'urls_code' are generated afterwards and may be left empty. Instead, every
+  routed Rails controller action must exist as a class-based view with EXACTLY the listed class
+  names, in the 'views_code' of the app that owns the controller. Use the listed URL NAMES in
+  templates ({% url %}) and redirects.
+- If a SCHEMA section is given: Django models (fields, indexes, constraints, migrations) are
+  generated locally from db/schema.rb, so 'models_code' may be left empty. Instead, give every
+  app a "models" list with the model class names it owns, and use exactly the listed model and
+  field names in views, admin and templates.
+- If a SCAFFOLD FAMILIES section is given: write views only for the exemplar controller of each
+  family. Views for the member controllers are generated locally by renaming the exemplar's
+  views, so do not write them; still list their models in the owning app's "models".
+- Avoid N+1 queries: whenever a view's template walks a relation, load it in the view's queryset
+  with select_related (foreign keys / one-to-one) or prefetch_related (reverse and many relations).
+  If a QUERY PLAN section is given, use exactly the listed querysets in the listed views.
+- If a CACHING section is given: write each listed Rails.cache call with django.core.cache.cache
+  (fetch → cache.get_or_set(key, callable, timeout), write → cache.set, read → cache.get,
+  delete → cache.delete), keeping the listed keys. CACHES, cache_page and conditional-GET
+  decorators are added locally, so do not write them.
+- If a BACKGROUND JOBS section is given: write each listed job and mailer method as a function
+  named as listed, decorated with @task(queue=..., retries=...) (from background.tasks import task),
+  in an optional "tasks_code" string (the app's tasks.py) of the app that owns it. Mailers render
+  with django.template.loader.render_to_string and send with django.core.mail. Task arguments
+  must be JSON-serialisable: pass primary keys and re-fetch records inside the task. In views,
+  replace perform_later / deliver_later with <task>.delay(...) (or <task>.schedule(run_at, ...)
+  for delayed jobs) so requests never wait on slow work. The task runner, its backends and its
+  settings are added locally.
+- If an ASYNC VIEWS section is given: write each listed view as an async class-based view (every
+  handler is `async def get/post/...`). Use the async ORM (aget, afirst, acount, aexists, acreate,
+  asave, adelete, aupdate, `async for` / `[x async for x in qs]`), `await request.auser()`,
+  httpx.AsyncClient for outbound HTTP, StreamingHttpResponse over an async generator for
+  ActionController::Live streams, FileResponse for send_file, HttpResponse with
+  Content-Disposition for send_data, and sync_to_async for anything without an async API.
+  All other views stay synchronous. ASGI settings are added locally."""
+
+REFINE_SYSTEM = """You are an expert in converting Ruby on Rails projects to Django. Given a partially filled Django blueprint, complete all missing code blocks. Output valid JSON only, matching the original structure.
+
+Rules:
+- Preserve the same JSON structure and keys.
+- Always include 'settings_code' (full Django 5.x settings.py) and 'urls_code' (root urls.py).
+- Fill all missing fields: 'models_code', 'views_code', 'urls_code', 'admin_code', and 'templates.content'.
+- settings_code must include BASE_DIR, INSTALLED_APPS, MIDDLEWARE, STATIC_URL, MEDIA_URL, DEBUG=True.
+- urls_code must include admin route and include() for each app.
+- If any Rails templates exist under /app/views/layouts, /app/views/devise, or /app/views/action_text,
+  recreate them in Django templates directory with equivalent Jinja2 code.
+- If the Rails units carry 'required_tasks' ({app: {function: Rails call}}), add those @task
+  functions to that app's 'tasks_code', keeping the existing ones.
+- Each app must be valid Django code (no placeholders, no markdown, no comments).
+Return strictly valid JSON only."""
+
+REFINE_APP_SYSTEM = """You are an expert in converting Ruby on Rails projects to Django. Given one partially filled Django app, complete all missing code blocks. Output valid JSON only, matching the original structure.
+
+Rules:
+- Preserve the same JSON structure and keys, and return the single app object.
+- Fill all missing fields: 'models_code', 'views_code', 'admin_code', and 'templates.content'.
+- Add a template for every Rails view of this app that has no Django counterpart yet.
+- Keep existing class names, URL names and model names unchanged.
+- If 'required_views' is given, write exactly those view classes; if 'changed_sources' is given,
+  rewrite the empty fields from those Rails sources ('tasks_code' holds the app's @task functions).
+- If 'required_tasks' is given, add those @task functions to 'tasks_code', keeping the existing ones.
+- Must be valid Django code (no placeholders, no markdown, no comments).
+Return strictly valid JSON only."""
+
 
 def _try_parse_json(text: str):
     """Try to parse JSON safely, stripping markdown fences."""
@@ -31,13 +131,16 @@ def _try_parse_json(text: str):
 def _repair_json_with_llm(raw_text: str):
     """Ask LLM to fix broken JSON."""
     try:
-        response = client.chat.completions.create(
+        response = llm_utils.chat(
+            client,
+            "converter_node",
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are a JSON repair assistant. Output valid JSON only."},
                 {"role": "user", "content": f"Fix this invalid JSON:\n\n{raw_text}"}
             ],
             temperature=0,
+            log_fields={"step": "repair"},
         )
         fixed = response.choices[0].message.content.strip()
         return _try_parse_json(fixed)
@@ -52,17 +155,12 @@ def _refine_blueprint_with_llm(blueprint: dict, rails_summary: dict, rails_units
     and ensure top-level settings_code and urls_code exist.
     """
     try:
-        response = client.chat.completions.create(
+        response = llm_utils.chat(
+            client,
+            "converter_node",
             model="gpt-4o",
             messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an expert in converting Ruby on Rails projects to Django. "
-                        "Given a partially filled Django blueprint, complete all missing code blocks. "
-                        "Output valid JSON only, matching the original structure."
-                    ),
-                },
+                {"role": "system", "content": REFINE_SYSTEM},
                 {
                     "role": "user",
                     "content": f"""
@@ -75,23 +173,14 @@ SUMMARY:
 
 UNITS:
 {json.dumps(rails_units, indent=2)}
-
-Rules:
-- Preserve the same JSON structure and keys.
-- Always include 'settings_code' (full Django 5.x settings.py) and 'urls_code' (root urls.py).
-- Fill all missing fields: 'models_code', 'views_code', 'urls_code', 'admin_code', and 'templates.content'.
-- settings_code must include BASE_DIR, INSTALLED_APPS, MIDDLEWARE, STATIC_URL, MEDIA_URL, DEBUG=True.
-- urls_code must include admin route and include() for each app.
-- If any Rails templates exist under /app/views/layouts, /app/views/devise, or /app/views/action_text,
-  recreate them in Django templates directory with equivalent Jinja2 code.
-- Each app must be valid Django code (no placeholders, no markdown, no comments).
-Return strictly valid JSON only.
 """
                 }
             ],
             temperature=0.4,
             max_tokens=8000,
+            log_fields={"step": "refine"},
         )
+        chunking.check_response(response, "blueprint_output", "refine", max_tokens=8000)
         fixed = response.choices[0].message.content.strip()
         return _try_parse_json(fixed)
     except Exception as e:
@@ -99,57 +188,236 @@ Return strictly valid JSON only.
         return None
 
 
+def _refine_app_with_llm(app: dict, project_name: str, units_slice: dict):
+    """
+    Complete one app's missing code, giving the LLM only the Rails units the app
+    depends on (its slice of the unit dependency graph).
+    """
+    try:
+        response = llm_utils.chat(
+            client,
+            "converter_node",
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": REFINE_APP_SYSTEM},
+                {
+                    "role": "user",
+                    "content": f"""
+Here is the partially filled app '{app.get("name")}' of Django project '{project_name}':
+{json.dumps(app, indent=2)}
+
+Here are the Rails units this app depends on:
+{json.dumps(units_slice, indent=2)}
+"""
+                }
+            ],
+            temperature=0.4,
+            max_tokens=8000,
+            log_fields={"step": "refine_app", "app": app.get("name")},
+        )
+        chunking.check_response(response, "blueprint_output", f"refine_app {app.get('name')}", max_tokens=8000)
+        fixed = response.choices[0].message.content.strip()
+        refined = _try_parse_json(fixed)
+        return refined if isinstance(refined, dict) else None
+    except Exception as e:
+        print(f"⚠️ Refinement of app {app.get('name')} failed: {e}")
+        return None
+
+
+def _app_incomplete(app: dict, expected_templates: int, missing_tasks: dict | None = None) -> bool:
+    return (
+        bool(missing_tasks)
+        or app.get("models_code") == ""
+        or app.get("views_code") == ""
+        or app.get("urls_code") == ""
+        or app.get("admin_code") == ""
+        or any(t.get("content") == "" for t in app.get("templates", []))
+        or len(app.get("templates", [])) < expected_templates
+    )
+
+
+def _expected_templates(graph, rels: set, template_groups: dict) -> int:
+    """Distinct template groups among the Rails views in an app's slice."""
+    group_of = {}
+    for i, family in enumerate(template_groups.get("families", [])):
+        for member in family:
+            group_of[member] = i
+    groups = set()
+    for rel in rels:
+        node = graph.nodes.get(rel, {})
+        if node.get("kind") == "view" and rel.endswith(".erb"):
+            groups.add(group_of.get(node.get("path"), rel))
+    return len(groups)
+
+
+def _refine_sliced(parsed: dict, rails_summary: dict, rails_units: dict, graph, template_groups: dict, on_ready=None,
+                   missing_tasks: dict | None = None):
+    """
+    Refine incomplete apps one by one with their dependency slice, and fill
+    missing top-level settings/urls without any units. Returns (refined, report).
+    Apps owning jobs/mailers the LLM did not write (`missing_tasks`, from
+    job_hints.missing_tasks) are incomplete and get them as required_tasks.
+
+    `on_ready(index, refined)` is called as soon as each app is final: first
+    for apps that are already complete, then after each refinement.
+    """
+    full_chars = len(json.dumps(rails_units, indent=2))
+    report = {"calls": [], "full_chars": full_chars}
+    changed = False
+    project_name = parsed.get("project_name", "converted_project")
+    pending = []
+    for i, app in enumerate(parsed.get("apps", [])):
+        rels = graph.slice(graph.seeds_for_app(app))
+        if _app_incomplete(app, _expected_templates(graph, rels, template_groups), (missing_tasks or {}).get(i)):
+            pending.append((i, rels))
+        elif on_ready:
+            on_ready(i, False)
+    for i, rels in pending:
+        app = parsed["apps"][i]
+        units_slice = unit_graph.slice_units(rails_units, graph, rels)
+        if (missing_tasks or {}).get(i):
+            units_slice["required_tasks"] = missing_tasks[i]
+        slice_chars = len(json.dumps(units_slice, indent=2))
+        report["calls"].append({"app": app.get("name"), "units": len(rels), "slice_chars": slice_chars})
+        log_utils.log_event(
+            "converter_node", "context_slice", app=app.get("name"),
+            full_chars=full_chars, slice_chars=slice_chars, units=len(rels),
+        )
+        refined_app = _refine_app_with_llm(app, project_name, units_slice)
+        if refined_app:
+            parsed["apps"][i] = {**app, **refined_app}
+            changed = True
+        if on_ready:
+            on_ready(i, bool(refined_app))
+
+    if not parsed.get("settings_code") or not parsed.get("urls_code"):
+        skeleton = {**parsed, "apps": [{"name": a.get("name"), "models": a.get("models", [])} for a in parsed.get("apps", [])]}
+        top = _refine_blueprint_with_llm(skeleton, rails_summary, {})
+        if top:
+            for key in ("settings_code", "urls_code", "requirements"):
+                if top.get(key) and not parsed.get(key):
+                    parsed[key] = top[key]
+                    changed = True
+
+    if report["calls"]:
+        saved = sum(1 - c["slice_chars"] / max(full_chars, 1) for c in report["calls"]) / len(report["calls"])
+        report["avg_context_saving"] = round(saved, 3)
+        print(f"✂️ Sliced refinement: {len(report['calls'])} app calls, context {saved:.0%} smaller on average")
+    return (parsed if changed else None), report
+
+
+def _routes_prompt(route_table: dict) -> str:
+    """REQUIRED VIEWS / URL NAMES payload (the rules live in BLUEPRINT_SYSTEM)."""
+    if not route_table.get("routes"):
+        return ""
+    per_controller = "\n".join(
+        f"- {controller}: {', '.join(views)}"
+        for controller, views in routes_compiler.required_views(route_table).items()
+    )
+    return (
+        f"REQUIRED VIEWS (controller: view classes):\n{per_controller}\n\n"
+        f"URL NAMES:\n{chr(10).join(routes_compiler.route_summary(route_table))}\n\n"
+    )
+
+
+def _schema_prompt(rails_schema: dict) -> str:
+    """SCHEMA payload (the rules live in BLUEPRINT_SYSTEM)."""
+    if not rails_schema.get("tables"):
+        return ""
+    return f"SCHEMA:\n{schema_importer.schema_prompt(rails_schema)}\n\n"
+
+
+def _apply_local(
+    parsed: dict, route_table: dict, controller_clusters: dict, orm_plan: dict, cache_plan: dict, job_plan: dict,
+    async_plan: dict,
+) -> dict:
+    """
+    Locally generated parts of the blueprint, in dependency order: scaffold member
+    views first (routes bind to view classes), then compiled urls, then models
+    (with counter caches, QuerySets and related names), then view querysets,
+    then cache decorators and CACHES, then the background task settings, then
+    ASGI settings and the async-aware URL dispatcher (async output mode).
+    """
+    return {
+        "scaffold": scaffold_clusters.apply_to_blueprint(parsed, controller_clusters),
+        "routes": routes_compiler.apply_to_blueprint(parsed, route_table),
+        "schema": schema_importer.apply_to_blueprint(parsed, orm_plan["schema"], orm_plan["model_extras"]),
+        "orm": orm_hints.apply_to_blueprint(parsed, orm_plan),
+        "caching": cache_hints.apply_to_blueprint(parsed, cache_plan),
+        "jobs": job_hints.apply_to_blueprint(parsed, job_plan),
+        "async": async_views.apply_to_blueprint(parsed, async_plan),
+    }
+
+
+def _stream_on_ready(stream, parsed: dict, route_table: dict, controller_clusters: dict, plans: tuple):
+    """on_ready callback of _refine_sliced emitting each final app to the AppStream."""
+    emitted = set()
+
+    def on_ready(index, was_refined):
+        if was_refined:
+            # A refined app can bind more routes / own more models
+            _apply_local(parsed, route_table, controller_clusters, *plans)
+        emitted.add(index)
+        for i in sorted(emitted):
+            stream.emit(parsed["apps"][i])
+
+    return on_ready
+
+
 def run(state):
     """Main converter node: converts Rails summary to Django blueprint via LLM."""
+    try:
+        return _convert(state)
+    except BaseException:
+        # Don't leave a streamed build (STREAM_BUILD=1) running without a builder to finish it
+        stream = app_stream.close()
+        if stream:
+            stream.abort()
+        raise
+
+
+def _convert(state):
     state.current_node = "converter_node"
+    started = time.perf_counter()
 
     rails_summary = state.get("rails_summary", {}) or {}
     rails_units = state.get("rails_units", {}) or {}
+    route_table = state.get("route_table") or {}
+    rails_schema = state.get("rails_schema") or {}
+    controller_clusters = state.get("controller_clusters") or {}
+    # Eager loads, counter caches and scopes resolved against the schema (adds counter columns)
+    orm_plan = orm_hints.plan(state.get("orm_hints") or {}, rails_schema)
+    cache_plan = cache_hints.plan(state.get("cache_hints") or {}, state.get("cache_store") or {}, orm_plan["schema"])
+    job_plan = job_hints.plan(state.get("job_hints") or {}, state.get("queue_adapter"))
+    # ASYNC_VIEWS=1|all: I/O-heavy (or all) routed endpoints become async views
+    async_plan = async_views.plan(state.get("async_hints") or {}, route_table, async_views.mode())
+    plans = (orm_plan, cache_plan, job_plan, async_plan)
 
-    prompt = f"""
-You are a senior Django architect.
-Given the Rails summary and units, produce a complete JSON Django blueprint.
-
-Output JSON with this exact structure:
-{{
-  "project_name": "<django_project_name>",
-  "settings_code": "<full valid Django 5.x settings.py>",
-  "urls_code": "<root urls.py including admin and app includes>",
-  "apps": [
-    {{
-      "name": "<app_name>",
-      "models_code": "<Django models>",
-      "views_code": "<Django class-based views>",
-      "urls_code": "<Django urls.py for the app>",
-      "admin_code": "<Django admin registration>",
-      "templates": [{{"name": "template_name.html", "content": "<valid Django HTML template>"}}]
-    }}
-  ],
-  "settings_overrides": {{"MEDIA": true, "STATIC": true}},
-  "requirements": ["Django>=5,<6", "Pillow"]
-}}
-
-Rules:
-- Always include both 'settings_code' and 'urls_code' at the top level.
-- settings_code must include BASE_DIR, INSTALLED_APPS, MIDDLEWARE, STATIC_URL, MEDIA_URL.
-- urls_code must include admin route and includes for all apps.
-- Include converted templates for layouts, devise, and action_text if present in Rails views.
-- Do NOT include markdown, comments, or extra text — only valid JSON.
-"""
+    prompt = (
+        _routes_prompt(route_table)
+        + _schema_prompt(orm_plan["schema"])
+        + scaffold_clusters.prompt_section(controller_clusters)
+        + orm_hints.prompt_section(orm_plan)
+        + cache_hints.prompt_section(cache_plan["hints"])
+        + job_hints.prompt_section(job_plan["hints"])
+        + async_views.prompt_section(async_plan)
+    )
 
     raw_content = None
     parsed = None
 
     # 1️⃣ First LLM attempt to generate full blueprint
     try:
-        response = client.chat.completions.create(
+        response = llm_utils.chat(
+            client,
+            "converter_node",
             model="gpt-4o",
             messages=[
-                {"role": "system", "content": "You convert Rails apps to complete Django project blueprints."},
+                {"role": "system", "content": BLUEPRINT_SYSTEM},
                 {
                     "role": "user",
                     "content": prompt
-                               + "\n\nRails summary:\n"
+                               + "Rails summary:\n"
                                + json.dumps(rails_summary, indent=2)
                                + "\n\nRails units:\n"
                                + json.dumps(rails_units, indent=2),
@@ -157,7 +425,9 @@ Rules:
             ],
             temperature=0.3,
             max_tokens=8000,
+            log_fields={"step": "convert"},
         )
+        chunking.check_response(response, "blueprint_output", "convert", max_tokens=8000)
         raw_content = response.choices[0].message.content.strip()
         parsed = _try_parse_json(raw_content)
     except Exception as e:
@@ -180,13 +450,20 @@ Rules:
             "requirements": ["Django>=5,<6", "Pillow"],
         }
 
+    # Compiled routes replace LLM-written urls_code; schema-derived models replace models_code
+    local_reports = _apply_local(parsed, route_table, controller_clusters, *plans)
+
     # 4️⃣ Refinement trigger check
     rails_templates = [
         f for f in rails_summary.get("candidates_to_read", [])
         if "/app/views/" in f
     ]
-    total_rails_views = len(rails_templates)
+    # Duplicate / same-skeleton views are converted once, so count template groups
+    template_groups = state.get("template_groups") or {}
+    total_rails_views = template_groups.get("groups", len(rails_templates))
     django_templates_count = sum(len(a.get("templates", [])) for a in parsed.get("apps", []))
+    # Jobs and mailers the LLM did not turn into @task functions
+    missing_tasks = job_hints.missing_tasks(parsed, job_plan["hints"])
 
     needs_refine = (
         not parsed.get("settings_code")
@@ -200,14 +477,99 @@ Rules:
             for app in parsed.get("apps", [])
         )
         or django_templates_count < total_rails_views
+        or bool(missing_tasks)
     )
 
+    # STREAM_BUILD=1: hand each finished app to the builder pool right away
+    stream = None
+    if app_stream.enabled():
+        stream = app_stream.start(state.output_dir, parsed.get("project_name", "converted_project"), started)
+        if not needs_refine:
+            stream.emit_all(parsed.get("apps", []))
+
     refined = None
+    slicing_report = None
+    graph = unit_graph.UnitGraph.from_dict(state.get("unit_graph"))
     if needs_refine:
         print(f"✨ Refining blueprint (Rails templates: {total_rails_views}, Django templates: {django_templates_count})...")
-        refined = _refine_blueprint_with_llm(parsed, rails_summary, rails_units)
+        if graph.nodes:
+            refined, slicing_report = _refine_sliced(
+                parsed, rails_summary, rails_units, graph, template_groups,
+                on_ready=_stream_on_ready(stream, parsed, route_table, controller_clusters, plans) if stream else None,
+                missing_tasks=missing_tasks,
+            )
+        else:
+            if missing_tasks:
+                rails_units = {**rails_units, "required_tasks": {
+                    parsed["apps"][i].get("name"): tasks for i, tasks in missing_tasks.items()
+                }}
+            refined = _refine_blueprint_with_llm(parsed, rails_summary, rails_units)
         if refined:
             parsed = refined
+            local_reports = _apply_local(parsed, route_table, controller_clusters, *plans)
+
+    # Refinement stops at one template per group: the other members are instantiated locally
+    group_members = template_dedup.instantiate_members(parsed.get("apps", []), template_groups)
+    if group_members:
+        print(f"🧬 Template groups: {len(group_members)} member templates instantiated from a converted groupmate")
+        log_utils.log_state("converter_template_groups", group_members, f"{state.output_dir}/logs/converter_template_groups.json")
+
+    routes_report, schema_report = local_reports["routes"], local_reports["schema"]
+    scaffold_report = local_reports["scaffold"]
+    if scaffold_report["families"]:
+        print(
+            f"🧩 Scaffold families: {controller_clusters.get('clusters', 0)} clusters, "
+            f"{scaffold_report['members']} member controllers → {scaffold_report['member_views']} member views, "
+            f"{controller_clusters.get('analysis_batches_saved', 0)} analysis calls avoided"
+        )
+
+    if routes_report.get("applied"):
+        print(
+            f"🛣️ Routes: {routes_report['bound']}/{routes_report['routes']} bound to views, "
+            f"{len(routes_report['unbound'])} unbound, {len(routes_report['skipped'])} skipped"
+        )
+
+    if schema_report.get("applied"):
+        print(
+            f"🗄️ Models: {schema_report['tables']} tables → {schema_report['indexes']} indexes, "
+            f"{schema_report['unique_constraints']} unique constraints, {len(schema_report['notes'])} notes"
+        )
+
+    orm_report = local_reports["orm"]
+    if orm_report["eager_loads"] or orm_report["counter_caches"] or orm_report["scopes"]["translated"]:
+        print(
+            f"🔗 Eager loads: {orm_report['mapped']} mapped, {orm_report['dropped']} dropped; "
+            f"{sum(1 for c in orm_report['counter_caches'] if c['status'] == 'mapped')} counter caches, "
+            f"{len(orm_report['scopes']['translated'])} scopes → QuerySets "
+            f"({len(orm_report['scopes']['dropped'])} dropped)"
+        )
+
+    caching_report = local_reports["caching"]
+    if caching_report["mapped"] or caching_report["dropped"] or caching_report["unverified"] \
+            or caching_report["cache_store"]["settings"] != "skipped":
+        print(
+            f"🗃️ Caching: CACHES {caching_report['cache_store']['settings']}, "
+            f"{caching_report['mapped']} cache uses mapped, {caching_report['dropped']} dropped, "
+            f"{caching_report['unverified']} unverified, "
+            f"{caching_report['fragments']} template fragments"
+        )
+
+    jobs_report = local_reports["jobs"]
+    if jobs_report["jobs"] or jobs_report["mailers"]:
+        tasks = jobs_report["jobs"] + jobs_report["mailers"]
+        print(
+            f"📬 Background tasks: {sum(1 for t in tasks if t['status'] == 'mapped')}/{len(tasks)} jobs and mailers "
+            f"→ @task, {sum(1 for e in jobs_report['enqueues'] if e['status'] == 'mapped')}/"
+            f"{len(jobs_report['enqueues'])} enqueue sites → .delay(), settings {jobs_report['settings']}"
+        )
+
+    async_report = local_reports["async"]
+    if async_report["endpoints"]:
+        print(
+            f"⚡ Async views ({async_report['mode']}): {async_report['async']}/{len(async_report['endpoints'])} "
+            f"endpoints async, {async_report['sync']} still sync, {async_report['missing']} missing; "
+            f"serve with `{async_report['serve']}`"
+        )
 
     # 🧾 Save all versions for debugging
     log_dir = f"{state.output_dir}/logs"
@@ -215,6 +577,18 @@ Rules:
     log_utils.log_state("converter_parsed", parsed, f"{log_dir}/converter_parsed.json")
     if refined:
         log_utils.log_state("converter_refined", refined, f"{log_dir}/converter_refined.json")
+    log_utils.log_state("converter_routes", routes_report, f"{log_dir}/converter_routes.json")
+    if scaffold_report["families"]:
+        log_utils.log_state("converter_scaffold", scaffold_report, f"{log_dir}/converter_scaffold.json")
+    log_utils.log_state("converter_schema", schema_report, f"{log_dir}/converter_schema.json")
+    log_utils.log_state("converter_orm", orm_report, f"{log_dir}/converter_orm.json")
+    log_utils.log_state("converter_caching", caching_report, f"{log_dir}/converter_caching.json")
+    if jobs_report["jobs"] or jobs_report["mailers"]:
+        log_utils.log_state("converter_jobs", jobs_report, f"{log_dir}/converter_jobs.json")
+    if async_report["endpoints"]:
+        log_utils.log_state("converter_async", async_report, f"{log_dir}/converter_async.json")
+    if slicing_report:
+        log_utils.log_state("converter_slicing", slicing_report, f"{log_dir}/converter_slicing.json")
 
     state.django_blueprint = parsed
     return state
@@ -1,7 +1,49 @@
 # nodes/discovery_node.py
 import os
-import json
-from tools import file_tools, rails_parser, log_utils
+import math
+from tools import (
+    file_tools, rails_parser, log_utils, template_dedup, routes_compiler, schema_importer, unit_graph,
+    scaffold_clusters, orm_hints, cache_hints, job_hints, async_views, chunking,
+)
+
+
+def _tap_units(files_stream, input_dir, index, app_indexes, clusters, counts):
+    """
+    Pass (path, record) pairs through, recording view templates in the index
+    and every app/ unit in each of `app_indexes` (dependency graph, ORM hints,
+    cache hints, job hints, async signals — anything with add_file(path, content)).
+    config/routes.rb and db/ are compiled locally, and controllers that join an
+    existing scaffold cluster are derived from its exemplar, so all of these
+    are held back from the LLM. Paths are classified relative to `input_dir`,
+    so a Rails tree mounted under /app or /db is not mistaken for those folders.
+    """
+    for path, record in files_stream:
+        rel = os.path.relpath(path, input_dir).replace("\\", "/")
+        if record.get("truncated"):
+            chunking.record_truncation("read", path, size=record["size"], limit=chunking.READ_LIMIT)
+        if rel == "config/routes.rb" or rel.startswith("db/"):
+            continue
+        if rel.startswith("app/views/") and path.endswith(".erb"):
+            index.add(path, record["content"])
+        if rel.startswith("app/"):
+            for app_index in app_indexes:
+                app_index.add_file(path, record["content"])
+        if rel.startswith("app/controllers/") and not clusters.add(path, record["content"]):
+            counts["held_back"] += 1
+            continue
+        counts["sent"] += 1
+        yield path, record
+
+
+def _compile_routes(input_dir: str) -> dict:
+    """Parse config/routes.rb locally into a route table (empty if absent)."""
+    routes_path = os.path.join(input_dir, "config", "routes.rb")
+    records = file_tools.read_files([routes_path], max_bytes_per_file=10_000_000)
+    if routes_path not in records:
+        return {"routes": [], "skipped": []}
+    table = routes_compiler.parse_routes(records[routes_path]["content"])
+    print(f"🛣️ Compiled {len(table['routes'])} routes locally ({len(table['skipped'])} skipped)")
+    return table
 
 
 def run(state: dict) -> dict:
@@ -9,8 +51,20 @@ def run(state: dict) -> dict:
     Discovery Node:
     - Lists project files.
     - Summarizes Rails structure using rails_parser.
-    - Reads selected files safely (skipping directories/binaries).
+    - Reads selected files in parallel (skipping directories/binaries),
+      streaming them into rails_parser batch by batch.
     - Analyzes files deeply using rails_parser.
+    - Compiles config/routes.rb locally with routes_compiler.
+    - Imports db/schema.rb (or db/migrate) locally with schema_importer.
+    - Builds the unit dependency graph used for minimal-context prompting.
+    - Clusters scaffold-style controllers; only exemplars are analyzed by the LLM.
+    - Indexes associations, scopes and eager loads for N+1-safe querysets.
+    - Indexes Rails caching (fragments, caches_action, fresh_when, Rails.cache)
+      and reads config.cache_store.
+    - Indexes ActiveJob jobs, mailers and their enqueue sites, and reads
+      config.active_job.queue_adapter.
+    - Indexes streaming, send_file/send_data and outbound HTTP per controller
+      action (used by the opt-in async output mode).
     - Logs results to /logs/discovery_node.json
     """
 
@@ -30,16 +84,88 @@ def run(state: dict) -> dict:
     summary = rails_parser.summarize_structure(tree)
     candidates = summary.get("candidates_to_read", [])
 
-    # Step 3: read selected files safely
+    # Step 3: read selected files on a thread pool, streamed straight into analysis
+    # (large files are read whole and analyzed in parts, see tools/chunking)
     print(f"📖 Reading {len(candidates)} selected files...")
-    files_data = file_tools.read_files(
-        [os.path.join(input_dir, c) if not os.path.isabs(c) else c for c in candidates],
-        max_bytes_per_file=80_000,
+    read_stats = {}
+    files_stream = file_tools.iter_files(
+        [c if os.path.isabs(c) or os.path.exists(c) else os.path.join(input_dir, c) for c in candidates],
+        max_bytes_per_file=chunking.READ_LIMIT,
+        stats=read_stats,
     )
 
-    # Step 4: LLM-based analysis of read files
+    # Step 4: LLM-based analysis of read files (consumes the stream batch by batch),
+    # grouping view templates by content hash on the way through
     print("🧠 Analyzing Rails units via LLM...")
-    analysis = rails_parser.analyze_units(files_data)
+    template_index = template_dedup.TemplateIndex()
+    graph = unit_graph.UnitGraph(input_dir)
+    clusters = scaffold_clusters.ControllerClusters()
+    orm = orm_hints.OrmIndex()
+    caching = cache_hints.CacheIndex()
+    jobs = job_hints.JobIndex()
+    io_actions = async_views.AsyncIndex()
+    counts = {"sent": 0, "held_back": 0}
+    analysis = rails_parser.analyze_units(
+        _tap_units(files_stream, input_dir, template_index, (graph, orm, caching, jobs, io_actions), clusters, counts)
+    )
+    graph.finalize()
+
+    # Scaffold families: members' analysis entries are renamed copies of the exemplar's
+    controller_clusters = clusters.summary()
+    controller_clusters["analysis_entries_derived"] = scaffold_clusters.expand_analysis(analysis, controller_clusters)
+    controller_clusters["analysis_batches_saved"] = (
+        math.ceil((counts["sent"] + counts["held_back"]) / 20) - math.ceil(counts["sent"] / 20)
+    )
+    if controller_clusters["members"]:
+        print(
+            f"🧩 Scaffold clusters: {controller_clusters['controllers']} controllers → "
+            f"{controller_clusters['clusters']} clusters, {controller_clusters['members']} held back from LLM analysis "
+            f"({controller_clusters['analysis_batches_saved']} batches saved)"
+        )
+    orm_summary = orm.summary()
+    if orm_summary["eager_loads"]:
+        print(
+            f"🔗 ORM hints: {len(orm_summary['models'])} models, {len(orm_summary['eager_loads'])} eager loads, "
+            f"{sum(len(m['scopes']) for m in orm_summary['models'].values())} scopes"
+        )
+    cache_summary = caching.summary()
+    cache_store = cache_hints.import_cache_store(input_dir)
+    if cache_store or any(cache_summary.values()):
+        print(
+            f"🗃️ Caching: store {cache_store.get('store', 'unset')}, {len(cache_summary['fragments'])} fragments, "
+            f"{len(cache_summary['actions'])} caches_action, {len(cache_summary['conditional'])} conditional GETs, "
+            f"{len(cache_summary['low_level'])} Rails.cache calls"
+        )
+    job_summary = jobs.summary()
+    queue_adapter = job_hints.import_queue_adapter(input_dir)
+    if job_hints.has_jobs(job_summary):
+        print(
+            f"📬 Background jobs: {len(job_summary['jobs'])} jobs, {len(job_summary['mailers'])} mailers, "
+            f"{len(job_summary['enqueues'])} enqueue sites (adapter {queue_adapter or 'unset'})"
+        )
+    async_summary = io_actions.summary()
+    if async_summary["actions"]:
+        print(f"⚡ I/O-heavy actions: {len(async_summary['actions'])} (streaming, send_file/send_data, outbound HTTP)")
+    print(f"🕸️ Unit graph: {len(graph.nodes)} units, {sum(len(e) for e in graph.edges.values())} dependencies")
+    print(f"📖 Read {file_tools.format_read_stats(read_stats)}")
+
+    # Routes come from the local compiler rather than the LLM
+    route_table = _compile_routes(input_dir)
+    if route_table["routes"]:
+        analysis["routes"] = routes_compiler.route_summary(route_table)
+
+    # Database schema comes from db/schema.rb or db/migrate, parsed locally
+    rails_schema = schema_importer.import_schema(input_dir)
+    if rails_schema["tables"]:
+        print(f"🗄️ Imported {len(rails_schema['tables'])} tables from {rails_schema['source']}")
+        analysis["schema"] = schema_importer.schema_prompt(rails_schema).splitlines()
+
+    template_groups = template_index.summary()
+    if template_groups["templates"]:
+        print(
+            f"🧬 {template_groups['templates']} templates → {template_groups['groups']} unique "
+            f"(dedup ratio {template_groups['dedup_ratio']:.0%})"
+        )
 
     # Step 5: Update state
     state.update(
@@ -47,6 +173,17 @@ def run(state: dict) -> dict:
             "rails_summary": summary,
             "files_to_read": candidates,
             "rails_units": analysis,
+            "template_groups": template_groups,
+            "route_table": route_table,
+            "rails_schema": rails_schema,
+            "unit_graph": graph.to_dict(),
+            "controller_clusters": controller_clusters,
+            "orm_hints": orm_summary,
+            "cache_hints": cache_summary,
+            "cache_store": cache_store,
+            "job_hints": job_summary,
+            "queue_adapter": queue_adapter,
+            "async_hints": async_summary,
         }
     )
 
@@ -59,17 +196,19 @@ def run(state: dict) -> dict:
         state_subset={
             "rails_summary": summary,
             "files_to_read": candidates,
+            "read_stats": read_stats,
+            "template_groups": template_groups,
+            "route_table": route_table,
+            "rails_schema": rails_schema,
+            "controller_clusters": controller_clusters,
+            "orm_hints": orm_summary,
+            "cache_hints": cache_summary,
+            "cache_store": cache_store,
+            "job_hints": job_summary,
+            "queue_adapter": queue_adapter,
+            "async_hints": async_summary,
         },
         path=os.path.join(logs_dir, "discovery_node.json"),
     )
 
-    # Optional: log LLM call info if present
-    if "llm_response" in state:
-        log_utils.log_llm_call(
-            node="discovery_node",
-            prompt="rails_parser.summarize_structure",
-            response=json.dumps(summary, indent=2),
-            path=os.path.join(logs_dir, "discovery_node_llm.json"),
-        )
-
     return state
@@ -4,10 +4,27 @@ from datetime import datetime
 from rich.console import Console
 from rich.table import Table
 from openai import OpenAI
-from tools import file_tools, log_utils
+from tools import file_tools, log_utils, llm_utils, snapshot, model_router, chunking
 
 console = Console()
 
+README_SYSTEM = """You are a concise documentation assistant. Write a clean, professional README.md for a Django project converted from Ruby on Rails. Use only Markdown; no JSON or code fences.
+
+Create a clear, minimal, professional README.md for a Django project automatically
+converted from Ruby on Rails using an AI pipeline.
+
+Rules:
+- Write **Markdown** only (no JSON or raw data).
+- Include these sections (in this order):
+  1. 🧠 Project Overview – short 2-3 sentence intro.
+  2. ⚙️ Quick Start – commands to run (migrate, runserver).
+  3. 🧩 Conversion Summary – short bullet/table summary of key counts.
+  4. 📦 Applications – list app names and number of templates.
+  5. 🧱 Project Structure – a simplified tree of key files.
+  6. 🪄 Features – what’s supported.
+  7. 🧭 Notes – include timestamp and note that it’s AI-generated.
+- Write in English, concise and human-readable."""
+
 def call_llm(prompt: str) -> str:
     model = os.getenv("MODEL_NAME", "gpt-4o-mini")
     api_key = os.getenv("OPENAI_API_KEY")
@@ -15,17 +32,16 @@ def call_llm(prompt: str) -> str:
         raise RuntimeError("❌ OPENAI_API_KEY не знайдено в середовищі")
 
     client = OpenAI(api_key=api_key)
-    response = client.chat.completions.create(
+    response = llm_utils.chat(
+        client,
+        "integration_node",
         model=model,
         messages=[
-            {"role": "system", "content": (
-                "You are a concise documentation assistant. "
-                "Write a clean, professional README.md for a Django project converted from Ruby on Rails. "
-                "Use only Markdown; no JSON or code fences."
-            )},
+            {"role": "system", "content": README_SYSTEM},
             {"role": "user", "content": prompt}
         ],
         temperature=0.25,
+        log_fields={"step": "readme"},
     )
     return response.choices[0].message.content.strip()
 
@@ -64,32 +80,33 @@ def run(state):
             "apps": apps,
             "models_count": models_count,
             "views_count": views_count,
-            "templates_count": templates_count
+            "templates_count": templates_count,
+            "model_routing": model_router.report(),
+            "chunking": chunking.report(),
         }
     }
+    for tier, row in summary["stats"]["model_routing"].items():
+        console.print(
+            f"🧭 {tier} tier ({', '.join(row['models'])}): {row['calls']} calls, "
+            f"avg {row['avg_latency_ms'] / 1000:.1f}s, ${row['cost_usd']:.3f}, "
+            f"escalation rate {row['escalation_rate']:.0%}"
+        )
+    log_utils.log_state(
+        "model_router", summary["stats"]["model_routing"], os.path.join(output_dir, "logs", "model_routing.json")
+    )
 
-    summary_path = os.path.join(output_dir, "conversion_summary.json")
-    file_tools.write_json(summary_path, summary, makedirs=True)
-
-    prompt = f"""
-Create a clear, minimal, professional README.md for a Django project automatically
-converted from Ruby on Rails using an AI pipeline.
+    chunk_report = summary["stats"]["chunking"]
+    if chunk_report["chunked"] or chunk_report["truncations"]:
+        console.print(
+            f"✂️ Chunking: {len(chunk_report['chunked'])} oversized units → {chunk_report['parts']} parts; "
+            f"{len(chunk_report['truncations'])} truncations detected "
+            f"({', '.join(f'{k}: {v}' for k, v in chunk_report['truncations_by_stage'].items()) or 'none'})"
+        )
+    log_utils.log_state("chunking", chunk_report, os.path.join(output_dir, "logs", "chunking.json"))
 
-Rules:
-- Write **Markdown** only (no JSON or raw data).
-- Include these sections (in this order):
-  1. 🧠 Project Overview – short 2-3 sentence intro.
-  2. ⚙️ Quick Start – commands to run (migrate, runserver).
-  3. 🧩 Conversion Summary – short bullet/table summary of key counts.
-  4. 📦 Applications – list app names and number of templates.
-  5. 🧱 Project Structure – a simplified tree of key files.
-  6. 🪄 Features – what’s supported.
-  7. 🧭 Notes – include timestamp and note that it’s AI-generated.
-- Write in English, concise and human-readable.
+    summary_path = snapshot.save_snapshot(os.path.join(output_dir, "conversion_summary"), summary)
 
-Conversion summary for context:
-{json.dumps(summary, indent=2, ensure_ascii=False)}
-"""
+    prompt = f"Conversion summary for context:\n{json.dumps(summary, indent=2, ensure_ascii=False)}\n"
 
     readme_text = call_llm(prompt)
     readme_path = os.path.join(output_dir, "README.md")
@@ -9,8 +9,12 @@ def run(state):
         "discovery": {"select_globs": [
             "app/models/**/*.rb",
             "app/controllers/**/*.rb",
+            "app/jobs/**/*.rb",
+            "app/mailers/**/*.rb",
             "config/routes.rb",
-            "app/views/**/*"
+            "app/views/**/*",
+            "db/schema.rb",
+            "db/migrate/*.rb"
         ]},
         "selection_strategy": "Select main Rails MVC files",
         "llm_requirements": [
@@ -17,6 +17,17 @@ class ConversionState(BaseModel):
     rails_summary: Optional[Dict[str, Any]] = None
     files_to_read: Optional[List[str]] = None
     rails_units: Optional[Dict[str, Any]] = None
+    template_groups: Optional[Dict[str, Any]] = None
+    route_table: Optional[Dict[str, Any]] = None
+    rails_schema: Optional[Dict[str, Any]] = None
+    unit_graph: Optional[Dict[str, Any]] = None
+    controller_clusters: Optional[Dict[str, Any]] = None
+    orm_hints: Optional[Dict[str, Any]] = None
+    cache_hints: Optional[Dict[str, Any]] = None
+    cache_store: Optional[Dict[str, Any]] = None
+    job_hints: Optional[Dict[str, Any]] = None
+    queue_adapter: Optional[str] = None
+    async_hints: Optional[Dict[str, Any]] = None
 
     # --- Converter phase ---
     django_blueprint: Optional[Dict[str, Any]] = None
@@ -0,0 +1,150 @@
+# tools/app_stream.py
+"""
+Pipelined converter → builder.
+
+With STREAM_BUILD=1 the converter opens an AppStream as soon as the first
+blueprint is parsed and emits each app the moment it is final (complete
+after routes/schema application, or after its own refinement). A pool of
+STREAM_WORKERS threads writes the app's files and converts its templates
+while the converter keeps refining the remaining apps. builder_node then
+only waits for the pool and writes the project-level files.
+
+An app emitted again (e.g. its urls changed after another app's refinement)
+is rewritten; templates whose source is unchanged are not converted twice.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from tools import django_builder, template_converter, template_dedup, log_utils
+
+STREAM_WORKERS = int(os.getenv("STREAM_WORKERS", "4"))
+
+_active = None
+
+
+def enabled() -> bool:
+    return os.getenv("STREAM_BUILD") == "1"
+
+
+def _digest(obj) -> str:
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class AppStream:
+    """Builds apps on a thread pool as the converter emits them."""
+
+    def __init__(self, output_dir: str, project_name: str, started: float | None = None, workers: int = STREAM_WORKERS):
+        self.project_root = Path(output_dir) / project_name
+        os.makedirs(self.project_root, exist_ok=True)
+        self.started = started or time.perf_counter()
+        self.deduper = template_dedup.TemplateDeduper(template_converter.convert_template_with_llm)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="app-build")
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._app_digest = {}
+        self._template_digest = {}
+        self.generated = []
+        self.first_file_s = None
+        self.apps = {}
+
+    def _elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def _on_file(self, path: str):
+        with self._lock:
+            self.generated.append(path)
+            if self.first_file_s is None:
+                self.first_file_s = round(self._elapsed(), 2)
+                print(f"⏱️ First file written after {self.first_file_s}s: {path}")
+
+    def emit(self, app: dict) -> bool:
+        """Queue `app` for building unless an identical version was already queued."""
+        name = app.get("name", "app")
+        digest = _digest(app)
+        with self._lock:
+            if self._app_digest.get(name) == digest:
+                return False
+            self._app_digest[name] = digest
+            previous = self._futures.get(name)
+            self._futures[name] = self._executor.submit(self._build, json.loads(json.dumps(app)), previous)
+        return True
+
+    def emit_all(self, apps: list[dict]) -> int:
+        return sum(self.emit(app) for app in apps)
+
+    def _build(self, app: dict, previous):
+        if previous is not None:
+            previous.result()
+        name = app.get("name", "app")
+        emitted = self._elapsed()
+        # Skip templates already converted from the same source
+        templates = []
+        for tpl in app.get("templates", []):
+            key = (name, tpl.get("name"))
+            digest = _digest(tpl.get("content", ""))
+            if self._template_digest.get(key) != digest:
+                self._template_digest[key] = digest
+                templates.append(tpl)
+        paths = django_builder.write_app(self.project_root, {**app, "templates": templates}, self.deduper, self._on_file)
+        done = round(self._elapsed(), 2)
+        with self._lock:
+            row = self.apps.setdefault(name, {"builds": 0, "files": 0})
+            row["builds"] += 1
+            row["files"] += len(paths)
+            row["completed_s"] = done
+        log_utils.log_event("builder_node", "app_built", app=name, files=len(paths), completed_s=done)
+        print(f"📦 App '{name}' built: {len(paths)} files in {done - emitted:.1f}s (t+{done:.1f}s)")
+        return paths
+
+    def finish(self, blueprint: dict) -> dict:
+        """Emit any remaining changes, wait for the pool and write the project-level files."""
+        self.emit_all(blueprint.get("apps", []))
+        errors = []
+        for name, future in list(self._futures.items()):
+            try:
+                future.result()
+            except Exception as e:
+                errors.append({"app": name, "error": str(e)})
+                print(f"⚠️ Building app {name} failed: {e}")
+        self._executor.shutdown(wait=True)
+        for path in django_builder.write_core_files(self.project_root, blueprint):
+            self._on_file(path)
+        dedup_report = self.deduper.report()
+        django_builder.print_dedup_report(dedup_report)
+        return {
+            "generated": list(dict.fromkeys(self.generated)),
+            "template_dedup": dedup_report,
+            "stream": {
+                "time_to_first_file_s": self.first_file_s,
+                "total_s": round(self._elapsed(), 2),
+                "apps": self.apps,
+                "errors": errors,
+            },
+        }
+
+
+    def abort(self):
+        """Drop queued apps and wait for the running builds (the converter failed)."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def start(output_dir: str, project_name: str, started: float | None = None) -> AppStream:
+    global _active
+    _active = AppStream(output_dir, project_name, started)
+    return _active
+
+
+def active() -> AppStream | None:
+    return _active
+
+
+def close() -> AppStream | None:
+    """Detach and return the active stream (builder_node finishes it)."""
+    global _active
+    stream, _active = _active, None
+    return stream
@@ -0,0 +1,237 @@
+# tools/async_views.py
+"""
+Opt-in async output: ASYNC_VIEWS=1 (I/O-heavy endpoints) or ASYNC_VIEWS=all.
+
+Discovery feeds controllers into an AsyncIndex that records, per action,
+the signals that make it worth serving asynchronously:
+
+    stream   include ActionController::Live + response.stream.write / SSE
+    file     send_file
+    data     send_data
+    http     Net::HTTP, HTTParty, Faraday, RestClient, Excon, Typhoeus, URI.open
+
+(an action also inherits the signals of the controller methods it calls).
+With the mode on, the converter lists those endpoints in an ASYNC VIEWS
+section, so the LLM writes them as async class-based views on the async ORM,
+httpx.AsyncClient, StreamingHttpResponse and FileResponse. Locally,
+ASGI_APPLICATION and the ASGI server / HTTP client requirements are added,
+the compiled per-method URL dispatcher becomes async-aware, and the report
+lists every endpoint as async or still sync, with sync ORM calls left inside
+async handlers.
+"""
+
+import os
+import re
+from tools import routes_compiler, scaffold_clusters
+
+_LIVE = re.compile(r"^\s*include\s+ActionController::Live\b", re.MULTILINE)
+_SIGNALS = {
+    "stream": re.compile(r"\bresponse\.stream\.write\b|\bSSE\.new\b"),
+    "file": re.compile(r"\bsend_file\b"),
+    "data": re.compile(r"\bsend_data\b"),
+    "http": re.compile(r"\b(?:Net::HTTP|HTTParty|Faraday|RestClient|Excon|Typhoeus|URI\.open)\b"),
+}
+_DEF = re.compile(r"^\s*def\s+(\w+[?!]?)")
+_CALL = re.compile(r"\b([a-z_]\w*[?!]?)")
+_PRIVATE = re.compile(r"^\s*(?:private|protected)\s*$")
+_CLASS_BLOCK = re.compile(r"^class\s+(\w+)\b.*?(?=^\S|\Z)", re.MULTILINE | re.DOTALL)
+_ASYNC_HANDLER = re.compile(r"^\s+async\s+def\s+(get|post|put|patch|delete|head|options|dispatch)\s*\(", re.MULTILINE)
+_ASYNC_DEF = re.compile(r"^(\s+)async\s+def\s+\w+\(.*?(?=^\1(?:async\s+)?def\s|\Z)", re.MULTILINE | re.DOTALL)
+_SYNC_ORM = re.compile(
+    r"\.objects\.(?:get|create|get_or_create|update_or_create|count|exists|first|last)\("
+    r"|\.(?:save|delete|refresh_from_db)\(\)"
+    r"|\.(?:first|last|count|exists)\(\)"
+)
+
+# How each signal is served by Django, for the prompt and the report
+RESPONSES = {
+    "stream": "StreamingHttpResponse",
+    "file": "FileResponse",
+    "data": "HttpResponse",
+    "http": "httpx",
+}
+ASGI_REQUIREMENTS = ["uvicorn[standard]>=0.29"]
+HTTP_REQUIREMENTS = ["httpx>=0.27"]
+
+_ASYNC_DISPATCH_HELPER = '''
+
+def _by_method(handlers):
+    """Route one URL to per-HTTP-method views, honouring Rails' _method override."""
+
+    def pick(request):
+        method = request.method
+        if method == "POST":
+            method = request.POST.get("_method", method).upper()
+        if method not in handlers:
+            return None
+        # Class-based views dispatch on request.method: make it the overridden verb
+        request.method = method
+        return method
+
+    if not any(iscoroutinefunction(h) for h in handlers.values()):
+        def dispatch(request, *args, **kwargs):
+            method = pick(request)
+            if method is None:
+                return HttpResponseNotAllowed(list(handlers))
+            return handlers[method](request, *args, **kwargs)
+
+        return dispatch
+
+    # Async views share the URL: dispatch asynchronously, running sync views in a thread
+    wrapped = {m: h if iscoroutinefunction(h) else sync_to_async(h) for m, h in handlers.items()}
+
+    async def async_dispatch(request, *args, **kwargs):
+        method = pick(request)
+        if method is None:
+            return HttpResponseNotAllowed(list(handlers))
+        return await wrapped[method](request, *args, **kwargs)
+
+    return async_dispatch
+'''
+
+
+def mode() -> str | None:
+    """None (off), "io" (I/O-heavy endpoints only) or "all"."""
+    value = os.getenv("ASYNC_VIEWS", "").lower()
+    if value == "all":
+        return "all"
+    return "io" if value in ("1", "true", "io") else None
+
+
+class AsyncIndex:
+    """Per controller action: async-worthy signals (stream / file / data / http)."""
+
+    def __init__(self):
+        self.actions = []   # [{"file", "line", "controller", "action", "signals"}]
+
+    def add_file(self, path: str, content: str):
+        controller = scaffold_clusters.controller_path(path)
+        if not controller:
+            return
+        live = bool(_LIVE.search(content))
+        methods, public, current = {}, True, None
+        for number, line in enumerate(content.splitlines(), 1):
+            if _PRIVATE.match(line):
+                public = False
+            d = _DEF.match(line)
+            if d:
+                current = {"name": d.group(1), "line": number, "public": public, "signals": set(), "calls": set()}
+                methods[current["name"]] = current
+                continue
+            if current is None:
+                continue
+            for signal, pattern in _SIGNALS.items():
+                if pattern.search(line) and (signal != "stream" or live):
+                    current["signals"].add(signal)
+            current["calls"].update(_CALL.findall(line))
+        for method in methods.values():
+            if not method["public"]:
+                continue
+            signals = set(method["signals"])
+            for name in method["calls"] & set(methods):
+                if name != method["name"]:
+                    signals |= methods[name]["signals"]
+            if signals:
+                self.actions.append({
+                    "file": path, "line": method["line"], "controller": controller,
+                    "action": method["name"], "signals": sorted(signals),
+                })
+
+    def summary(self) -> dict:
+        return {"actions": self.actions}
+
+
+def plan(hints: dict, route_table: dict, async_mode: str | None) -> dict:
+    """Endpoints (view class → controller action and signals) to serve asynchronously."""
+    endpoints = {}
+    if not async_mode:
+        return {"mode": None, "endpoints": endpoints}
+    routed = {v for views in routes_compiler.required_views(route_table or {}).values() for v in views}
+    for row in (hints or {}).get("actions", []):
+        view = routes_compiler.view_name(row["controller"], row["action"])
+        if routed and view not in routed:
+            continue
+        endpoints[view] = {**row, "view": view}
+    if async_mode == "all":
+        for controller, views in routes_compiler.required_views(route_table or {}).items():
+            for view in views:
+                endpoints.setdefault(view, {"controller": controller, "view": view, "signals": []})
+    return {"mode": async_mode, "endpoints": endpoints}
+
+
+def prompt_section(async_plan: dict) -> str:
+    """ASYNC VIEWS payload for the blueprint prompt."""
+    if not async_plan["endpoints"]:
+        return ""
+    lines = []
+    for view, row in async_plan["endpoints"].items():
+        reasons = ", ".join(f"{s} → {RESPONSES[s]}" for s in row["signals"]) or "async ORM"
+        lines.append(f"- {view}: {reasons}")
+    return "ASYNC VIEWS (view: Rails I/O → Django):\n" + "\n".join(lines) + "\n\n"
+
+
+def _set_asgi(settings_code: str, project_name: str) -> tuple[str, str]:
+    if re.search(r"^ASGI_APPLICATION\s*=", settings_code, flags=re.MULTILINE):
+        return settings_code, "unchanged"
+    line = f'ASGI_APPLICATION = "{project_name}.asgi.application"\n'
+    m = re.search(r"^WSGI_APPLICATION\s*=.*\n", settings_code, flags=re.MULTILINE)
+    if m:
+        return settings_code[:m.end()] + line + settings_code[m.end():], "patched"
+    return settings_code.rstrip() + "\n\n" + line, "patched"
+
+
+def _async_urls(urls_code: str) -> str:
+    """Swap the compiled _by_method helper for the async-aware one."""
+    if routes_compiler._DISPATCH_HELPER not in urls_code:
+        return urls_code
+    urls_code = urls_code.replace(routes_compiler._DISPATCH_HELPER, _ASYNC_DISPATCH_HELPER)
+    return "from asgiref.sync import iscoroutinefunction, sync_to_async\n" + urls_code
+
+
+def apply_to_blueprint(blueprint: dict, async_plan: dict) -> dict:
+    """ASGI settings/requirements, async-aware dispatch, and the per-endpoint async report."""
+    report = {"mode": async_plan["mode"], "endpoints": [], "async": 0, "sync": 0, "missing": 0,
+              "settings": "skipped", "requirements": [], "serve": None}
+    if not async_plan["endpoints"]:
+        return report
+    project_name = blueprint.get("project_name", "converted_project")
+    if blueprint.get("settings_code"):
+        blueprint["settings_code"], report["settings"] = _set_asgi(blueprint["settings_code"], project_name)
+    report["serve"] = f"uvicorn {project_name}.asgi:application"
+
+    views = {}
+    for app in blueprint.get("apps", []) or []:
+        views.update({m.group(1): m.group(0) for m in _CLASS_BLOCK.finditer(app.get("views_code") or "")})
+    for view, row in async_plan["endpoints"].items():
+        entry = {"view": view, "controller": row["controller"], "action": row.get("action"), "signals": row["signals"]}
+        block = views.get(view)
+        if block is None:
+            entry["status"] = "view missing"
+            report["missing"] += 1
+        elif _ASYNC_HANDLER.search(block):
+            entry["status"] = "async"
+            report["async"] += 1
+            entry["unmapped"] = [s for s in row["signals"] if RESPONSES[s] not in block and not (
+                s == "http" and "aiohttp" in block)]
+            sync_orm = [m.group(0) for body in _ASYNC_DEF.finditer(block) for m in _SYNC_ORM.finditer(body.group(0))]
+            if sync_orm:
+                entry["sync_orm_calls"] = sorted(set(sync_orm))
+        else:
+            entry["status"] = "sync"
+            report["sync"] += 1
+        report["endpoints"].append(entry)
+
+    if report["async"]:
+        for app in blueprint.get("apps", []) or []:
+            if app.get("urls_code"):
+                app["urls_code"] = _async_urls(app["urls_code"])
+        requirements = list(ASGI_REQUIREMENTS)
+        if any("http" in r["signals"] for r in async_plan["endpoints"].values()):
+            requirements += HTTP_REQUIREMENTS
+        existing = blueprint.setdefault("requirements", ["Django>=5,<6", "Pillow"])
+        names = {re.split(r"[<>=\[ ]", r, maxsplit=1)[0].lower() for r in existing}
+        for requirement in requirements:
+            if re.split(r"[<>=\[ ]", requirement, maxsplit=1)[0].lower() not in names:
+                existing.append(requirement)
+                report["requirements"].append(requirement)
+    return report
@@ -0,0 +1,514 @@
+# tools/cache_hints.py
+"""
+Rails caching → the Django cache framework.
+
+Discovery feeds every app/ file into a CacheIndex and reads
+config.cache_store from config/environments/production.rb (or
+config/application.rb). Conversion then, locally:
+
+- config.cache_store        → CACHES in settings_code (+ client requirement)
+- caches_action / caches_page → @method_decorator(cache_page(seconds)) on the routed views
+- fresh_when / stale?       → @method_decorator(condition(etag_func, last_modified_func))
+                              with helpers reading updated_at of the record (pk) or collection
+
+On views with async handlers (ASYNC_VIEWS) cache_page decorates the handlers
+instead of dispatch and condition() is dropped: Django calls its ORM helpers
+synchronously, inside the event loop.
+
+Rails.cache.fetch blocks are listed in a CACHING prompt section for the LLM
+to write as cache.get_or_set(key, callable, timeout); ERB `cache do` fragments
+are converted by template_converter into {% cache %} blocks. The report
+marks every Rails cache use as mapped or dropped; a Rails.cache call counts
+as mapped only if a Django cache call carrying static text of its key (or,
+for keys without any, made inside the view routed to its action) is found,
+and is left unverified when there is neither.
+"""
+
+import os
+import re
+from tools import inflection, ruby_dsl, routes_compiler, scaffold_clusters, orm_hints, async_views
+
+_FRAGMENT = re.compile(r"<%-?\s*(cache(?:_if|_unless)?)\b\s*\(?(.*?)\)?\s*do\s*-?%>")
+_CACHES_ACTION = re.compile(r"^\s*caches_(action|page)\s+(.*)$")
+_CONDITIONAL = re.compile(r"\b(fresh_when|stale\?)\s*\(?(.*?)\)?\s*(?:$|\bthen\b)")
+_RAILS_CACHE = re.compile(r"\bRails\.cache\.(fetch|write|read|delete|exist\?)(?![\w?])")
+_BLOCK_OPEN = re.compile(r"do\b|\{\s*(?:\|[^|]*\|)?")
+_INTERPOLATION = re.compile(r"#\{[^}]*\}")
+_STRING = re.compile(r"(['\"])((?:\\.|(?!\1).)*)\1")
+_DJANGO_CACHE_CALL = re.compile(
+    r"\bcache\.(?:get_or_set|get|set|add|delete|has_key|get_many|set_many|delete_many|touch|incr|decr)\("
+)
+_CLASS_BLOCK = re.compile(r"^class\s+(\w+)\b.*?(?=^\S|\Z)", re.MULTILINE | re.DOTALL)
+_CACHE_STORE = re.compile(r"^\s*config\.cache_store\s*=\s*(.+)$", re.MULTILINE)
+_DEF = re.compile(r"^\s*def\s+(?:self\.)?(\w+[?!]?)")
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)\.(seconds?|minutes?|hours?|days?|weeks?|months?|years?)\b")
+_ENV = re.compile(r"ENV(?:\.fetch)?\s*[\[\(]\s*['\"](\w+)['\"]")
+_UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400, "week": 604800, "month": 2592000, "year": 31536000}
+_IMPORT = re.compile(r"^(?:from\s+\S+\s+import\s+.+|import\s+.+)$", re.MULTILINE)
+
+DEFAULT_PAGE_TIMEOUT = 600
+
+_BACKENDS = {
+    "memory_store": "django.core.cache.backends.locmem.LocMemCache",
+    "file_store": "django.core.cache.backends.filebased.FileBasedCache",
+    "mem_cache_store": "django.core.cache.backends.memcached.PyMemcacheCache",
+    "redis_cache_store": "django.core.cache.backends.redis.RedisCache",
+    "null_store": "django.core.cache.backends.dummy.DummyCache",
+    "solid_cache_store": "django.core.cache.backends.db.DatabaseCache",
+}
+_REQUIREMENTS = {"mem_cache_store": "pymemcache>=4", "redis_cache_store": "redis>=4"}
+
+
+def duration_seconds(value) -> int | None:
+    """`12.hours`, `1.day`, 300 → seconds (None if not a literal duration)."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = value.get("__raw__", "") if isinstance(value, dict) else str(value or "")
+    m = _DURATION.fullmatch(text.strip())
+    if not m:
+        return None
+    unit = m.group(2).rstrip("s")
+    return int(float(m.group(1)) * _UNITS[unit])
+
+
+def call_args(line: str, at: int) -> str:
+    """
+    Arguments of the call whose name ends at line[at]: the balanced (...) list,
+    or without parentheses everything up to the block opener (`do` / `{ |x|`)
+    outside strings and brackets, so "#{...}" interpolations stay in the key.
+    """
+    i = at
+    while i < len(line) and line[i] == " ":
+        i += 1
+    if i < len(line) and line[i] == "(":
+        args = orm_hints._balanced(line, i)
+        if args is not None:
+            return args.strip()
+        i += 1  # the argument list continues on the next line
+    start, depth, quote = i, 0, None
+    while i < len(line):
+        ch = line[i]
+        if quote:
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif depth == 0 and _BLOCK_OPEN.match(line, i) and (ch == "{" or not line[i - 1:i].isalnum()) \
+                and line[start:i].rstrip()[-1:] != ",":
+            break
+        elif ch in "([{":
+            depth += 1
+        elif ch in ")]}":
+            depth -= 1
+        i += 1
+    return line[start:i].strip().rstrip(",").strip()
+
+
+def key_fragments(key: str) -> list[str]:
+    """Static text of a Rails cache key: "post_stats/#{@post.id}" → ["post_stats/"]; [] for bare expressions."""
+    fragments = []
+    for m in _STRING.finditer(key or ""):
+        fragments += [f for f in _INTERPOLATION.split(m.group(2)) if len(f.strip("/:-_ ")) >= 2]
+    symbols = re.findall(r"(?<![\w:]):(\w{2,})", _STRING.sub("", key or ""))
+    return fragments + symbols
+
+
+def _raw(value) -> str:
+    if isinstance(value, dict) and "__raw__" in value:
+        return value["__raw__"]
+    return repr(value) if isinstance(value, str) else str(value)
+
+
+class CacheIndex:
+    """Fragment caches, action caches, conditional GETs and Rails.cache calls found in app/."""
+
+    def __init__(self):
+        self.fragments = []     # [{"file", "line", "helper", "key"}]
+        self.actions = []       # [{"file", "controller", "kind", "actions", "expires_in", "options"}]
+        self.conditional = []   # [{"file", "line", "controller", "action", "method", "subject", "args"}]
+        self.low_level = []     # [{"file", "line", "controller", "action", "op", "key", "expires_in"}]
+
+    def add_file(self, path: str, content: str):
+        norm = path.replace("\\", "/")
+        if "/app/views/" in norm:
+            for number, line in enumerate(content.splitlines(), 1):
+                for m in _FRAGMENT.finditer(line):
+                    self.fragments.append({"file": path, "line": number, "helper": m.group(1), "key": m.group(2).strip()})
+        elif norm.endswith(".rb") and "/app/" in norm:
+            self._scan_ruby(path, content, scaffold_clusters.controller_path(norm))
+
+    def _scan_ruby(self, path: str, content: str, controller: str | None):
+        action = None
+        for number, raw in enumerate(content.splitlines(), 1):
+            line = ruby_dsl.strip_comment(raw)
+            d = _DEF.match(line)
+            if d:
+                action = d.group(1)
+            m = _CACHES_ACTION.match(line)
+            if m and controller:
+                args, kwargs = ruby_dsl.parse_args(m.group(2))
+                self.actions.append({
+                    "file": path, "controller": controller, "kind": m.group(1),
+                    "actions": [a for a in args if isinstance(a, str)],
+                    "expires_in": duration_seconds(kwargs.pop("expires_in", None)),
+                    "options": sorted(kwargs),
+                })
+                continue
+            m = _CONDITIONAL.search(line)
+            if m and controller:
+                subject = re.search(r"@(\w+)", m.group(2))
+                self.conditional.append({
+                    "file": path, "line": number, "controller": controller, "action": action,
+                    "method": m.group(1), "subject": subject.group(1) if subject else None, "args": m.group(2).strip(),
+                })
+            m = _RAILS_CACHE.search(line)
+            if m:
+                parts = ruby_dsl.split_top(call_args(line, m.end()))
+                _, kwargs = ruby_dsl.parse_args(", ".join(p for p in parts[1:]))
+                self.low_level.append({
+                    "file": path, "line": number, "controller": controller, "action": action if controller else None,
+                    "op": m.group(1).rstrip("?"), "key": parts[0] if parts else "",
+                    "expires_in": duration_seconds(kwargs.get("expires_in")),
+                })
+
+    def summary(self) -> dict:
+        return {
+            "fragments": self.fragments,
+            "actions": self.actions,
+            "conditional": self.conditional,
+            "low_level": self.low_level,
+        }
+
+
+def import_cache_store(input_dir: str) -> dict:
+    """config.cache_store from production.rb (falling back to application.rb); {} if unset."""
+    for rel in ("config/environments/production.rb", "config/application.rb"):
+        path = os.path.join(input_dir, rel)
+        if not os.path.isfile(path):
+            continue
+        with open(path, encoding="utf-8", errors="replace") as f:
+            content = f.read()
+        for m in _CACHE_STORE.finditer(content):
+            line = ruby_dsl.strip_comment(m.group(1))
+            args, kwargs = ruby_dsl.parse_args(line)
+            if not args or not isinstance(args[0], str):
+                continue
+            options = {}
+            for value in args[1:]:
+                if isinstance(value, dict) and "__raw__" not in value:
+                    options.update(value)
+                else:
+                    options.setdefault("location", value)
+            options.update(kwargs)
+            env = _ENV.search(line)
+            return {"source": rel, "store": args[0], "options": {k: _raw(v) for k, v in options.items()},
+                    "env": env.group(1) if env else None}
+    return {}
+
+
+# ---------------------------------------------------------------------
+# conversion
+# ---------------------------------------------------------------------
+def caches_setting(store: dict) -> tuple[str | None, list[str], list[str]]:
+    """(CACHES code, requirements, notes) for a Rails cache store."""
+    name = store.get("store")
+    backend = _BACKENDS.get(name)
+    if not backend:
+        return None, [], [f"cache store {name!r} has no Django equivalent"] if name else []
+    options = store.get("options", {})
+    notes = []
+    entry = [f'        "BACKEND": "{backend}",']
+    if name in ("redis_cache_store", "mem_cache_store"):
+        default = "redis://localhost:6379/0" if name == "redis_cache_store" else "127.0.0.1:11211"
+        location = options.get("url") or options.get("location") or ""
+        literal = location.strip("'\"") if re.fullmatch(r"(['\"]).*\1", location) else default
+        if store.get("env"):
+            entry.append(f'        "LOCATION": os.environ.get("{store["env"]}", "{literal}"),')
+        else:
+            entry.append(f'        "LOCATION": "{literal}",')
+    elif name == "file_store":
+        location = (options.get("location") or "").strip("'\"")
+        path = location.split("/", 1)[-1] if location.startswith(("Rails.root", "#{")) else location
+        entry.append(f'        "LOCATION": BASE_DIR / "{path or "tmp/cache"}",')
+    elif name == "solid_cache_store":
+        entry.append('        "LOCATION": "solid_cache_entries",')
+        notes.append("DatabaseCache needs `python manage.py createcachetable`")
+    timeout = duration_seconds({"__raw__": options.get("expires_in", "")})
+    if timeout:
+        entry.append(f'        "TIMEOUT": {timeout},')
+    namespace = options.get("namespace", "").strip("'\"")
+    if re.fullmatch(r"[\w.:-]+", namespace):
+        entry.append(f'        "KEY_PREFIX": "{namespace}",')
+    elif namespace:
+        notes.append(f"namespace {options['namespace']} not translated")
+    code = "CACHES = {\n    \"default\": {\n" + "\n".join(entry) + "\n    }\n}\n"
+    return code, [_REQUIREMENTS[name]] if name in _REQUIREMENTS else [], notes
+
+
+def _set_caches(settings_code: str, caches: str) -> tuple[str, str]:
+    """Replace an existing CACHES block or append one; returns (code, action)."""
+    m = re.search(r"^CACHES\s*=\s*\{", settings_code, flags=re.MULTILINE)
+    if m:
+        depth = 0
+        for i in range(m.end() - 1, len(settings_code)):
+            depth += {"{": 1, "}": -1}.get(settings_code[i], 0)
+            if depth == 0:
+                return settings_code[:m.start()] + caches.rstrip() + settings_code[i + 1:], "replaced"
+    if "os.environ" in caches and not re.search(r"^import os\b", settings_code, flags=re.MULTILINE):
+        settings_code = "import os\n" + settings_code
+    return settings_code.rstrip() + "\n\n" + caches, "added"
+
+
+def _helpers(model: str, subject: str, single: bool) -> tuple[str, str, str]:
+    """(last_modified_func, etag_func, source) for a record (pk kwarg) or a whole collection."""
+    last_modified, etag = f"_{subject}_last_modified", f"_{subject}_etag"
+    if single:
+        source = (
+            f"def {last_modified}(request, *args, **kwargs):\n"
+            f"    return {model}.objects.filter(pk=kwargs.get(\"pk\")).values_list(\"updated_at\", flat=True).first()\n"
+            f"\n\n"
+            f"def {etag}(request, *args, **kwargs):\n"
+            f"    updated = {last_modified}(request, *args, **kwargs)\n"
+            f"    return f\"{subject}-{{kwargs.get('pk')}}-{{updated.timestamp()}}\" if updated else None\n"
+        )
+    else:
+        source = (
+            f"def {last_modified}(request, *args, **kwargs):\n"
+            f"    return {model}.objects.aggregate(latest=Max(\"updated_at\"))[\"latest\"]\n"
+            f"\n\n"
+            f"def {etag}(request, *args, **kwargs):\n"
+            f"    stats = {model}.objects.aggregate(latest=Max(\"updated_at\"), count=Count(\"pk\"))\n"
+            f"    return f\"{subject}-{{stats['count']}}-{{stats['latest'].timestamp()}}\" if stats[\"latest\"] else None\n"
+        )
+    return last_modified, etag, source
+
+
+def plan(hints: dict, cache_store: dict, schema: dict) -> dict:
+    """Decorators and helpers per view class, plus the CACHES setting."""
+    tables = (schema or {}).get("tables", {})
+    views, action_rows, conditional_rows = {}, [], []
+
+    for entry in (hints or {}).get("actions", []):
+        seconds = entry["expires_in"] or DEFAULT_PAGE_TIMEOUT
+        for action in entry["actions"]:
+            view = routes_compiler.view_name(entry["controller"], action)
+            row = {"view": view, "rails": f"caches_{entry['kind']} :{action}", "timeout": seconds}
+            notes = []
+            if not entry["expires_in"]:
+                notes.append(f"no expires_in: cached for {DEFAULT_PAGE_TIMEOUT}s instead of until expire_action")
+            if entry["options"]:
+                notes.append(f"options not translated: {', '.join(entry['options'])}")
+            if notes:
+                row["notes"] = notes
+            spec = views.setdefault(view, {"decorators": [], "helpers": [], "imports": set(), "models": set()})
+            spec["decorators"].append(f"@method_decorator(cache_page({seconds}), name=\"dispatch\")")
+            spec["imports"] |= {"from django.utils.decorators import method_decorator",
+                                "from django.views.decorators.cache import cache_page"}
+            spec["rows"] = spec.get("rows", []) + [("action", len(action_rows))]
+            action_rows.append(row)
+
+    for entry in (hints or {}).get("conditional", []):
+        row = {"file": entry["file"], "line": entry["line"], "rails": f"{entry['method']}({entry['args']})"}
+        if not entry["action"] or not entry["subject"]:
+            row.update(status="dropped", reason="no enclosing action or record")
+            conditional_rows.append(row)
+            continue
+        view = routes_compiler.view_name(entry["controller"], entry["action"])
+        subject = entry["subject"]
+        model = inflection.classify(subject)
+        single = inflection.singularize(subject) == subject
+        table = tables.get(inflection.tableize(model))
+        row.update(view=view, model=model)
+        if tables and not table:
+            row.update(status="dropped", reason=f"{model} not in schema")
+        elif table and "updated_at" not in {c["name"] for c in table["columns"]}:
+            row.update(status="dropped", reason=f"{table['name']} has no updated_at")
+        else:
+            last_modified, etag, source = _helpers(model, subject, single)
+            spec = views.setdefault(view, {"decorators": [], "helpers": [], "imports": set(), "models": set()})
+            spec["decorators"].append(
+                f"@method_decorator(condition(etag_func={etag}, last_modified_func={last_modified}), name=\"dispatch\")"
+            )
+            spec["helpers"].append(source)
+            spec["models"].add(model)
+            spec["imports"] |= {"from django.utils.decorators import method_decorator",
+                                "from django.views.decorators.http import condition"}
+            if not single:
+                spec["imports"].add("from django.db.models import Count, Max")
+            spec["rows"] = spec.get("rows", []) + [("conditional", len(conditional_rows))]
+            row["status"] = "pending"
+        conditional_rows.append(row)
+
+    caches, requirements, notes = caches_setting(cache_store or {})
+    uses_cache = any((hints or {}).get(k) for k in ("fragments", "actions", "low_level"))
+    if caches is None and uses_cache and not cache_store:
+        caches = ("CACHES = {\n    \"default\": {\n"
+                  "        \"BACKEND\": \"django.core.cache.backends.locmem.LocMemCache\",\n    }\n}\n")
+        notes.append("no config.cache_store found: LocMemCache (per process) configured")
+    return {
+        "hints": hints or {},
+        "caches": caches,
+        "requirements": requirements,
+        "notes": notes,
+        "views": views,
+        "action_caches": action_rows,
+        "conditional_gets": conditional_rows,
+    }
+
+
+def prompt_section(hints: dict) -> str:
+    """CACHING payload: low-level cache calls the LLM has to translate."""
+    lines = []
+    for entry in (hints or {}).get("low_level", []):
+        where = f"{inflection.camelize(entry['controller'])}Controller#{entry['action']}" if entry["controller"] \
+            else os.path.basename(entry["file"])
+        timeout = f", timeout={entry['expires_in']}" if entry["expires_in"] else ""
+        lines.append(f"- {where}: Rails.cache.{entry['op']}({entry['key']}) → cache key {entry['key']}{timeout}")
+    if not lines:
+        return ""
+    return "CACHING (Rails.cache → django.core.cache.cache):\n" + "\n".join(lines) + "\n\n"
+
+
+def _model_import(apps: list[dict], app: dict, model: str) -> str:
+    owner = next((a.get("name") for a in apps if model in (a.get("models") or [])), None)
+    return f"from .models import {model}" if owner in (None, app.get("name")) else f"from {owner}.models import {model}"
+
+
+def _add_imports(code: str, imports: list[str]) -> str:
+    missing = [i for i in imports if i not in code]
+    if not missing:
+        return code
+    last = list(_IMPORT.finditer(code))
+    at = last[-1].end() if last else 0
+    return code[:at] + ("\n" if at else "") + "\n".join(missing) + ("" if at else "\n") + code[at:]
+
+
+def _cache_windows(code: str) -> list[str]:
+    """Each django cache call with two lines of context on either side (where its key is built)."""
+    lines = code.splitlines()
+    return [
+        "\n".join(lines[max(i - 2, 0):i + 3]) for i, line in enumerate(lines) if _DJANGO_CACHE_CALL.search(line)
+    ]
+
+
+def _low_level_status(entry: dict, code: str, view_blocks: dict) -> dict:
+    """
+    mapped when a cache call carrying a static fragment of the key is found
+    (in the view routed to the enclosing action when there is one), or, for
+    keys without static text, when that view makes a cache call at all.
+    """
+    fragments = key_fragments(entry["key"])
+    view = routes_compiler.view_name(entry["controller"], entry["action"]) \
+        if entry.get("controller") and entry.get("action") else None
+    scope = view_blocks.get(view) if view else None
+    windows = _cache_windows(scope if scope is not None else code)
+    if fragments:
+        if any(f in w for w in windows for f in fragments):
+            return {"status": "mapped", "matched": "key" + (f" in {view}" if scope is not None else "")}
+        where = f" in {view}" if scope is not None else ""
+        return {"status": "dropped", "reason": f"no cache call with key {' / '.join(fragments)}{where}"}
+    if scope is not None:
+        if windows:
+            return {"status": "mapped", "matched": f"cache call in {view}"}
+        return {"status": "dropped", "reason": f"no cache call in {view}"}
+    reason = f"view {view} not found" if view else "key has no static text and no enclosing action"
+    return {"status": "unverified", "reason": reason}
+
+
+def _for_async(spec: dict, handlers: list[str]) -> dict:
+    """
+    Decorators of a view with async handlers: cache_page goes on each async
+    handler (on dispatch it would wrap a coroutine), and condition() is left
+    out, with its helpers, since Django calls etag/last_modified functions
+    synchronously.
+    """
+    decorators = [
+        d.replace('name="dispatch"', f'name="{h}"') for d in spec["decorators"] if "cache_page(" in d for h in handlers
+    ]
+    imports = {i for i in spec["imports"] if "condition" not in i and "Count, Max" not in i}
+    return {**spec, "decorators": decorators, "helpers": [], "imports": imports, "models": set()}
+
+
+def apply_to_blueprint(blueprint: dict, cache_plan: dict) -> dict:
+    """Decorate routed views, add CACHES and report every Rails cache use as mapped or dropped."""
+    apps = blueprint.get("apps", []) or []
+    action_rows = [dict(r) for r in cache_plan.get("action_caches", [])]
+    conditional_rows = [dict(r) for r in cache_plan.get("conditional_gets", [])]
+    for view, spec in cache_plan.get("views", {}).items():
+        status, reason = "dropped", f"view {view} not found"
+        conditional_reason = None
+        for app in apps:
+            code = app.get("views_code") or ""
+            m = re.search(rf"^class\s+{view}\b", code, flags=re.MULTILINE)
+            if not m:
+                continue
+            status = "mapped"
+            handlers = async_views._ASYNC_HANDLER.findall(_CLASS_BLOCK.match(code, m.start()).group(0))
+            if handlers:
+                spec = _for_async(spec, sorted(set(handlers)))
+                conditional_reason = "async view: condition() would run its ORM etag/last_modified functions " \
+                                     "synchronously in the event loop"
+                # Decorators on dispatch from before the view became async wrap a coroutine: drop them
+                stale = re.compile(r"^@method_decorator\((?:cache_page|condition)\(.*name=\"dispatch\"\)\n", re.MULTILINE)
+                start = code.rfind("\n\n", 0, m.start()) + 1
+                head = stale.sub("", code[start:m.start()])
+                code = code[:start] + head + code[m.start():]
+                m = re.search(rf"^class\s+{view}\b", code, flags=re.MULTILINE)
+            above = code[:m.start()].rstrip("\n").split("\n")
+            decorated = []
+            while above and above[-1].startswith("@"):
+                decorated.append(above.pop())
+            # condition() outermost, so a 304 is answered before the page cache is consulted
+            new = sorted((d for d in spec["decorators"] if d not in decorated), key=lambda d: "condition(" not in d)
+            if new:
+                helpers = "".join(h + "\n\n" for h in spec["helpers"] if h.split("(")[0] not in code)
+                code = code[:m.start()] + helpers + "\n".join(new) + "\n" + code[m.start():]
+                imports = sorted(spec["imports"]) + sorted(
+                    _model_import(apps, app, model) for model in spec["models"]
+                    if not re.search(rf"^(?:from|import)\s.*\b{model}\b", code, flags=re.MULTILINE)
+                )
+                code = _add_imports(code, imports)
+            app["views_code"] = code
+            break
+        for kind, i in spec.get("rows", []):
+            row = (action_rows if kind == "action" else conditional_rows)[i]
+            if kind == "conditional" and conditional_reason and status == "mapped":
+                row.update(status="dropped", reason=conditional_reason)
+                continue
+            row["status"] = status
+            if status == "dropped":
+                row["reason"] = reason
+
+    settings = "skipped"
+    if cache_plan.get("caches") and blueprint.get("settings_code"):
+        blueprint["settings_code"], settings = _set_caches(blueprint["settings_code"], cache_plan["caches"])
+        requirements = blueprint.setdefault("requirements", ["Django>=5,<6", "Pillow"])
+        for req in cache_plan.get("requirements", []):
+            if req.split(">=")[0] not in " ".join(requirements):
+                requirements.append(req)
+
+    # Rails.cache calls are translated by the LLM; check each one made it into the code
+    code = "\n".join(
+        "\n".join(a.get(k) or "" for k in ("views_code", "models_code", "tasks_code")) for a in apps
+    )
+    view_blocks = {}
+    for app in apps:
+        view_blocks.update({m.group(1): m.group(0) for m in _CLASS_BLOCK.finditer(app.get("views_code") or "")})
+    hints = cache_plan.get("hints", {})
+    low_level = [{**entry, **_low_level_status(entry, code, view_blocks)} for entry in hints.get("low_level", [])]
+
+    rows = action_rows + conditional_rows + low_level
+    return {
+        "cache_store": {"settings": settings, "notes": cache_plan.get("notes", []),
+                        "requirements": cache_plan.get("requirements", [])},
+        "action_caches": action_rows,
+        "conditional_gets": conditional_rows,
+        "low_level": low_level,
+        "fragments": len(hints.get("fragments", [])),
+        "mapped": sum(1 for r in rows if r.get("status") == "mapped"),
+        "dropped": sum(1 for r in rows if r.get("status") == "dropped"),
+        "unverified": sum(1 for r in rows if r.get("status") == "unverified"),
+    }
@@ -0,0 +1,273 @@
+# tools/chunking.py
+"""
+Large-file-aware chunking, and truncation reporting.
+
+Oversized inputs used to be cut silently: at 80 KB per file when reading,
+at 12,000 characters per analyze_units prompt, and at max_tokens on output.
+Instead:
+
+- discovery reads files up to CHUNK_READ_BYTES (2 MB) and records anything
+  still cut off;
+- analyze_units packs batches up to ANALYZE_BATCH_CHARS and splits larger
+  Ruby files on class/method boundaries and ERB files on top-level
+  block/partial boundaries, each part carrying a context header (class
+  declaration and macros, or template variables and partials); per-part
+  analysis entries are merged back by name;
+- templates over TEMPLATE_CHUNK_CHARS, or whose conversion stopped with
+  finish_reason == "length", are split the same way, converted on
+  CHUNK_WORKERS threads and stitched back in source order.
+
+Every truncation (read limit, output length) and every chunked unit is
+recorded; report() is written to logs/chunking.json by integration_node.
+
+    CHUNK_READ_BYTES=2000000  ANALYZE_BATCH_CHARS=12000
+    TEMPLATE_CHUNK_CHARS=6000 CHUNK_WORKERS=4
+"""
+
+import os
+import re
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tools import log_utils
+
+READ_LIMIT = int(os.getenv("CHUNK_READ_BYTES", "2000000"))
+ANALYZE_BATCH_CHARS = int(os.getenv("ANALYZE_BATCH_CHARS", "12000"))
+TEMPLATE_CHUNK_CHARS = int(os.getenv("TEMPLATE_CHUNK_CHARS", "6000"))
+CHUNK_WORKERS = int(os.getenv("CHUNK_WORKERS", "4"))
+
+_PART = re.compile(r"#part\d+of\d+$")
+_ERB_TAG = re.compile(r"<%(?!%)[-=]?(.*?)-?%>", re.DOTALL)
+_ERB_OPEN = re.compile(r"^\s*(?:if|unless|case|while|until|for|begin)\b|\bdo\s*(?:\|[^|]*\|)?\s*$")
+_ERB_CLOSE = re.compile(r"^\s*end\b")
+_ERB_IVAR = re.compile(r"@(\w+)")
+_ERB_RENDER = re.compile(r"render\s*\(?\s*(?:partial:\s*)?['\"]([\w/]+)['\"]")
+_RUBY_BOUNDARY = re.compile(r"^\s*(?:def|class|module|private|protected|public)\b")
+_RUBY_HEADER = re.compile(r"^\s*(?:class|module)\s|^\s*[a-z_]+[\s(:]")
+_DJANGO_LOAD = re.compile(r"^\s*{%-?\s*load\s+([^%]+?)\s*-?%}\s*$", re.MULTILINE)
+_DJANGO_EXTENDS = re.compile(r"^\s*{%-?\s*extends\s[^%]*%}\s*$", re.MULTILINE)
+
+_lock = threading.Lock()
+_truncations = []
+_chunked = []
+
+
+# ---------------------------------------------------------------------
+# recording
+# ---------------------------------------------------------------------
+def record_truncation(stage: str, name: str, **details):
+    row = {"stage": stage, "name": name, **details}
+    with _lock:
+        _truncations.append(row)
+    log_utils.log_event("chunking", "truncation", **row)
+    print(f"⚠️ Truncated ({stage}): {name}")
+
+
+def record_chunked(stage: str, name: str, chars: int, parts: int):
+    with _lock:
+        _chunked.append({"stage": stage, "name": name, "chars": chars, "parts": parts})
+    log_utils.log_event("chunking", "chunked", stage=stage, name=name, chars=chars, parts=parts)
+
+
+def finish_reason(response) -> str | None:
+    choices = getattr(response, "choices", None)
+    return getattr(choices[0], "finish_reason", None) if choices else None
+
+
+def check_response(response, stage: str, name: str, **details) -> bool:
+    """Record an output cut off by max_tokens; True if it was."""
+    if finish_reason(response) != "length":
+        return False
+    record_truncation(stage, name, **details)
+    return True
+
+
+def report() -> dict:
+    with _lock:
+        by_stage = {}
+        for row in _truncations:
+            by_stage[row["stage"]] = by_stage.get(row["stage"], 0) + 1
+        return {
+            "chunked": list(_chunked),
+            "parts": sum(c["parts"] for c in _chunked),
+            "truncations": list(_truncations),
+            "truncations_by_stage": by_stage,
+        }
+
+
+# ---------------------------------------------------------------------
+# splitting
+# ---------------------------------------------------------------------
+def _pack(segments: list[str], max_chars: int) -> list[str]:
+    """Greedily join consecutive segments into chunks of at most max_chars (a lone segment may exceed it)."""
+    chunks, current = [], ""
+    for segment in segments:
+        if current and len(current) + len(segment) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += segment
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _hard_split(text: str, max_chars: int) -> list[str]:
+    """Line-boundary split for analysis input that has no structural boundary."""
+    return _pack(text.splitlines(keepends=True), max_chars)
+
+
+def erb_segments(content: str) -> list[str]:
+    """Top-level segments: a cut after every line that closes all open ERB blocks."""
+    segments, current, depth = [], "", 0
+    for line in content.splitlines(keepends=True):
+        current += line
+        for m in _ERB_TAG.finditer(line):
+            code = m.group(1).strip()
+            if code.startswith("#"):
+                continue
+            if _ERB_CLOSE.match(code):
+                depth = max(depth - 1, 0)
+            elif _ERB_OPEN.search(code):
+                depth += 1
+        if depth == 0:
+            segments.append(current)
+            current = ""
+    if current:
+        segments.append(current)
+    return segments
+
+
+def split_erb(content: str, max_chars: int) -> list[str]:
+    """ERB chunks on block/partial boundaries; "".join(chunks) == content."""
+    return _pack(erb_segments(content), max_chars)
+
+
+def ruby_segments(content: str) -> tuple[str, list[str]]:
+    """(header, segments): the class/module declaration and macros, then one segment per method."""
+    lines = content.splitlines(keepends=True)
+    cuts = [0]
+    for i, line in enumerate(lines):
+        if i and _RUBY_BOUNDARY.match(line):
+            start = i
+            while start > cuts[-1] + 1 and lines[start - 1].lstrip().startswith("#"):
+                start -= 1
+            if start > cuts[-1]:
+                cuts.append(start)
+    cuts.append(len(lines))
+    segments = ["".join(lines[a:b]) for a, b in zip(cuts, cuts[1:]) if b > a]
+    first_def = next((i for i, line in enumerate(lines) if re.match(r"^\s*def\b", line)), len(lines))
+    header = "".join(line for line in lines[:first_def] if _RUBY_HEADER.match(line))
+    return header, segments
+
+
+def split_ruby(content: str, max_chars: int) -> list[str]:
+    """Ruby chunks on class/method boundaries; parts after the first repeat the class header."""
+    header, segments = ruby_segments(content)
+    budget = max(max_chars - len(header), max_chars // 2)
+    pieces = []
+    for segment in segments:
+        pieces.extend(_hard_split(segment, budget) if len(segment) > budget else [segment])
+    chunks = _pack(pieces, budget)
+    return [chunks[0]] + [header + "  # …\n" + chunk for chunk in chunks[1:]] if chunks else []
+
+
+def split_source(path: str, text: str, max_chars: int) -> list[tuple[str, str]]:
+    """[(name, text)] parts of an oversized Rails file for analysis; names carry #partXofN."""
+    if path.endswith(".rb"):
+        chunks = split_ruby(text, max_chars)
+    elif path.endswith(".erb"):
+        chunks = []
+        for chunk in split_erb(text, max_chars):
+            chunks.extend(_hard_split(chunk, max_chars) if len(chunk) > max_chars else [chunk])
+    else:
+        chunks = _hard_split(text, max_chars)
+    if len(chunks) <= 1:
+        return [(path, text)]
+    record_chunked("analyze", path, len(text), len(chunks))
+    return [(f"{path}#part{i + 1}of{len(chunks)}", chunk) for i, chunk in enumerate(chunks)]
+
+
+# ---------------------------------------------------------------------
+# merging analysis entries
+# ---------------------------------------------------------------------
+def _strip_part(value):
+    return _PART.sub("", value) if isinstance(value, str) else value
+
+
+def merge_entries(entries: list) -> list:
+    """Merge analysis entries of the same unit (split into parts): list fields are unioned in order."""
+    merged, order = {}, []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            key = json.dumps(entry, sort_keys=True, default=str)
+            if key not in merged:
+                merged[key] = entry
+                order.append(key)
+            continue
+        entry = {k: _strip_part(v) for k, v in entry.items()}
+        identity = entry.get("name") or entry.get("path") or entry.get("file")
+        key = f"id:{identity}" if identity else json.dumps(entry, sort_keys=True, default=str)
+        if key not in merged:
+            merged[key] = entry
+            order.append(key)
+            continue
+        target = merged[key]
+        for field, value in entry.items():
+            if isinstance(value, list) and isinstance(target.get(field), list):
+                seen = {json.dumps(v, sort_keys=True, default=str) for v in target[field]}
+                target[field] = target[field] + [v for v in value if json.dumps(v, sort_keys=True, default=str) not in seen]
+            elif field not in target:
+                target[field] = value
+    return [merged[k] for k in order]
+
+
+# ---------------------------------------------------------------------
+# chunked template conversion
+# ---------------------------------------------------------------------
+def template_context(content: str, name: str, part: int, parts: int) -> str:
+    """Shared header sent with every part of a chunked template."""
+    ivars = sorted(set(_ERB_IVAR.findall(content)))
+    partials = sorted(set(_ERB_RENDER.findall(content)))
+    lines = [
+        f"This is part {part} of {parts} of the template {name}. Convert only this part, in place.",
+        "Do not add {% extends %}, {% load %} or wrapper markup; leave HTML tags that open or close in another part as they are.",
+    ]
+    if ivars:
+        lines.append("Context variables in the whole template: " + ", ".join(ivars))
+    if partials:
+        lines.append("Partials rendered in the whole template: " + ", ".join(partials))
+    return "\n".join(lines) + "\n\n"
+
+
+def stitch_templates(parts: list[str]) -> str:
+    """Join converted parts in order, hoisting {% extends %} and {% load %} tags to the top once."""
+    extends, libraries, bodies = None, [], []
+    for text in parts:
+        m = _DJANGO_EXTENDS.search(text)
+        if m:
+            extends = extends or m.group(0).strip()
+            text = text[:m.start()] + text[m.end():]
+        for load in _DJANGO_LOAD.findall(text):
+            libraries.extend(lib for lib in load.split() if lib not in libraries)
+        bodies.append(_DJANGO_LOAD.sub("", text).strip("\n"))
+    head = ([extends] if extends else []) + ([f"{{% load {' '.join(libraries)} %}}"] if libraries else [])
+    return "\n".join(head + bodies) + "\n"
+
+
+def convert_in_chunks(content: str, name: str, convert_part, max_chars: int = TEMPLATE_CHUNK_CHARS) -> str | None:
+    """
+    Convert an oversized template part by part with convert_part(chunk, name, context)
+    on CHUNK_WORKERS threads; None when it has no top-level boundary to split on.
+    """
+    chunks = split_erb(content, max_chars)
+    if len(chunks) <= 1:
+        return None
+    record_chunked("template", name, len(content), len(chunks))
+    print(f"✂️ Converting {name} in {len(chunks)} parts ({len(content)} chars)")
+    with ThreadPoolExecutor(max_workers=min(CHUNK_WORKERS, len(chunks)), thread_name_prefix="chunk") as pool:
+        futures = [
+            pool.submit(convert_part, chunk, f"{name}#part{i + 1}of{len(chunks)}",
+                        template_context(content, name, i + 1, len(chunks)))
+            for i, chunk in enumerate(chunks)
+        ]
+        return stitch_templates([f.result() for f in futures])
@@ -1,20 +1,12 @@
 # tools/django_builder.py
 import os
 from pathlib import Path
-from tools import file_tools, template_converter
+from tools import file_tools, template_converter, template_dedup
 
-def create_core_files(state):
-    """Build Django project fully from LLM-generated blueprint."""
-    blueprint = state.get("django_blueprint", {}) or {}
+def core_files(blueprint: dict) -> dict:
+    """Project-level files (settings, urls, entry points, requirements)."""
     project_name = blueprint.get("project_name", "converted_project")
-    output_dir = state.output_dir
-    project_root = Path(output_dir) / project_name
-    os.makedirs(project_root, exist_ok=True)
-
-    generated = []
-
-    # Core project files
-    core_files = {
+    return {
         "__init__.py": "",
         "settings.py": blueprint.get("settings_code", "# settings generated by LLM\n"),
         "urls.py": blueprint.get("urls_code", "# urls generated by LLM\n"),
@@ -40,52 +32,106 @@ if __name__ == '__main__':
         "requirements.txt": "\n".join(blueprint.get("requirements", ["Django>=5,<6", "Pillow"]))
     }
 
-    for filename, content in core_files.items():
+
+def write_core_files(project_root: Path, blueprint: dict) -> list[str]:
+    generated = []
+    for filename, content in core_files(blueprint).items():
         file_tools.write_file(str(project_root / filename), content)
         generated.append(str(project_root / filename))
+    return generated
+
+
+def app_files(app: dict) -> dict:
+    """An app's Python files (path relative to the app directory → content)."""
+    app_name = app.get("name", "app")
+    files = {
+        "__init__.py": "",
+        "models.py": app.get("models_code", ""),
+        "views.py": app.get("views_code", ""),
+        "urls.py": app.get("urls_code", ""),
+        "admin.py": app.get("admin_code", ""),
+        "apps.py": (
+            f"from django.apps import AppConfig\n\n"
+            f"class {app_name.capitalize()}Config(AppConfig):\n"
+            f"    default_auto_field='django.db.models.BigAutoField'\n"
+            f"    name='{app_name}'\n"
+        ),
+    }
+
+    # Background tasks (converted ActiveJob jobs / mailers), run by the background app
+    if app.get("tasks_code"):
+        files["tasks.py"] = app["tasks_code"]
+
+    # Initial migrations generated from the Rails schema
+    if app.get("migrations"):
+        files["migrations/__init__.py"] = ""
+        for migration_name, migration_code in app["migrations"].items():
+            files[f"migrations/{migration_name}"] = migration_code
+    return files
+
+
+def write_app(project_root: Path, app: dict, deduper, on_file=None) -> list[str]:
+    """Write one app's Python files, then its templates (ERB converted via `deduper`)."""
+    generated = []
+    app_name = app.get("name", "app")
+    app_dir = project_root / app_name
+    os.makedirs(app_dir, exist_ok=True)
+    (app_dir / "templates" / app_name).mkdir(parents=True, exist_ok=True)
+
+    for filename, content in app_files(app).items():
+        file_tools.write_file(str(app_dir / filename), content)
+        generated.append(str(app_dir / filename))
+        if on_file:
+            on_file(str(app_dir / filename))
+
+    # Templates with LLM-based conversion
+    for tpl in app.get("templates", []):
+        tpl_name = tpl.get("name")
+        tpl_content = tpl.get("content", "")
+        if not tpl_name:
+            continue
+
+        tpl_filename = template_converter.convert_filename(tpl_name)
+        tpl_path = app_dir / "templates" / tpl_filename
+
+        if tpl_name.endswith(".erb"):
+            print(f"✨ Converting ERB template: {tpl_name}")
+            tpl_content = deduper.convert(tpl_name, tpl_content)
 
-    # Apps
+        file_tools.write_file(str(tpl_path), tpl_content)
+        generated.append(str(tpl_path))
+        if on_file:
+            on_file(str(tpl_path))
+    return generated
+
+
+def print_dedup_report(dedup_report: dict):
+    if dedup_report["templates"]:
+        print(
+            f"🧬 Template dedup: {dedup_report['templates']} templates, "
+            f"{dedup_report['llm_calls']} LLM calls, {dedup_report['calls_saved']} saved "
+            f"({dedup_report['dedup_ratio']:.0%})"
+        )
+
+
+def create_core_files(state):
+    """Build Django project fully from LLM-generated blueprint."""
+    blueprint = state.get("django_blueprint", {}) or {}
+    project_name = blueprint.get("project_name", "converted_project")
+    output_dir = state.output_dir
+    project_root = Path(output_dir) / project_name
+    os.makedirs(project_root, exist_ok=True)
+
+    # One LLM conversion per group of identical / same-skeleton templates
+    deduper = template_dedup.TemplateDeduper(template_converter.convert_template_with_llm)
+
+    generated = write_core_files(project_root, blueprint)
     for app in blueprint.get("apps", []):
-        app_name = app.get("name", "app")
-        app_dir = project_root / app_name
-        os.makedirs(app_dir, exist_ok=True)
-        (app_dir / "templates" / app_name).mkdir(parents=True, exist_ok=True)
-
-        files = {
-            "__init__.py": "",
-            "models.py": app.get("models_code", ""),
-            "views.py": app.get("views_code", ""),
-            "urls.py": app.get("urls_code", ""),
-            "admin.py": app.get("admin_code", ""),
-            "apps.py": (
-                f"from django.apps import AppConfig\n\n"
-                f"class {app_name.capitalize()}Config(AppConfig):\n"
-                f"    default_auto_field='django.db.models.BigAutoField'\n"
-                f"    name='{app_name}'\n"
-            ),
-        }
-
-        for filename, content in files.items():
-            file_tools.write_file(str(app_dir / filename), content)
-            generated.append(str(app_dir / filename))
-
-        # Templates with LLM-based conversion
-        for tpl in app.get("templates", []):
-            tpl_name = tpl.get("name")
-            tpl_content = tpl.get("content", "")
-            if not tpl_name:
-                continue
-
-            tpl_filename = template_converter.convert_filename(tpl_name)
-            tpl_path = app_dir / "templates" / tpl_filename
-
-            if tpl_name.endswith(".erb"):
-                print(f"✨ Converting ERB template via LLM: {tpl_name}")
-                tpl_content = template_converter.convert_template_with_llm(tpl_content, tpl_name)
-
-            file_tools.write_file(str(tpl_path), tpl_content)
-            generated.append(str(tpl_path))
+        generated.extend(write_app(project_root, app, deduper))
+
+    dedup_report = deduper.report()
+    print_dedup_report(dedup_report)
 
     state.generated_files = generated
     state.project_root = str(project_root)
-    return {"generated": generated}
+    return {"generated": generated, "template_dedup": dedup_report}
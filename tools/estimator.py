@@ -0,0 +1,451 @@
+# tools/estimator.py
+"""
+Dry-run cost and time estimator.
+
+Runs the planner and the local half of discovery (file walk and sizes only,
+no file contents, no LLM), then simulates the LLM batching of every step:
+
+    summarize_structure  150 paths per call
+    analyze_units        up to 20 files / ANALYZE_BATCH_CHARS per call, larger files in parts
+    convert / repair     one blueprint call (+ repair rate)
+    refine_app           one call per incomplete app
+    template             one call per ERB template (dedup rate from past runs), or
+                         one per TEMPLATE_CHUNK_CHARS part of an oversized one
+    readme               one integration call
+
+Routed steps (summarize_structure, analyze_units, template) are split between
+model_router's fast and strong tiers: by the share of `route` events that
+started on the fast tier in past runs, or else by the router's thresholds
+applied to file sizes. Calls that started fast also pay for the escalation
+rate on the strong tier.
+
+and prints predicted calls, input/output tokens, cost per model and wall
+time. Wall time follows the concurrency the pipeline really has: every step
+runs its calls one after another, except the parts of an oversized template
+(CHUNK_WORKERS threads) and, with STREAM_BUILD=1, templates (STREAM_WORKERS
+threads); --concurrency caps both, e.g. for a provider rate limit. Defaults are calibrated from the
+`llm_call` events of past runs (see log_utils.record_llm_call).
+
+    DRY_RUN=1 python main.py
+    python -m tools.estimator ./my_rails_app --concurrency 8 --events out_django/logs/events.jsonl
+"""
+
+import os
+import json
+import math
+import heapq
+import argparse
+from tools import file_tools, log_utils, chunking
+
+MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
+
+# USD per 1M tokens; override with LLM_PRICES='{"gpt-4o": {"input": 2.5, "output": 10}}'
+PRICES = {
+    "gpt-4o": {"input": 2.50, "output": 10.00},
+    "gpt-4o-mini": {"input": 0.15, "output": 0.60},
+}
+
+# Per-step defaults used when no past run is available for calibration.
+# "model" is the strong tier of routed steps (see model_router.run).
+STEPS = {
+    "summarize_structure": {"model": MODEL, "overhead_chars": 350, "out_tokens": 700, "max_tokens": 1500, "routed": True},
+    "analyze_units": {"model": MODEL, "overhead_chars": 1400, "out_tokens": 1800, "max_tokens": 4000, "routed": True},
+    "convert": {"model": "gpt-4o", "overhead_chars": 4000, "out_tokens": 6000, "max_tokens": 8000},
+    "repair": {"model": "gpt-4o-mini", "overhead_chars": 100, "out_tokens": 6000, "max_tokens": 16000},
+    "refine_app": {"model": "gpt-4o", "overhead_chars": 900, "out_tokens": 2500, "max_tokens": 8000},
+    "template": {"model": os.getenv("ROUTER_STRONG_MODEL", "gpt-4o"), "overhead_chars": 1900, "out_tokens": None,
+                 "max_tokens": 4000, "routed": True},
+    "readme": {"model": os.getenv("MODEL_NAME", "gpt-4o-mini"), "overhead_chars": 1500, "out_tokens": 900, "max_tokens": 4000},
+}
+
+DEFAULTS = {
+    "chars_per_token": 4.0,
+    "repair_rate": 0.1,        # repair calls per convert call
+    "refine_rate": 1.0,        # refined apps per app
+    "template_rate": 1.0,      # template calls per ERB template (1.0 = no dedup)
+    "template_out_ratio": 1.1,  # output tokens per input token of an ERB template
+    "chars_per_line": 40.0,    # to apply the router's max_lines to file sizes
+    "escalation_rate": 0.1,    # strong-tier retries per fast-tier call
+    "latency": {               # ms = base_ms + ms_per_token * completion tokens
+        "gpt-4o": {"base_ms": 900.0, "ms_per_token": 14.0},
+        "gpt-4o-mini": {"base_ms": 600.0, "ms_per_token": 8.0},
+    },
+    "steps": {},
+    "routing": {},             # step -> {"fast_share", "escalation_rate"} from `route` events
+    "calibrated_from": [],
+}
+
+
+def prices() -> dict:
+    table = {k: dict(v) for k, v in PRICES.items()}
+    override = os.getenv("LLM_PRICES")
+    if override:
+        try:
+            table.update(json.loads(override))
+        except json.JSONDecodeError:
+            print("⚠️ LLM_PRICES is not valid JSON, using built-in prices")
+    return table
+
+
+# ---------------------------------------------------------------------
+# calibration
+# ---------------------------------------------------------------------
+def _fit_latency(points: list[tuple[float, float]]) -> dict | None:
+    """Least-squares duration_ms = base_ms + ms_per_token * completion_tokens."""
+    if len(points) < 3:
+        return None
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    if var == 0:
+        return None
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+    base = mean_y - slope * mean_x
+    return {"base_ms": max(base, 0.0), "ms_per_token": max(slope, 0.0)}
+
+
+def _read_log_json(logs_dir: str, name: str):
+    path = os.path.join(logs_dir, name)
+    if not os.path.exists(path):
+        return None
+    try:
+        return file_tools.read_json(path).get("state")
+    except Exception:
+        return None
+
+
+def calibrate(event_paths: list[str]) -> dict:
+    """Derive token ratios, per-step output sizes, call rates and latency from past runs."""
+    cal = json.loads(json.dumps(DEFAULTS))
+    event_paths = [p for p in event_paths if os.path.exists(p)]
+    if event_paths:
+        from tools import log_query
+    steps, latency_points, routes = {}, {}, {}
+    prompt_chars = prompt_tokens = 0
+    for path in event_paths:
+        cal["calibrated_from"].append(path)
+        for e in log_query.filter_events(log_query.iter_events(path), node="model_router", kind="route"):
+            row = routes.setdefault(e.get("task"), {"tasks": 0, "fast": 0, "escalated": 0})
+            row["tasks"] += 1
+            if e.get("tier") == "fast" or e.get("escalated"):
+                row["fast"] += 1
+            if e.get("escalated"):
+                row["escalated"] += 1
+        for e in log_query.filter_events(log_query.iter_events(path), kind="llm_call"):
+            if e.get("error") or not e.get("completion_tokens"):
+                continue
+            step = e.get("step") or e.get("node")
+            row = steps.setdefault(step, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+            row["calls"] += 1
+            row["prompt_tokens"] += e.get("prompt_tokens") or 0
+            row["completion_tokens"] += e["completion_tokens"]
+            if e.get("prompt_chars") and e.get("prompt_tokens"):
+                prompt_chars += e["prompt_chars"]
+                prompt_tokens += e["prompt_tokens"]
+            if e.get("duration_ms"):
+                latency_points.setdefault(e.get("model"), []).append((e["completion_tokens"], e["duration_ms"]))
+
+    if prompt_tokens:
+        cal["chars_per_token"] = prompt_chars / prompt_tokens
+    for step, row in steps.items():
+        cal["steps"][step] = {
+            "calls": row["calls"],
+            "out_tokens": row["completion_tokens"] / row["calls"],
+            "in_tokens": row["prompt_tokens"] / row["calls"],
+            "out_ratio": row["completion_tokens"] / max(row["prompt_tokens"], 1),
+        }
+    for step, row in routes.items():
+        cal["routing"][step] = {
+            "fast_share": row["fast"] / row["tasks"],
+            "escalation_rate": row["escalated"] / row["fast"] if row["fast"] else cal["escalation_rate"],
+        }
+    for model, points in latency_points.items():
+        fit = _fit_latency(points)
+        if fit:
+            cal["latency"][model] = fit
+
+    converts = steps.get("convert", {}).get("calls", 0)
+    if converts:
+        cal["repair_rate"] = steps.get("repair", {}).get("calls", 0) / converts
+
+    # Rates that need the size of the past project come from its node logs.
+    for path in cal["calibrated_from"][-1:]:
+        logs_dir = os.path.dirname(path)
+        builder = _read_log_json(logs_dir, "builder.json") or {}
+        dedup = builder.get("template_dedup") or {}
+        if dedup.get("templates"):
+            cal["template_rate"] = dedup.get("llm_calls", 0) / dedup["templates"]
+        parsed = _read_log_json(logs_dir, "converter_parsed.json") or {}
+        apps = len(parsed.get("apps", [])) if isinstance(parsed, dict) else 0
+        if apps and converts:
+            cal["refine_rate"] = min(1.0, steps.get("refine_app", {}).get("calls", 0) / (converts * apps))
+    return cal
+
+
+def default_event_logs(output_dir: str) -> list[str]:
+    logs_dir = os.path.join(output_dir, "logs")
+    return [p for p in (os.path.join(logs_dir, "events.jsonl"), os.path.join(logs_dir, "events.jsonl.zst"))
+            if os.path.exists(p)]
+
+
+# ---------------------------------------------------------------------
+# local walk
+# ---------------------------------------------------------------------
+def walk(input_dir: str, globs: list[str] | None) -> dict:
+    """File list and sizes, filtered exactly as discovery does, without reading contents."""
+    tree = file_tools.list_tree(input_dir, globs)
+    files = tree.get("files", [])
+    candidates = [f for f in files if f.endswith((".rb", ".erb", ".haml"))]
+    units, templates, controllers = [], [], set()
+    for path in candidates:
+        norm = os.path.relpath(path, input_dir).replace(os.sep, "/")
+        if norm.endswith("config/routes.rb") or norm.startswith("db/"):
+            continue
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            continue
+        units.append((norm, size))
+        if norm.startswith("app/views/") and norm.endswith(".erb"):
+            templates.append((norm, size))
+        if norm.startswith("app/controllers/") and norm.endswith("_controller.rb"):
+            name = norm[len("app/controllers/"):].split("/")[0]
+            if name != "application_controller.rb":
+                controllers.add(name)
+    return {"files": files, "units": units, "templates": templates, "apps": max(1, len(controllers))}
+
+
+# ---------------------------------------------------------------------
+# simulation
+# ---------------------------------------------------------------------
+def _call(step: str, in_chars: float, cal: dict, out_tokens: float | None = None, model: str | None = None) -> dict:
+    spec = STEPS[step]
+    model = model or spec["model"]
+    learned = cal["steps"].get(step, {})
+    out = out_tokens if out_tokens is not None else learned.get("out_tokens", spec["out_tokens"])
+    out = min(out, spec["max_tokens"])
+    in_tokens = (in_chars + spec["overhead_chars"]) / cal["chars_per_token"]
+    lat = cal["latency"].get(model) or DEFAULTS["latency"]["gpt-4o"]
+    return {
+        "model": model,
+        "calls": 1.0,
+        "tasks": 1.0,   # share of one logical task (escalation retries carry none)
+        "in": in_tokens,
+        "out": out,
+        "ms": lat["base_ms"] + lat["ms_per_token"] * out,
+    }
+
+
+def _scaled(call: dict, weight: float) -> dict:
+    return {k: v * weight if k != "model" else v for k, v in call.items()}
+
+
+def _fast_share(step: str, sizes: list[float], cal: dict) -> float:
+    """Share of a task's calls that start on the fast tier: learned, else the router's size thresholds."""
+    from tools import model_router
+
+    if not model_router.enabled():
+        return 0.0
+    if step in cal["routing"]:
+        return cal["routing"][step]["fast_share"]
+    if step == "summarize_structure":
+        return 1.0  # path listings carry no units: always fast
+    limits = model_router.thresholds()
+    fits = all(s <= limits["max_chars"] and s / cal["chars_per_line"] <= limits["max_lines"] for s in sizes)
+    return 1.0 if fits else 0.0
+
+
+def _routed(step: str, in_chars: float, cal: dict, sizes: list[float], out_tokens: float | None = None) -> list[dict]:
+    """
+    Expected calls of one routed task: the fast-tier share, its escalations on
+    the strong tier, and the strong-tier share. The task's expected duration is
+    carried by its first entry so the makespan counts it once.
+    """
+    from tools import model_router
+
+    strong = _call(step, in_chars, cal, out_tokens)
+    share = _fast_share(step, sizes, cal)
+    if not share:
+        return [strong]
+    rate = cal["routing"].get(step, {}).get("escalation_rate", cal["escalation_rate"])
+    fast = _call(step, in_chars, cal, out_tokens, model=model_router.FAST_MODEL)
+    escalations = dict(_scaled(strong, share * rate), tasks=0.0)
+    entries = [_scaled(fast, share), escalations, _scaled(strong, 1 - share)]
+    entries = [e for e in entries if e["calls"]]
+    for e in entries:
+        e["ms"] = 0.0
+    entries[0]["ms"] = share * (fast["ms"] + rate * strong["ms"]) + (1 - share) * strong["ms"]
+    return entries
+
+
+def _wall_ms(durations: list[float], concurrency: int) -> float:
+    """Makespan of calls scheduled greedily onto `concurrency` workers."""
+    workers = [0.0] * max(1, min(concurrency, len(durations) or 1))
+    for d in sorted(durations, reverse=True):
+        heapq.heappush(workers, heapq.heappop(workers) + d)
+    return max(workers) if durations else 0.0
+
+
+def _step_wall_ms(step: str, items: list[dict], concurrency: int) -> float:
+    """Wall time of one step's calls on the threads the pipeline runs them on."""
+    if step != "template":
+        return _wall_ms([c["ms"] for c in items if c["ms"]], 1)
+    if os.getenv("STREAM_BUILD") == "1":
+        return _wall_ms([c["ms"] for c in items if c["ms"]], min(concurrency, int(os.getenv("STREAM_WORKERS", "4"))))
+    parts = {}
+    for c in items:
+        if c["ms"]:
+            parts.setdefault(c["template"], []).append(c["ms"])
+    return sum(_wall_ms(durations, min(concurrency, chunking.CHUNK_WORKERS)) for durations in parts.values())
+
+
+def simulate(walked: dict, cal: dict, concurrency: int = 1) -> dict:
+    calls = {step: [] for step in STEPS}
+
+    files = walked["files"]
+    for i in range(math.ceil(len(files) / 150)):
+        subset = files[i * 150:(i + 1) * 150]
+        calls["summarize_structure"] += _routed("summarize_structure", sum(len(f) + 4 for f in subset), cal, [])
+
+    # Same packing as rails_parser._iter_batches: 20 units or ANALYZE_BATCH_CHARS, oversized files in parts
+    units = walked["units"]
+    budget = chunking.ANALYZE_BATCH_CHARS
+    batch, payload = [], 0
+    for path, size in units:
+        size = min(size, chunking.READ_LIMIT)
+        pieces = [size] if size <= budget else [budget] * (size // budget) + ([size % budget] if size % budget else [])
+        for piece in pieces:
+            if batch and (len(batch) >= 20 or payload + piece + len(path) + 6 > budget):
+                calls["analyze_units"] += _routed("analyze_units", payload, cal, batch)
+                batch, payload = [], 0
+            batch.append(piece)
+            payload += piece + len(path) + 6
+    if batch:
+        calls["analyze_units"] += _routed("analyze_units", payload, cal, batch)
+
+    # The blueprint prompt carries the merged discovery output as JSON.
+    discovery_out = sum(c["out"] for c in calls["summarize_structure"] + calls["analyze_units"] if c["tasks"])
+    discovery_chars = discovery_out * cal["chars_per_token"]
+    convert = _call("convert", discovery_chars, cal)
+    calls["convert"].append(convert)
+    if cal["repair_rate"]:
+        repair = _call("repair", convert["out"] * cal["chars_per_token"], cal, out_tokens=convert["out"])
+        calls["repair"].append(_scaled(repair, cal["repair_rate"]))
+
+    apps = walked["apps"]
+    refined = round(apps * cal["refine_rate"])
+    per_app_chars = (convert["out"] / apps + discovery_out * min(1.0, 2 / apps)) * cal["chars_per_token"]
+    calls["refine_app"] = [_call("refine_app", per_app_chars, cal) for _ in range(refined)]
+
+    templates = sorted(walked["templates"], key=lambda t: -t[1])
+    converted = templates[:round(len(templates) * cal["template_rate"])]
+    ratio = cal["steps"].get("template", {}).get("out_ratio", DEFAULTS["template_out_ratio"])
+    for i, (_, size) in enumerate(converted):
+        parts = math.ceil(size / chunking.TEMPLATE_CHUNK_CHARS)
+        for _ in range(parts):
+            part = size / parts
+            entries = _routed("template", part, cal, [part], out_tokens=part / cal["chars_per_token"] * ratio)
+            calls["template"] += [dict(e, template=i) for e in entries]
+
+    calls["readme"].append(_call("readme", 0, cal))
+
+    price_table = prices()
+    rows, by_model = [], {}
+    total_ms = 0.0
+    for step, items in calls.items():
+        if not items:
+            continue
+        models = list(dict.fromkeys(c["model"] for c in items))
+        cost = 0.0
+        for model in models:
+            mine = [c for c in items if c["model"] == model]
+            n_calls = sum(c["calls"] for c in mine)
+            in_tokens = sum(c["in"] for c in mine)
+            out_tokens = sum(c["out"] for c in mine)
+            price = price_table.get(model, {"input": 0.0, "output": 0.0})
+            model_cost = in_tokens / 1e6 * price["input"] + out_tokens / 1e6 * price["output"]
+            cost += model_cost
+            m = by_model.setdefault(model, {"calls": 0.0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0})
+            m["calls"] += n_calls
+            m["input_tokens"] += round(in_tokens)
+            m["output_tokens"] += round(out_tokens)
+            m["cost_usd"] = round(m["cost_usd"] + model_cost, 4)
+        wall = _step_wall_ms(step, items, concurrency)
+        total_ms += wall
+        rows.append({
+            "step": step, "model": " / ".join(models), "calls": round(sum(c["calls"] for c in items), 2),
+            "input_tokens": round(sum(c["in"] for c in items)), "output_tokens": round(sum(c["out"] for c in items)),
+            "cost_usd": round(cost, 4), "wall_s": round(wall / 1000, 1),
+        })
+
+    return {
+        "concurrency": concurrency,
+        "files": len(files),
+        "units": len(units),
+        "templates": len(templates),
+        "apps": apps,
+        "steps": rows,
+        "models": by_model,
+        "total_calls": round(sum(r["calls"] for r in rows), 1),
+        "total_cost_usd": round(sum(r["cost_usd"] for r in rows), 4),
+        "wall_s": round(total_ms / 1000, 1),
+        "calibrated_from": cal["calibrated_from"],
+    }
+
+
+def print_estimate(estimate: dict):
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+    table = Table(title=f"Dry-run estimate (concurrency {estimate['concurrency']})", header_style="bold magenta")
+    for col in ("Step", "Model", "Calls", "Input tok", "Output tok", "Cost $", "Wall s"):
+        table.add_column(col, style="cyan" if col == "Step" else "green")
+    for r in estimate["steps"]:
+        table.add_row(
+            r["step"], r["model"], str(r["calls"]), str(r["input_tokens"]), str(r["output_tokens"]),
+            f"{r['cost_usd']:.3f}", f"{r['wall_s']:.1f}",
+        )
+    table.add_row(
+        "total", "", str(estimate["total_calls"]),
+        str(sum(r["input_tokens"] for r in estimate["steps"])),
+        str(sum(r["output_tokens"] for r in estimate["steps"])),
+        f"{estimate['total_cost_usd']:.3f}", f"{estimate['wall_s']:.1f}",
+    )
+    console.print(table)
+    for model, m in estimate["models"].items():
+        console.print(f"  {model}: {m['calls']:.0f} calls, {m['input_tokens']} in / {m['output_tokens']} out, ${m['cost_usd']:.3f}")
+    source = ", ".join(estimate["calibrated_from"]) or "built-in defaults"
+    console.print(
+        f"📐 {estimate['files']} files, {estimate['units']} units, {estimate['templates']} templates, "
+        f"~{estimate['apps']} apps — calibrated from {source}"
+    )
+
+
+def run_dry(input_dir: str, output_dir: str, concurrency: int = 1, event_paths: list[str] | None = None) -> dict:
+    """Plan + walk locally, simulate every LLM step and log the estimate (no LLM calls)."""
+    from state import ConversionState
+    from nodes import planner_node
+
+    state = planner_node.run(ConversionState(input_dir=input_dir, output_dir=output_dir))
+    globs = state.plan.get("discovery", {}).get("select_globs")
+    cal = calibrate(event_paths if event_paths is not None else default_event_logs(output_dir))
+    estimate = simulate(walk(input_dir, globs), cal, concurrency)
+    print_estimate(estimate)
+    log_utils.log_state("estimator", estimate, f"{output_dir}/logs/estimate.json")
+    return estimate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estimate LLM calls, tokens, cost and time of a conversion.")
+    parser.add_argument("input_dir")
+    parser.add_argument("--output", default="./out_django")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--events", nargs="*", help="past events.jsonl[.zst] logs to calibrate from")
+    args = parser.parse_args(argv)
+    run_dry(args.input_dir, args.output, args.concurrency, args.events)
+
+
+if __name__ == "__main__":
+    main()
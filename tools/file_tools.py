@@ -1,43 +1,176 @@
 # tools/file_tools.py
 import os
+import re
 import json
+import mmap
+import time
+import codecs
 import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
+def _glob_regex(pattern: str) -> re.Pattern:
+    """Compile a path glob ('**' spans directories, '*' does not) to a regex."""
+    out, i = [], 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(out) + r"\Z")
+
+
 def list_tree(root: str, globs: list[str] | None = None) -> dict:
-    """Recursively list directories and files under a root path."""
+    """
+    Recursively list directories and files under a root path.
+    Globs are matched against the path relative to root; plain suffixes
+    without wildcards or slashes (e.g. ".rb") keep matching by extension.
+    """
+    suffixes = [g for g in globs or [] if not any(c in g for c in "*?/")]
+    patterns = [_glob_regex(g) for g in globs or [] if g not in suffixes]
     dirs, files = [], []
     for dirpath, dirnames, filenames in os.walk(root):
         for d in dirnames:
             dirs.append(os.path.join(dirpath, d))
         for f in filenames:
+            path = os.path.join(dirpath, f)
             if globs:
-                if not any(f.endswith(ext) for ext in globs):
+                rel = os.path.relpath(path, root).replace(os.sep, "/")
+                if not any(f.endswith(ext) for ext in suffixes) and not any(p.match(rel) for p in patterns):
                     continue
-            files.append(os.path.join(dirpath, f))
+            files.append(path)
     return {"dirs": dirs, "files": files}
 
 
-def read_files(paths: list[str], max_bytes_per_file: int = 80000) -> dict:
-    """Read text content from files, skipping directories and binaries."""
-    results = {}
-    for path in paths:
-        if not os.path.exists(path):
-            continue
-        if os.path.isdir(path):
-            print(f"⚠️ Skipping directory: {path}")
-            continue
-        try:
-            with open(path, "rb") as f:
-                raw = f.read(max_bytes_per_file)
-            if b"\x00" in raw:
+SNIFF_BYTES = 8192            # first block inspected for binary/encoding detection
+MMAP_THRESHOLD = 256 * 1024   # files at least this large are mapped instead of read
+READ_WORKERS = int(os.getenv("READ_WORKERS", "8"))
+
+
+def _sniff_encoding(head: bytes) -> str | None:
+    """Guess the encoding of a text block, or return None if it looks binary."""
+    if not head:
+        return "utf-8"
+    if b"\x00" in head:
+        return None
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        head.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut at the end of the sniffed block is still UTF-8
+        if e.start >= len(head) - 3 and e.reason == "unexpected end of data":
+            return "utf-8"
+    control = sum(1 for b in head if b < 32 and b not in (9, 10, 12, 13))
+    if control / len(head) > 0.3:
+        return None
+    return "latin-1"
+
+
+def _read_one(path: str, max_bytes: int) -> dict | None:
+    """Read a single file, sniffing the first block before loading the rest."""
+    if not os.path.exists(path):
+        return None
+    if os.path.isdir(path):
+        print(f"⚠️ Skipping directory: {path}")
+        return None
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            head = f.read(min(SNIFF_BYTES, max_bytes))
+            encoding = _sniff_encoding(head)
+            if encoding is None:
                 print(f"⚠️ Skipping binary file: {path}")
+                return None
+            limit = min(size, max_bytes)
+            if size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    raw = mm[:limit]
+            elif limit > len(head):
+                raw = head + f.read(limit - len(head))
+            else:
+                raw = head
+        return {
+            "content": raw.decode(encoding, errors="ignore"),
+            "truncated": size > max_bytes,
+            "encoding": encoding,
+            "size": size,
+        }
+    except Exception as e:
+        print(f"⚠️ Failed to read {path}: {e}")
+        return None
+
+
+def iter_files(paths: list[str], max_bytes_per_file: int = 80000, workers: int | None = None, stats: dict | None = None):
+    """
+    Read files on a thread pool and yield (path, record) pairs lazily, in input order.
+
+    Only a bounded window of reads is in flight, so consumers can process the
+    corpus without holding all of it in memory. If `stats` is given it is filled
+    with files/bytes/skipped counts, elapsed seconds and bytes_per_sec.
+    """
+    workers = workers or READ_WORKERS
+    window = workers * 4
+    started = time.perf_counter()
+    counters = {"files": 0, "bytes": 0, "skipped": 0, "truncated": 0}
+    paths_iter = iter(paths)
+    pending = deque()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for path in paths_iter:
+            pending.append((path, pool.submit(_read_one, path, max_bytes_per_file)))
+            if len(pending) >= window:
+                break
+        while pending:
+            path, future = pending.popleft()
+            nxt = next(paths_iter, None)
+            if nxt is not None:
+                pending.append((nxt, pool.submit(_read_one, nxt, max_bytes_per_file)))
+            record = future.result()
+            if record is None:
+                counters["skipped"] += 1
                 continue
-            content = raw.decode("utf-8", errors="ignore")
-            results[path] = {"content": content, "truncated": len(raw) >= max_bytes_per_file}
-        except Exception as e:
-            print(f"⚠️ Failed to read {path}: {e}")
+            counters["files"] += 1
+            counters["bytes"] += min(record["size"], max_bytes_per_file)
+            counters["truncated"] += int(record["truncated"])
+            yield path, record
+
+    if stats is not None:
+        elapsed = time.perf_counter() - started
+        stats.update(counters)
+        stats["seconds"] = round(elapsed, 3)
+        stats["bytes_per_sec"] = round(counters["bytes"] / elapsed) if elapsed > 0 else 0
+
+
+def format_read_stats(stats: dict) -> str:
+    """One-line human summary of iter_files() stats."""
+    mb = stats.get("bytes", 0) / 1_048_576
+    rate = stats.get("bytes_per_sec", 0) / 1_048_576
+    return (
+        f"{stats.get('files', 0)} files, {mb:.2f} MB in {stats.get('seconds', 0):.2f}s "
+        f"({rate:.2f} MB/s, {stats.get('skipped', 0)} skipped, {stats.get('truncated', 0)} truncated)"
+    )
+
+
+def read_files(paths: list[str], max_bytes_per_file: int = 80000) -> dict:
+    """Read text content from files, skipping directories and binaries."""
+    stats = {}
+    results = dict(iter_files(paths, max_bytes_per_file, stats=stats))
+    print(f"📖 Read {format_read_stats(stats)}")
     return results
 
 
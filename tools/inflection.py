@@ -0,0 +1,91 @@
+# tools/inflection.py
+"""
+Minimal ActiveSupport-style inflections used by the local (non-LLM) converters.
+Covers the regular English rules plus the irregulars Rails ships with.
+"""
+
+import re
+
+_IRREGULAR = {
+    "person": "people",
+    "man": "men",
+    "woman": "women",
+    "child": "children",
+    "sex": "sexes",
+    "move": "moves",
+    "zombie": "zombies",
+}
+_IRREGULAR_PLURAL = {v: k for k, v in _IRREGULAR.items()}
+_UNCOUNTABLE = {"equipment", "information", "rice", "money", "species", "series", "fish", "sheep", "jeans", "police", "news", "data"}
+
+
+def _match_case(source: str, word: str) -> str:
+    return word[0].upper() + word[1:] if source[:1].isupper() else word
+
+
+def singularize(word: str) -> str:
+    """posts → post, categories → category, people → person."""
+    lower = word.lower()
+    if not lower or lower in _UNCOUNTABLE:
+        return word
+    if lower in _IRREGULAR_PLURAL:
+        return _match_case(word, _IRREGULAR_PLURAL[lower])
+    for pattern, repl in (
+        (r"(quiz)zes$", r"\1"),
+        (r"(matr|vert|ind)ices$", r"\1ex"),
+        (r"([^aeiouy]|qu)ies$", r"\1y"),
+        (r"(x|ch|ss|sh)es$", r"\1"),
+        (r"(bus|status|alias|address)es$", r"\1"),
+        (r"([lr])ves$", r"\1f"),
+        (r"(ss|us|is)$", r"\1"),
+        (r"s$", ""),
+    ):
+        if re.search(pattern, word, flags=re.IGNORECASE):
+            return re.sub(pattern, repl, word, flags=re.IGNORECASE)
+    return word
+
+
+def pluralize(word: str) -> str:
+    """post → posts, category → categories, person → people."""
+    lower = word.lower()
+    if not lower or lower in _UNCOUNTABLE:
+        return word
+    if lower in _IRREGULAR:
+        return _match_case(word, _IRREGULAR[lower])
+    if lower in _IRREGULAR_PLURAL:
+        return word
+    for pattern, repl in (
+        (r"(quiz)$", r"\1zes"),
+        (r"(matr|vert|ind)(ix|ex)$", r"\1ices"),
+        (r"([^aeiouy]|qu)y$", r"\1ies"),
+        (r"(x|ch|ss|sh|us|bus|alias|status)$", r"\1es"),
+        (r"([lr])f$", r"\1ves"),
+        (r"s$", "s"),
+        (r"$", "s"),
+    ):
+        if re.search(pattern, word, flags=re.IGNORECASE):
+            return re.sub(pattern, repl, word, count=1, flags=re.IGNORECASE)
+    return word
+
+
+def camelize(term: str) -> str:
+    """blog_posts → BlogPosts, admin/users → AdminUsers."""
+    return "".join(part[:1].upper() + part[1:] for part in re.split(r"[_/\s:-]+", term) if part)
+
+
+def underscore(term: str) -> str:
+    """BlogPost → blog_post, Admin::Users → admin/users."""
+    term = term.replace("::", "/")
+    term = re.sub(r"([A-Z]+)([A-Z][a-z])", r"\1_\2", term)
+    term = re.sub(r"([a-z\d])([A-Z])", r"\1_\2", term)
+    return term.replace("-", "_").lower()
+
+
+def classify(table_name: str) -> str:
+    """blog_posts → BlogPost (Rails table name to model class name)."""
+    return camelize(singularize(table_name))
+
+
+def tableize(class_name: str) -> str:
+    """BlogPost → blog_posts."""
+    return pluralize(underscore(class_name))
@@ -0,0 +1,601 @@
+# tools/job_hints.py
+"""
+ActiveJob / ActionMailer → a background task layer in the generated project.
+
+Discovery feeds app/ files into a JobIndex: jobs (ApplicationJob,
+ActiveJob::Base, Sidekiq workers) with their queue, retries and perform
+arguments; mailers with their public methods; and every perform_later /
+perform_async / deliver_later call with the controller action it sits in.
+config.active_job.queue_adapter is read from config/.
+
+The converter lists jobs and mailers in a BACKGROUND JOBS prompt section,
+so the LLM writes them as @task functions in each app's tasks_code and
+enqueues them with .delay() from views. Locally, settings get the
+`background` app and BACKGROUND_TASKS, and the builder writes that app:
+
+    background/tasks.py      @task registry, .delay() / .schedule(), run_task with retries
+    background/backends.py   ThreadBackend (default, in-process, after commit),
+                             DatabaseBackend (+ `manage.py run_tasks` worker),
+                             CeleryBackend, RQBackend, ImmediateBackend
+    background/models.py     Task rows for DatabaseBackend
+
+Switching to Celery or RQ is a settings change:
+    BACKGROUND_TASKS = {"BACKEND": "background.backends.CeleryBackend"}
+"""
+
+import os
+import re
+from pathlib import Path
+from tools import file_tools, inflection, ruby_dsl, routes_compiler, scaffold_clusters
+
+_JOB_CLASS = re.compile(r"^\s*class\s+([\w:]+)\s*<\s*(ApplicationJob|ActiveJob::Base)\b", re.MULTILINE)
+_SIDEKIQ = re.compile(r"^\s*include\s+Sidekiq::(?:Worker|Job)\b", re.MULTILINE)
+_MAILER_CLASS = re.compile(r"^\s*class\s+([\w:]+)\s*<\s*(ApplicationMailer|ActionMailer::Base)\b", re.MULTILINE)
+_ANY_CLASS = re.compile(r"^\s*class\s+([\w:]+)", re.MULTILINE)
+_QUEUE_AS = re.compile(r"^\s*queue_as\s+:?['\"]?(\w+)", re.MULTILINE)
+_SIDEKIQ_OPTIONS = re.compile(r"^\s*sidekiq_options\s+(.*)$", re.MULTILINE)
+_RETRY_ON = re.compile(r"^\s*retry_on\s+(.*)$", re.MULTILINE)
+_PERFORM = re.compile(r"^\s*def\s+perform\s*\(?([^)\n]*)\)?", re.MULTILINE)
+_DEF = re.compile(r"^\s*def\s+(?:self\.)?(\w+[?!]?)\s*\(?([^)\n]*)\)?")
+_PRIVATE = re.compile(r"^\s*(?:private|protected)\s*$")
+_PERFORM_LATER = re.compile(r"\b([A-Z][\w:]*)\s*(?:\.set\(([^)]*)\))?\s*\.(perform_later|perform_async|perform_in|perform_at)\b")
+_DELIVER_LATER = re.compile(
+    r"\b([A-Z][\w:]*Mailer)(?:\.with\([^)]*\))?\.(\w+)(?:\([^()]*(?:\([^()]*\)[^()]*)*\))?\s*\.(deliver_later|deliver_now)\b"
+)
+_QUEUE_ADAPTER = re.compile(r"^\s*config\.active_job\.queue_adapter\s*=\s*:?(\w+)", re.MULTILINE)
+_CLASS_BLOCK = re.compile(r"^class\s+(\w+)\b.*?(?=^\S|\Z)", re.MULTILINE | re.DOTALL)
+
+DEFAULT_BACKEND = "background.backends.ThreadBackend"
+_EXTERNAL_ADAPTERS = {"sidekiq": "CeleryBackend", "resque": "RQBackend", "sneakers": "CeleryBackend",
+                      "good_job": "DatabaseBackend", "delayed_job": "DatabaseBackend", "solid_queue": "DatabaseBackend",
+                      "que": "DatabaseBackend"}
+
+
+def task_name(job: str, method: str | None = None) -> str:
+    """ExportJob → export_job; UserMailer + welcome → user_mailer_welcome."""
+    base = inflection.underscore(job.split("::")[-1])
+    return f"{base}_{method.rstrip('?!')}" if method else base
+
+
+class JobIndex:
+    """Jobs, mailers and enqueue sites found in app/."""
+
+    def __init__(self):
+        self.jobs = {}      # JobClass -> {"file", "queue", "retries", "args", "sidekiq"}
+        self.mailers = {}   # MailerClass -> {"file", "methods": {name: args}}
+        self.enqueues = []  # [{"file", "line", "controller", "action", "kind", "target", "method", "wait", "sync"}]
+
+    def add_file(self, path: str, content: str):
+        norm = path.replace("\\", "/")
+        if not norm.endswith(".rb") or "/app/" not in norm:
+            return
+        job = _JOB_CLASS.search(content)
+        if (job and job.group(1) != "ApplicationJob") or (_SIDEKIQ.search(content) and _ANY_CLASS.search(content)):
+            name = (job or _ANY_CLASS.search(content)).group(1).split("::")[-1]
+            perform = _PERFORM.search(content)
+            retries = None
+            for options in _RETRY_ON.findall(content) + _SIDEKIQ_OPTIONS.findall(content):
+                _, kwargs = ruby_dsl.parse_args(ruby_dsl.strip_comment(options))
+                value = kwargs.get("attempts", kwargs.get("retry"))
+                if isinstance(value, int):
+                    retries = value
+            queue = _QUEUE_AS.search(content)
+            self.jobs[name] = {
+                "file": path,
+                "queue": queue.group(1) if queue else "default",
+                "retries": retries or 0,
+                "args": perform.group(1).strip() if perform else "",
+                "sidekiq": not job,
+            }
+        mailer = _MAILER_CLASS.search(content)
+        if mailer and mailer.group(1) != "ApplicationMailer":
+            methods, public = {}, True
+            for line in content.splitlines():
+                if _PRIVATE.match(line):
+                    public = False
+                d = _DEF.match(line)
+                if d and public and not d.group(1).startswith("_"):
+                    methods[d.group(1)] = d.group(2).strip()
+            self.mailers[mailer.group(1).split("::")[-1]] = {"file": path, "methods": methods}
+        self._scan_enqueues(path, content, scaffold_clusters.controller_path(norm))
+
+    def _scan_enqueues(self, path: str, content: str, controller: str | None):
+        action = None
+        for number, raw in enumerate(content.splitlines(), 1):
+            line = ruby_dsl.strip_comment(raw)
+            d = _DEF.match(line)
+            if d:
+                action = d.group(1)
+            for m in _PERFORM_LATER.finditer(line):
+                _, kwargs = ruby_dsl.parse_args(m.group(2) or "")
+                self.enqueues.append({
+                    "file": path, "line": number, "controller": controller, "action": action if controller else None,
+                    "kind": "job", "target": m.group(1).split("::")[-1], "method": None,
+                    "wait": m.group(3) in ("perform_in", "perform_at") or "wait" in kwargs or "wait_until" in kwargs,
+                    "sync": False,
+                })
+            for m in _DELIVER_LATER.finditer(line):
+                self.enqueues.append({
+                    "file": path, "line": number, "controller": controller, "action": action if controller else None,
+                    "kind": "mail", "target": m.group(1).split("::")[-1], "method": m.group(2), "wait": False,
+                    "sync": m.group(3) == "deliver_now",
+                })
+
+    def summary(self) -> dict:
+        return {"jobs": self.jobs, "mailers": self.mailers, "enqueues": self.enqueues}
+
+
+def import_queue_adapter(input_dir: str) -> str | None:
+    """config.active_job.queue_adapter from production.rb or application.rb."""
+    for rel in ("config/environments/production.rb", "config/application.rb"):
+        path = os.path.join(input_dir, rel)
+        if os.path.isfile(path):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                m = _QUEUE_ADAPTER.search(f.read())
+            if m:
+                return m.group(1)
+    return None
+
+
+# ---------------------------------------------------------------------
+# conversion
+# ---------------------------------------------------------------------
+def has_jobs(hints: dict) -> bool:
+    return bool((hints or {}).get("jobs") or (hints or {}).get("mailers"))
+
+
+def _task_lines(hints: dict) -> dict:
+    """{task function: "Rails call → @task(...) def fn"} for every job and mailer method."""
+    lines = {}
+    for job, info in hints.get("jobs", {}).items():
+        retries = f", retries={info['retries']}" if info["retries"] else ""
+        lines[task_name(job)] = f"{job}.perform({info['args']}) → @task(queue={info['queue']!r}{retries}) def {task_name(job)}"
+    for mailer, info in hints.get("mailers", {}).items():
+        for method, args in info["methods"].items():
+            fn = task_name(mailer, method)
+            lines[fn] = f"{mailer}.{method}({args}) → @task(queue='mailers') def {fn}"
+    return lines
+
+
+def prompt_section(hints: dict) -> str:
+    """BACKGROUND JOBS payload for the blueprint prompt."""
+    if not has_jobs(hints):
+        return ""
+    lines = [f"- {line}" for line in _task_lines(hints).values()]
+    calls = []
+    for site in hints.get("enqueues", []):
+        if not site["controller"] or site["sync"]:
+            continue
+        fn = task_name(site["target"], site["method"])
+        call = f"{fn}.schedule(run_at, ...)" if site["wait"] else f"{fn}.delay(...)"
+        calls.append(f"- {routes_compiler.view_name(site['controller'], site['action'] or '')}: {call}")
+    text = "BACKGROUND JOBS (Rails → task functions in the owning app's tasks_code):\n" + "\n".join(lines) + "\n\n"
+    if calls:
+        text += "ENQUEUED FROM (view: call):\n" + "\n".join(dict.fromkeys(calls)) + "\n\n"
+    return text
+
+
+def missing_tasks(blueprint: dict, hints: dict) -> dict:
+    """
+    {app index: {task function: Rails call}} for jobs and mailer methods no
+    app's tasks_code defines. Each goes to the app whose view enqueues it,
+    else to the app that mentions the Rails class, else to the first app.
+    """
+    apps = blueprint.get("apps", []) or []
+    if not apps or not has_jobs(hints):
+        return {}
+    defined = set()
+    for app in apps:
+        defined.update(re.findall(r"^def\s+(\w+)\s*\(", app.get("tasks_code") or "", flags=re.MULTILINE))
+    missing = {fn: line for fn, line in _task_lines(hints).items() if fn not in defined}
+    owners = {}
+    for site in hints.get("enqueues", []):
+        fn = task_name(site["target"], site["method"])
+        if fn not in missing or fn in owners or not site["controller"]:
+            continue
+        view = routes_compiler.view_name(site["controller"], site["action"] or "")
+        owners[fn] = next((i for i, a in enumerate(apps)
+                           if re.search(rf"^class\s+{view}\b", a.get("views_code") or "", flags=re.MULTILINE)), None)
+    out = {}
+    for fn, line in missing.items():
+        rails_class = line.split(".", 1)[0]
+        owner = owners.get(fn)
+        if owner is None:
+            owner = next((i for i, a in enumerate(apps) if re.search(
+                rf"\b{rails_class}\b", (a.get("views_code") or "") + (a.get("models_code") or "")
+            )), 0)
+        out.setdefault(owner, {})[fn] = line
+    return out
+
+
+def _patch_settings(settings_code: str, backend: str) -> tuple[str, str]:
+    """Add "background" to INSTALLED_APPS and a BACKGROUND_TASKS setting."""
+    action = "unchanged"
+    m = re.search(r"^INSTALLED_APPS\s*=\s*[\[\(]", settings_code, flags=re.MULTILINE)
+    if m and not re.search(r"['\"]background['\"]", settings_code):
+        depth = 0
+        for i in range(m.end() - 1, len(settings_code)):
+            depth += {"[": 1, "(": 1, "]": -1, ")": -1}.get(settings_code[i], 0)
+            if depth == 0:
+                before = settings_code[:i].rstrip()
+                sep = "" if before.endswith((",", "[", "(")) else ","
+                quote = "'" if "'" in settings_code[m.end():i] else '"'
+                settings_code = before + sep + f"\n    {quote}background{quote},\n" + settings_code[i:]
+                action = "patched"
+                break
+    if not re.search(r"^BACKGROUND_TASKS\s*=", settings_code, flags=re.MULTILINE):
+        settings_code = settings_code.rstrip() + (
+            f"\n\nBACKGROUND_TASKS = {{\n    \"BACKEND\": \"{backend}\",\n    \"OPTIONS\": {{\"WORKERS\": 4}},\n}}\n"
+        )
+        action = "patched"
+    return settings_code, action
+
+
+def plan(hints: dict, queue_adapter: str | None) -> dict:
+    return {"hints": hints or {}, "queue_adapter": queue_adapter}
+
+
+def apply_to_blueprint(blueprint: dict, job_plan: dict) -> dict:
+    """Patch settings and report which jobs, mailers and enqueue sites became tasks."""
+    hints, queue_adapter = job_plan["hints"], job_plan["queue_adapter"]
+    report = {"jobs": [], "mailers": [], "enqueues": [], "settings": "skipped", "backend": DEFAULT_BACKEND,
+              "rails_adapter": queue_adapter, "notes": []}
+    if not has_jobs(hints):
+        return report
+    if queue_adapter in _EXTERNAL_ADAPTERS:
+        report["notes"].append(
+            f"Rails used :{queue_adapter}; ThreadBackend runs tasks in-process — switch BACKGROUND_TASKS "
+            f"to background.backends.{_EXTERNAL_ADAPTERS[queue_adapter]} for a separate worker"
+        )
+    if blueprint.get("settings_code"):
+        blueprint["settings_code"], report["settings"] = _patch_settings(blueprint["settings_code"], DEFAULT_BACKEND)
+
+    apps = blueprint.get("apps", []) or []
+    defined = {}
+    for app in apps:
+        for fn in re.findall(r"^def\s+(\w+)\s*\(", app.get("tasks_code") or "", flags=re.MULTILINE):
+            defined.setdefault(fn, app.get("name", "app"))
+
+    for job in hints.get("jobs", {}):
+        fn = task_name(job)
+        report["jobs"].append({"job": job, "task": fn, "app": defined.get(fn), "status": "mapped" if fn in defined else "missing"})
+    for mailer, info in hints.get("mailers", {}).items():
+        for method in info["methods"]:
+            fn = task_name(mailer, method)
+            report["mailers"].append({"mailer": f"{mailer}.{method}", "task": fn, "app": defined.get(fn),
+                                      "status": "mapped" if fn in defined else "missing"})
+
+    views = {}
+    for app in apps:
+        views.update({m.group(1): m.group(0) for m in _CLASS_BLOCK.finditer(app.get("views_code") or "")})
+    for site in hints.get("enqueues", []):
+        fn = task_name(site["target"], site["method"])
+        row = {"file": site["file"], "line": site["line"], "task": fn}
+        if site["sync"]:
+            row["status"] = "sync"
+        elif not site["controller"]:
+            row["status"] = "outside controller"
+        else:
+            view = routes_compiler.view_name(site["controller"], site["action"] or "")
+            row["view"] = view
+            block = views.get(view)
+            if block is None:
+                row["status"] = "view missing"
+            else:
+                row["status"] = "mapped" if re.search(rf"\b{fn}\.(?:delay|schedule)\(", block) else "synchronous"
+        report["enqueues"].append(row)
+    return report
+
+
+# ---------------------------------------------------------------------
+# builder: the background app
+# ---------------------------------------------------------------------
+TASKS_MODULE = '''"""
+Task registry. Decorate a function with @task and call .delay(...) to run it
+in the background, or .schedule(run_at, ...) to run it later; arguments must
+be JSON-serialisable (pass primary keys, not model instances).
+"""
+
+import time
+import logging
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.module_loading import autodiscover_modules, import_string
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+_backend = None
+
+
+class Task:
+    def __init__(self, fn, name, queue, retries):
+        self.fn = fn
+        self.name = name
+        self.queue = queue
+        self.retries = retries
+        self.__doc__ = fn.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.fn(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return get_backend().enqueue(self, list(args), kwargs)
+
+    def schedule(self, run_at, *args, **kwargs):
+        return get_backend().enqueue(self, list(args), kwargs, run_at=run_at)
+
+
+def task(fn=None, *, queue="default", retries=0, name=None):
+    """Register `fn` as a background task."""
+    def register(fn):
+        t = Task(fn, name or f"{fn.__module__}.{fn.__name__}", queue, retries)
+        _registry[t.name] = t
+        return t
+    return register(fn) if fn else register
+
+
+def get_task(name):
+    if name not in _registry:
+        autodiscover_modules("tasks")
+    return _registry[name]
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        config = getattr(settings, "BACKGROUND_TASKS", {})
+        backend_cls = import_string(config.get("BACKEND", "background.backends.ThreadBackend"))
+        _backend = backend_cls(config.get("OPTIONS", {}))
+    return _backend
+
+
+def run_task(name, args, kwargs, attempt=1):
+    """Run a registered task with its retries; used by every backend."""
+    t = get_task(name)
+    close_old_connections()
+    try:
+        return t.fn(*args, **kwargs)
+    except Exception:
+        if attempt > t.retries:
+            logger.exception("Task %s failed after %s attempt(s)", name, attempt)
+            raise
+        logger.warning("Task %s failed (attempt %s), retrying", name, attempt)
+        time.sleep(min(2 ** attempt, 60))
+        return run_task(name, args, kwargs, attempt + 1)
+    finally:
+        close_old_connections()
+
+
+try:
+    # Celery's autodiscovery imports <app>.tasks, so CeleryBackend's entry point lives here
+    from celery import shared_task
+
+    @shared_task(name="background.run")
+    def celery_run(name, args, kwargs):
+        return run_task(name, args, kwargs)
+except ImportError:
+    pass
+'''
+
+BACKENDS_MODULE = '''"""
+Pluggable task backends, selected by settings.BACKGROUND_TASKS["BACKEND"].
+
+ThreadBackend     in-process thread pool (default, no extra services)
+DatabaseBackend   rows in background_task, run by `python manage.py run_tasks`
+CeleryBackend     Celery (OPTIONS: {"APP": "proj.celery.app"} or the current app)
+RQBackend         RQ (OPTIONS: {"URL": "redis://localhost:6379/0"})
+ImmediateBackend  runs tasks synchronously (tests)
+
+Every backend enqueues after the surrounding transaction commits, so tasks
+never see rows that were rolled back.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.db import transaction
+from django.utils import timezone
+from .tasks import run_task
+
+
+class BaseBackend:
+    def __init__(self, options):
+        self.options = options
+
+    def enqueue(self, task, args, kwargs, run_at=None):
+        transaction.on_commit(lambda: self.submit(task, args, kwargs, run_at))
+
+    def submit(self, task, args, kwargs, run_at):
+        raise NotImplementedError
+
+
+class ImmediateBackend(BaseBackend):
+    def enqueue(self, task, args, kwargs, run_at=None):
+        return run_task(task.name, args, kwargs)
+
+
+class ThreadBackend(BaseBackend):
+    def __init__(self, options):
+        super().__init__(options)
+        self.executor = ThreadPoolExecutor(max_workers=options.get("WORKERS", 4), thread_name_prefix="task")
+
+    def submit(self, task, args, kwargs, run_at):
+        delay = (run_at - timezone.now()).total_seconds() if run_at else 0
+        if delay > 0:
+            timer = threading.Timer(delay, self.executor.submit, (run_task, task.name, args, kwargs))
+            timer.daemon = True
+            timer.start()
+        else:
+            self.executor.submit(run_task, task.name, args, kwargs)
+
+
+class DatabaseBackend(BaseBackend):
+    def enqueue(self, task, args, kwargs, run_at=None):
+        from .models import Task
+        return Task.objects.create(
+            name=task.name, queue=task.queue, args=args, kwargs=kwargs, run_at=run_at or timezone.now()
+        )
+
+
+class CeleryBackend(BaseBackend):
+    def submit(self, task, args, kwargs, run_at):
+        from celery import current_app
+        app = current_app
+        if self.options.get("APP"):
+            from django.utils.module_loading import import_string
+            app = import_string(self.options["APP"])
+        app.send_task("background.run", args=[task.name, args, kwargs], queue=task.queue, eta=run_at)
+
+
+class RQBackend(BaseBackend):
+    def submit(self, task, args, kwargs, run_at):
+        from redis import Redis
+        from rq import Queue
+        queue = Queue(task.queue, connection=Redis.from_url(self.options.get("URL", "redis://localhost:6379/0")))
+        if run_at:
+            queue.enqueue_at(run_at, run_task, task.name, args, kwargs)
+        else:
+            queue.enqueue(run_task, task.name, args, kwargs)
+
+'''
+
+MODELS_MODULE = '''from django.db import models
+
+
+class Task(models.Model):
+    name = models.CharField(max_length=255)
+    queue = models.CharField(max_length=100, default="default")
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, default="queued")
+    run_at = models.DateTimeField(db_index=True)
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "background_task"
+        indexes = [models.Index(fields=["status", "queue", "run_at"], name="background_task_due_idx")]
+'''
+
+MIGRATION = '''from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Task",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=255)),
+                ("queue", models.CharField(default="default", max_length=100)),
+                ("args", models.JSONField(default=list)),
+                ("kwargs", models.JSONField(default=dict)),
+                ("status", models.CharField(default="queued", max_length=20)),
+                ("run_at", models.DateTimeField(db_index=True)),
+                ("attempts", models.IntegerField(default=0)),
+                ("last_error", models.TextField(blank=True, default="")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={"db_table": "background_task"},
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["status", "queue", "run_at"], name="background_task_due_idx"),
+        ),
+    ]
+'''
+
+WORKER_COMMAND = '''import time
+import traceback
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from background.models import Task
+from background.tasks import _registry, get_task
+
+
+class Command(BaseCommand):
+    help = "Run tasks queued by background.backends.DatabaseBackend."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queue", action="append", help="only these queues (repeatable)")
+        parser.add_argument("--once", action="store_true", help="exit when no task is due")
+        parser.add_argument("--sleep", type=float, default=1.0)
+
+    def _claim(self, queues):
+        with transaction.atomic():
+            due = Task.objects.select_for_update(skip_locked=True).filter(status="queued", run_at__lte=timezone.now())
+            if queues:
+                due = due.filter(queue__in=queues)
+            row = due.order_by("run_at").first()
+            if row:
+                row.status, row.attempts = "running", row.attempts + 1
+                row.save(update_fields=["status", "attempts"])
+            return row
+
+    def handle(self, *args, queue=None, once=False, sleep=1.0, **options):
+        while True:
+            row = self._claim(queue)
+            if row is None:
+                if once:
+                    return
+                time.sleep(sleep)
+                continue
+            try:
+                get_task(row.name).fn(*row.args, **row.kwargs)
+                row.status = "done"
+            except Exception:
+                row.last_error = traceback.format_exc()
+                retries = get_task(row.name).retries if row.name in _registry else 0
+                row.status = "queued" if row.attempts <= retries else "failed"
+                row.run_at = timezone.now() + timedelta(seconds=min(2 ** row.attempts, 300))
+            row.save(update_fields=["status", "last_error", "run_at"])
+'''
+
+APPS_MODULE = '''from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class BackgroundConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "background"
+
+    def ready(self):
+        # Register every app's @task functions (tasks.py)
+        autodiscover_modules("tasks")
+'''
+
+
+def task_layer_files() -> dict:
+    return {
+        "background/__init__.py": "",
+        "background/apps.py": APPS_MODULE,
+        "background/tasks.py": TASKS_MODULE,
+        "background/backends.py": BACKENDS_MODULE,
+        "background/models.py": MODELS_MODULE,
+        "background/migrations/__init__.py": "",
+        "background/migrations/0001_initial.py": MIGRATION,
+        "background/management/__init__.py": "",
+        "background/management/commands/__init__.py": "",
+        "background/management/commands/run_tasks.py": WORKER_COMMAND,
+    }
+
+
+def write_task_layer(project_root, blueprint: dict, hints: dict) -> list[str]:
+    """Write the background app when the Rails app had jobs/mailers or any app has tasks_code."""
+    if not has_jobs(hints) and not any(a.get("tasks_code") for a in blueprint.get("apps", [])):
+        return []
+    written = []
+    for rel, content in task_layer_files().items():
+        path = Path(project_root) / rel
+        file_tools.write_file(str(path), content)
+        written.append(str(path))
+    return written
@@ -0,0 +1,28 @@
+# tools/llm_utils.py
+"""
+Thin wrapper around OpenAI chat completions that records every call
+(prompt hash, latency, token usage) in the structured event log.
+"""
+
+import time
+from tools import log_utils
+
+
+def chat(client, node: str, model: str, messages: list[dict], log_fields: dict | None = None, **kwargs):
+    """
+    Call client.chat.completions.create and log the call as an `llm_call` event.
+    `log_fields` are extra keys stored on the event (e.g. the template name).
+    """
+    log_fields = log_fields or {}
+    started = time.perf_counter()
+    try:
+        response = client.chat.completions.create(model=model, messages=messages, **kwargs)
+    except Exception as e:
+        log_utils.record_llm_call(
+            node, model, messages, duration_ms=(time.perf_counter() - started) * 1000, error=e, **log_fields
+        )
+        raise
+    log_utils.record_llm_call(
+        node, model, messages, response, duration_ms=(time.perf_counter() - started) * 1000, **log_fields
+    )
+    return response
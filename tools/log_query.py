@@ -0,0 +1,118 @@
+# tools/log_query.py
+"""
+Query the append-only event log written by log_utils.EventLog.
+
+Examples:
+    python -m tools.log_query out_django/logs/events.jsonl --kind llm_call --min-ms 2000
+    python -m tools.log_query out_django/logs/events.jsonl.zst --node converter_node --summary
+"""
+
+import io
+import argparse
+import orjson
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+
+def iter_events(path: str):
+    """Yield events from a .jsonl or multi-frame .jsonl.zst log."""
+    with open(path, "rb") as raw:
+        if path.endswith(".zst"):
+            import zstandard
+            reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+            stream = io.BufferedReader(reader)
+        else:
+            stream = raw
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError:
+                # A torn last line from an interrupted run
+                continue
+
+
+def filter_events(events, node=None, kind=None, min_ms=None, max_ms=None, model=None):
+    """Filter events by node, kind, model and duration_ms bounds."""
+    for e in events:
+        if node and e.get("node") != node:
+            continue
+        if kind and e.get("kind") != kind:
+            continue
+        if model and e.get("model") != model:
+            continue
+        duration = e.get("duration_ms")
+        if min_ms is not None and (duration is None or duration < min_ms):
+            continue
+        if max_ms is not None and (duration is None or duration > max_ms):
+            continue
+        yield e
+
+
+def summarize(events) -> dict:
+    """Aggregate llm_call events per node: calls, total/max latency, tokens (incl. cached prompt tokens)."""
+    per_node = {}
+    for e in events:
+        if e.get("kind") != "llm_call":
+            continue
+        row = per_node.setdefault(e.get("node"), {
+            "calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0,
+            "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0,
+        })
+        row["calls"] += 1
+        row["errors"] += int("error" in e)
+        row["total_ms"] += e.get("duration_ms") or 0.0
+        row["max_ms"] = max(row["max_ms"], e.get("duration_ms") or 0.0)
+        row["prompt_tokens"] += e.get("prompt_tokens") or 0
+        row["completion_tokens"] += e.get("completion_tokens") or 0
+        row["cached_tokens"] += e.get("cached_tokens") or 0
+    return per_node
+
+
+def _print_summary(per_node: dict):
+    table = Table(title="LLM calls per node", header_style="bold magenta")
+    for col in ("Node", "Calls", "Errors", "Total s", "Max s", "Prompt tok", "Cached tok", "Completion tok"):
+        table.add_column(col, style="cyan" if col == "Node" else "green")
+    for node, row in sorted(per_node.items(), key=lambda kv: -kv[1]["total_ms"]):
+        table.add_row(
+            str(node), str(row["calls"]), str(row["errors"]),
+            f"{row['total_ms'] / 1000:.1f}", f"{row['max_ms'] / 1000:.1f}",
+            str(row["prompt_tokens"]),
+            f"{row['cached_tokens']} ({row['cached_tokens'] / max(row['prompt_tokens'], 1):.0%})",
+            str(row["completion_tokens"]),
+        )
+    console.print(table)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Filter the structured conversion event log.")
+    parser.add_argument("path", help="events.jsonl or events.jsonl.zst")
+    parser.add_argument("--node")
+    parser.add_argument("--kind")
+    parser.add_argument("--model")
+    parser.add_argument("--min-ms", type=float)
+    parser.add_argument("--max-ms", type=float)
+    parser.add_argument("--summary", action="store_true", help="aggregate llm_call events per node")
+    parser.add_argument("--bodies", action="store_true", help="include prompt/response bodies")
+    args = parser.parse_args(argv)
+
+    events = filter_events(
+        iter_events(args.path), node=args.node, kind=args.kind,
+        min_ms=args.min_ms, max_ms=args.max_ms, model=args.model,
+    )
+    if args.summary:
+        _print_summary(summarize(events))
+        return
+    for e in events:
+        if not args.bodies:
+            e.pop("messages", None)
+            e.pop("response", None)
+        print(orjson.dumps(e).decode())
+
+
+if __name__ == "__main__":
+    main()
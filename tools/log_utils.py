@@ -1,22 +1,188 @@
-import json, os, datetime
+import os, datetime, queue, atexit, hashlib, threading
+import orjson
 
-def log_state(node, state_subset, path):
+_ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _now():
+    return datetime.datetime.now().isoformat()
+
+
+def _dumps(obj, indent=False) -> bytes:
+    opts = _ORJSON_OPTS | (orjson.OPT_INDENT_2 if indent else 0)
+    return orjson.dumps(obj, default=str, option=opts)
+
+
+class EventLog:
+    """
+    Append-only JSONL event log written from a background thread.
+
+    Callers only serialize and enqueue; file I/O (and optional zstd compression)
+    happens on the writer thread. Each drained batch is written as its own zstd
+    frame, so the file stays readable even if the process dies mid-run.
+    """
+
+    _STOP = object()
+
+    def __init__(self, path: str, compress: bool | None = None):
+        self.path = path
+        self.compress = path.endswith(".zst") if compress is None else compress
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="event-log-writer", daemon=True)
+        self._thread.start()
+
+    def emit(self, event: dict):
+        """Queue one event (a JSON-serialisable dict) for appending."""
+        if self._closed:
+            return
+        event.setdefault("ts", _now())
+        self._queue.put(("event", _dumps(event) + b"\n"))
+
+    def write_file(self, path: str, data: bytes):
+        """Queue a whole-file write (used for per-node debug snapshots)."""
+        if self._closed:
+            _write_bytes(path, data)
+            return
+        self._queue.put(("file", (path, data)))
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def _run(self):
+        with open(self.path, "ab") as raw:
+            writer = None
+            if self.compress:
+                import zstandard
+                writer = zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=False)
+            stop = False
+            while not stop:
+                items = [self._queue.get()]
+                while True:
+                    try:
+                        items.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                lines = []
+                for item in items:
+                    if item is self._STOP:
+                        stop = True
+                        continue
+                    kind, payload = item
+                    if kind == "event":
+                        lines.append(payload)
+                    else:
+                        try:
+                            _write_bytes(*payload)
+                        except Exception as e:
+                            print(f"⚠️ Failed to write log file {payload[0]}: {e}")
+                if not lines:
+                    continue
+                if writer is not None:
+                    writer.write(b"".join(lines))
+                    writer.flush(zstandard.FLUSH_FRAME)
+                else:
+                    raw.write(b"".join(lines))
+                    raw.flush()
+
+
+_event_log: EventLog | None = None
+
+
+def open_event_log(logs_dir: str, compress: bool | None = None) -> EventLog:
+    """Start the process-wide event log under logs_dir (events.jsonl[.zst])."""
+    global _event_log
+    if _event_log is not None:
+        return _event_log
+    if compress is None:
+        compress = os.getenv("EVENT_LOG_COMPRESS", "0") == "1"
+    name = "events.jsonl.zst" if compress else "events.jsonl"
+    _event_log = EventLog(os.path.join(logs_dir, name), compress=compress)
+    atexit.register(close_event_log)
+    return _event_log
+
+
+def close_event_log():
+    """Flush and stop the background writer."""
+    global _event_log
+    if _event_log is not None:
+        _event_log.close()
+        _event_log = None
+
+
+def log_event(node, kind, **fields):
+    """Append a structured event; a no-op when no event log is open."""
+    if _event_log is None:
+        return
+    _event_log.emit({"node": node, "kind": kind, **fields})
+
+
+def prompt_hash(model, messages) -> str:
+    """Stable short hash identifying a prompt (model + messages)."""
+    return hashlib.sha256(_dumps({"model": model, "messages": messages})).hexdigest()[:16]
+
+
+def _write_bytes(path, data):
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w") as f:
-        json.dump({
-            "timestamp": datetime.datetime.now().isoformat(),
-            "node": node,
-            "state": state_subset
-        }, f, indent=2)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _write(path, obj):
+    data = _dumps(obj, indent=True)
+    if _event_log is not None:
+        _event_log.write_file(path, data)
+    else:
+        _write_bytes(path, data)
+
+
+def log_state(node, state_subset, path):
+    _write(path, {
+        "timestamp": _now(),
+        "node": node,
+        "state": state_subset
+    })
+    keys = list(state_subset.keys()) if isinstance(state_subset, dict) else None
+    log_event(node, "state", path=path, keys=keys)
     return {"logged": True, "path": path}
 
 def log_llm_call(node, prompt, response, path):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w") as f:
-        json.dump({
-            "node": node,
-            "prompt": prompt,
-            "response": response,
-            "timestamp": datetime.datetime.now().isoformat()
-        }, f, indent=2)
+    _write(path, {
+        "node": node,
+        "prompt": prompt,
+        "response": response,
+        "timestamp": _now()
+    })
     return {"logged": True, "path": path}
+
+
+def record_llm_call(node, model, messages, response=None, duration_ms=0.0, error=None, **extra):
+    """Append an `llm_call` event with prompt hash, latency and token usage."""
+    usage = getattr(response, "usage", None)
+    details = getattr(usage, "prompt_tokens_details", None)
+    choice = response.choices[0] if response is not None and getattr(response, "choices", None) else None
+    event = {
+        "model": model,
+        "prompt_hash": prompt_hash(model, messages),
+        # Everything but the last (variable) message: equal hashes mean a cacheable prefix
+        "prefix_hash": prompt_hash(model, messages[:-1]),
+        "prompt_chars": sum(len(str(m.get("content", ""))) for m in messages),
+        "duration_ms": round(duration_ms, 1),
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+        "total_tokens": getattr(usage, "total_tokens", None),
+        "cached_tokens": getattr(details, "cached_tokens", None),
+        "finish_reason": getattr(choice, "finish_reason", None),
+        **extra,
+    }
+    if error is not None:
+        event["error"] = str(error)
+    if os.getenv("EVENT_LOG_BODIES", "1") != "0":
+        event["messages"] = messages
+        event["response"] = choice.message.content if choice is not None else None
+    log_event(node, "llm_call", **event)
@@ -0,0 +1,193 @@
+# tools/model_router.py
+"""
+Complexity-based model routing.
+
+Each unit (template, Ruby file, batch of files) is scored locally on size,
+ERB control-flow density, metaprogramming markers and association count.
+Units under every threshold go to the fast tier, anything else to the
+strong tier. If the fast tier's output fails validation, the call is
+retried once on the strong tier (an escalation).
+
+    MODEL_ROUTING=0                 disable routing (every call uses its strong model)
+    ROUTER_FAST_MODEL=gpt-4o-mini
+    ROUTER_STRONG_MODEL=gpt-4o      (call sites may pass their own strong model)
+    ROUTER_THRESHOLDS='{"max_lines": 200, "max_meta": 1}'
+
+Latency, tokens, cost and escalation rate per tier are available from
+report() and are written to the conversion summary by integration_node.
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from tools import estimator, log_utils
+
+FAST_MODEL = os.getenv("ROUTER_FAST_MODEL", "gpt-4o-mini")
+STRONG_MODEL = os.getenv("ROUTER_STRONG_MODEL", "gpt-4o")
+
+THRESHOLDS = {
+    "max_lines": 120,
+    "max_chars": 6000,
+    "max_control": 12,
+    "max_control_density": 0.2,   # control-flow tags per line
+    "max_meta": 0,
+    "max_associations": 5,
+}
+
+_ERB_CONTROL = re.compile(
+    r"<%-?\s*(?:if|unless|elsif|else|case|when|for|while|until)\b"
+    r"|\.(?:each|each_with_index|map|times|each_slice)\b"
+    r"|\bdo\s*(?:\|[^|]*\|)?\s*-?%>"
+)
+_RUBY_CONTROL = re.compile(r"^\s*(?:if|unless|elsif|case|when|while|until|rescue)\b|\bdo\s*(?:\|[^|]*\|)?\s*$", re.MULTILINE)
+_META = re.compile(
+    r"\b(?:define_method|method_missing|respond_to_missing\?|instance_variable_[gs]et|class_eval|instance_eval"
+    r"|module_eval|const_get|delegate_missing_to|class_methods\s+do|included\s+do)\b"
+    r"|\.(?:public_)?send\(|\b(?:Module|Class)\.new\b"
+)
+_ASSOC = re.compile(r"^\s*(?:belongs_to|has_many|has_one|has_and_belongs_to_many)\b", re.MULTILINE)
+
+_lock = threading.Lock()
+_stats = {}
+
+
+def enabled() -> bool:
+    return os.getenv("MODEL_ROUTING", "1") != "0"
+
+
+def thresholds() -> dict:
+    limits = dict(THRESHOLDS)
+    override = os.getenv("ROUTER_THRESHOLDS")
+    if override:
+        try:
+            limits.update(json.loads(override))
+        except json.JSONDecodeError:
+            print("⚠️ ROUTER_THRESHOLDS is not valid JSON, using defaults")
+    return limits
+
+
+def features(text: str, name: str = "") -> dict:
+    """Local complexity features of one unit."""
+    text = text or ""
+    lines = text.count("\n") + 1 if text else 0
+    erb = name.endswith((".erb", ".haml")) or "<%" in text
+    control = len((_ERB_CONTROL if erb else _RUBY_CONTROL).findall(text))
+    return {
+        "lines": lines,
+        "chars": len(text),
+        "control": control,
+        "control_density": round(control / lines, 3) if lines else 0.0,
+        "meta": len(_META.findall(text)),
+        "associations": len(_ASSOC.findall(text)),
+    }
+
+
+def classify(units: list[tuple[str, str]], limits: dict | None = None) -> dict:
+    """Route a list of (name, text) units: fast only if every unit is under every threshold."""
+    limits = limits or thresholds()
+    reasons = []
+    for name, text in units:
+        f = features(text, name)
+        for key in ("lines", "chars", "control", "control_density", "meta", "associations"):
+            if f[key] > limits[f"max_{key}"]:
+                reasons.append(f"{name or 'unit'}: {key}={f[key]}")
+    return {"tier": "strong" if reasons else "fast", "reasons": reasons[:5]}
+
+
+def _record(tier: str, model: str, response, duration_ms: float):
+    usage = getattr(response, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    price = estimator.prices().get(model, {"input": 0.0, "output": 0.0})
+    cost = prompt_tokens / 1e6 * price["input"] + completion_tokens / 1e6 * price["output"]
+    with _lock:
+        row = _stats.setdefault(tier, {
+            "models": [], "calls": 0, "escalations": 0, "total_ms": 0.0,
+            "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0,
+        })
+        if model not in row["models"]:
+            row["models"].append(model)
+        row["calls"] += 1
+        row["total_ms"] += duration_ms
+        row["prompt_tokens"] += prompt_tokens
+        row["completion_tokens"] += completion_tokens
+        row["cost_usd"] += cost
+
+
+def run(kind: str, units: list[tuple[str, str]], call, parse, validate, strong_model: str | None = None):
+    """
+    Route and execute one LLM task.
+
+    call(model) -> response, parse(response) -> value, validate(value) -> bool.
+    The fast tier's value is returned only if it validates; otherwise the task
+    is re-run on the strong tier and that value is returned as is.
+    """
+    strong_model = strong_model or STRONG_MODEL
+    decision = classify(units) if enabled() else {"tier": "strong", "reasons": ["routing disabled"]}
+    attempts = [("fast", FAST_MODEL), ("strong", strong_model)] if decision["tier"] == "fast" else [("strong", strong_model)]
+
+    value = None
+    for n, (tier, model) in enumerate(attempts):
+        started = time.perf_counter()
+        response = call(model)
+        duration_ms = (time.perf_counter() - started) * 1000
+        _record(tier, model, response, duration_ms)
+        value = parse(response)
+        if tier == "strong" or validate(value):
+            log_utils.log_event(
+                "model_router", "route", task=kind, tier=tier, model=model,
+                escalated=n > 0, reasons=decision["reasons"], units=len(units),
+            )
+            return value
+        with _lock:
+            _stats["fast"]["escalations"] += 1
+        print(f"↗️ {kind}: fast-tier output failed validation, escalating to {strong_model}")
+    return value
+
+
+def report() -> dict:
+    """Per-tier calls, latency, tokens, cost and escalation rate."""
+    with _lock:
+        out = {}
+        for tier, row in _stats.items():
+            calls = row["calls"] or 1
+            out[tier] = {
+                "models": list(row["models"]),
+                "calls": row["calls"],
+                "escalations": row["escalations"],
+                "escalation_rate": round(row["escalations"] / calls, 3),
+                "avg_latency_ms": round(row["total_ms"] / calls, 1),
+                "prompt_tokens": row["prompt_tokens"],
+                "completion_tokens": row["completion_tokens"],
+                "cost_usd": round(row["cost_usd"], 4),
+            }
+        return out
+
+
+# ---------------------------------------------------------------------
+# validators
+# ---------------------------------------------------------------------
+_BLOCK_TAGS = ("for", "if", "block", "with", "comment", "spaceless", "filter", "autoescape", "cache")
+
+
+def valid_template(text) -> bool:
+    """Converted Django template: no ERB left over, no fences, balanced block tags."""
+    if not isinstance(text, str) or not text.strip():
+        return False
+    if "<%" in text or "%>" in text or text.lstrip().startswith("```"):
+        return False
+    for tag in _BLOCK_TAGS:
+        opened = len(re.findall(r"{%-?\s*" + tag + r"\b", text))
+        closed = len(re.findall(r"{%-?\s*end" + tag + r"\b", text))
+        if opened != closed:
+            return False
+    return True
+
+
+def valid_json_keys(*keys):
+    """Validator for JSON-object outputs that must carry `keys` (and no parse error)."""
+    def check(value) -> bool:
+        return isinstance(value, dict) and "error" not in value and all(k in value for k in keys)
+    return check
@@ -0,0 +1,663 @@
+# tools/orm_hints.py
+"""
+Rails eager loading, counter caches and scopes → N+1-safe Django ORM code.
+
+Discovery feeds every model and controller into an OrmIndex, which records
+associations (class_name / foreign_key / through / counter_cache), one-line
+scopes and each includes / preload / eager_load call with its receiver
+model and, in controllers, the enclosing action. Conversion then:
+
+- resolves each eager-load path through the association graph: chains of
+  belongs_to (and has_one backed by a unique key) become select_related,
+  anything crossing a has_many becomes prefetch_related. The Rails has_many
+  name is set as the child foreign key's related_name, so lookups and
+  templates keep the Rails accessor names;
+- injects the resulting querysets into the view classes routed to those
+  controller actions;
+- adds foreign keys that associations name through class_name / foreign_key
+  (schema_importer only infers them from column names);
+- adds counter_cache columns and signal handlers that keep them up to date
+  with F() updates on create, delete and foreign key reassignment;
+- turns translatable scopes into a per-model QuerySet used as the default
+  manager, plus a with_related() method holding the model's eager loads.
+
+Every eager load ends up in the report, either mapped (and where) or
+dropped (and why). Counter caches and scopes are only generated when the
+models come from the Rails schema (schema_importer).
+"""
+
+import re
+import copy
+from tools import inflection, ruby_dsl, routes_compiler, schema_importer, scaffold_clusters
+
+_MODEL_CLASS = re.compile(r"^\s*class\s+([\w:]+)\s*<\s*([\w:]+)", re.MULTILINE)
+_ASSOC = re.compile(r"^\s*(belongs_to|has_many|has_one|has_and_belongs_to_many)\s+:(\w+)(.*)$")
+_LAMBDA = re.compile(r"->\s*(?:\([^)]*\))?\s*\{.*?\}|lambda\s*\{.*?\}")
+_SCOPE = re.compile(r"^\s*scope\s+:(\w+)\s*,\s*->\s*(?:\(([^)]*)\))?\s*\{(.*)\}\s*$")
+_SCOPE_ANY = re.compile(r"^\s*scope\s+:(\w+)")
+_DEF = re.compile(r"^\s*def\s+(?:self\.)?(\w+[?!]?)")
+_EAGER = re.compile(r"\b(includes|preload|eager_load)\s*\(")
+_CONSTANT = re.compile(r"\b([A-Z]\w*(?:::[A-Z]\w*)*)\s*\.")
+_CHAIN_TOKEN = re.compile(r"@?(\w+)(?:\([^()]*\))?\s*\.")
+_IDENT = re.compile(r"[a-z_]\w*(?:\.\w+)?")
+
+
+def _balanced(text: str, start: int) -> str | None:
+    """Content of the parenthesis opening at text[start]."""
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == "(":
+            depth += 1
+        elif text[i] == ")":
+            depth -= 1
+            if depth == 0:
+                return text[start + 1:i]
+    return None
+
+
+def eager_paths(args_text: str) -> list[str]:
+    """`:author, comments: [:likes, { user: :profile }]` → ["author", "comments", "comments.likes", ...]."""
+    args, kwargs = ruby_dsl.parse_args(args_text)
+    out = []
+
+    def walk(value, prefix):
+        if isinstance(value, str):
+            out.append(prefix + value)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item, prefix)
+        elif isinstance(value, dict) and "__raw__" not in value:
+            for key, sub in value.items():
+                out.append(prefix + key)
+                walk(sub, prefix + key + ".")
+
+    walk(args, "")
+    walk(kwargs, "")
+    return list(dict.fromkeys(out))
+
+
+class OrmIndex:
+    """Associations, scopes and eager loads collected from app/models and app/controllers."""
+
+    def __init__(self):
+        self.models = {}       # Model -> {"path", "associations": {name: {...}}, "scopes": [...]}
+        self.eager_loads = []  # [{"file", "line", "method", "paths", "receiver", "chain", "model_file", ...}]
+
+    def add_file(self, path: str, content: str):
+        norm = path.replace("\\", "/")
+        if "/app/models/" in norm:
+            self._add_model(path, content)
+        elif "/app/controllers/" in norm:
+            self._scan_eager(path, content, controller=scaffold_clusters.controller_path(norm))
+
+    def _add_model(self, path: str, content: str):
+        m = _MODEL_CLASS.search(content)
+        if not m or m.group(1) == "ApplicationRecord":
+            return
+        name = m.group(1).split("::")[-1]
+        model = self.models.setdefault(name, {"path": path, "associations": {}, "scopes": []})
+        for line in content.splitlines():
+            line = ruby_dsl.strip_comment(line)
+            a = _ASSOC.match(line)
+            if a:
+                kind, assoc, rest = a.groups()
+                scoped = bool(_LAMBDA.search(rest))
+                rest = _LAMBDA.sub("", rest).strip().lstrip(",")
+                _, opts = ruby_dsl.parse_args(rest)
+                model["associations"][assoc] = {
+                    "kind": kind,
+                    "target": str(opts.get("class_name") or "").split("::")[-1] or (
+                        inflection.camelize(assoc) if kind in ("belongs_to", "has_one") else inflection.classify(assoc)
+                    ),
+                    "foreign_key": opts.get("foreign_key") if isinstance(opts.get("foreign_key"), str) else None,
+                    "through": opts.get("through") if isinstance(opts.get("through"), str) else None,
+                    "source": opts.get("source") if isinstance(opts.get("source"), str) else None,
+                    "counter_cache": opts.get("counter_cache") if isinstance(opts.get("counter_cache"), (bool, str)) else None,
+                    "polymorphic": bool(opts.get("polymorphic") or opts.get("as")),
+                    "scoped": scoped,
+                }
+                continue
+            s = _SCOPE.match(line)
+            if s:
+                params = [p.strip().split("=")[0].strip() for p in (s.group(2) or "").split(",") if p.strip()]
+                model["scopes"].append({"name": s.group(1), "params": params, "body": s.group(3).strip()})
+            elif _SCOPE_ANY.match(line):
+                model["scopes"].append({"name": _SCOPE_ANY.match(line).group(1), "params": [], "body": None})
+        self._scan_eager(path, content, model_file=name)
+
+    def _scan_eager(self, path: str, content: str, controller: str | None = None, model_file: str | None = None):
+        action = None
+        for number, raw in enumerate(content.splitlines(), 1):
+            line = ruby_dsl.strip_comment(raw)
+            d = _DEF.match(line)
+            if d:
+                action = d.group(1)
+            scope = _SCOPE_ANY.match(line)
+            for m in _EAGER.finditer(line):
+                args = _balanced(line, m.end() - 1)
+                if args is None:
+                    continue
+                prefix = line[:m.start()]
+                constants = _CONSTANT.findall(prefix)
+                self.eager_loads.append({
+                    "file": path,
+                    "line": number,
+                    "method": m.group(1),
+                    "paths": eager_paths(args),
+                    "receiver": constants[-1].split("::")[-1] if constants else None,
+                    "chain": _CHAIN_TOKEN.findall(prefix),
+                    "controller": controller,
+                    "action": action if controller else None,
+                    "model_file": model_file,
+                    "scope": scope.group(1) if scope else None,
+                })
+
+    def summary(self) -> dict:
+        return {"models": self.models, "eager_loads": self.eager_loads}
+
+
+# ---------------------------------------------------------------------
+# resolution
+# ---------------------------------------------------------------------
+def _receiver(load: dict, models: dict) -> tuple[str | None, bool]:
+    """(model, guessed) for an eager-load call."""
+    if load.get("receiver") in models:
+        return load["receiver"], False
+    for token in reversed(load.get("chain") or []):
+        guess = inflection.classify(token)
+        if guess in models:
+            return guess, True
+    if load.get("model_file"):
+        return load["model_file"], False
+    if load.get("controller"):
+        guess = inflection.classify(load["controller"].split("/")[-1])
+        if guess in models:
+            return guess, True
+    return None, True
+
+
+class _Resolver:
+    """Association paths → Django lookups, collecting the related_names they rely on."""
+
+    def __init__(self, models: dict, schema: dict):
+        self.models = models
+        self.tables = (schema or {}).get("tables", {})
+        self.related_names = {}   # child Model -> {fk field name: related_name}
+        self._fks = {}
+
+    def _table(self, model: str) -> dict | None:
+        return self.tables.get(inflection.tableize(model))
+
+    def foreign_keys(self, model: str) -> dict:
+        """{column: to_table} of the FK fields schema_importer generates for the model's table."""
+        if model not in self._fks:
+            table = self._table(model)
+            app_of = {m: "_" for m in schema_importer.model_tables({"tables": self.tables})}
+            gen = schema_importer._ModelGen(table, self.tables, app_of, "_") if table else None
+            self._fks[model] = {c: fk["to_table"] for c, fk in gen.fk_columns.items()} if gen else {}
+        return self._fks[model]
+
+    def _fk_column(self, owner: str, assoc: dict) -> str:
+        return assoc["foreign_key"] or f"{inflection.underscore(owner).split('/')[-1]}_id"
+
+    def _unique(self, model: str, column: str) -> bool:
+        table = self._table(model)
+        return bool(table) and any(
+            i["unique"] and i["columns"] == [column] and not i.get("where") for i in table["indexes"]
+        )
+
+    def _step(self, owner: str, name: str) -> tuple[list[tuple[str, bool, str]], str | None]:
+        """[(django_name, single_valued, target)] for one Rails association, or ([], reason)."""
+        assoc = self.models.get(owner, {}).get("associations", {}).get(name)
+        if owner not in self.models:
+            return [], f"unknown model {owner}"
+        if not assoc:
+            return [], f"{owner} has no association :{name}"
+        if assoc["polymorphic"]:
+            return [], f"{owner}.{name} is polymorphic (kept as *_type/*_id columns)"
+        if assoc["scoped"]:
+            return [], f"{owner}.{name} is a scoped association (needs a Prefetch() queryset)"
+        if assoc["kind"] == "has_and_belongs_to_many":
+            return [], f"{owner}.{name} is has_and_belongs_to_many (join table has no model)"
+        if assoc["through"]:
+            first, reason = self._step(owner, assoc["through"])
+            if not first:
+                return [], reason
+            source = assoc["source"] or name
+            mid = first[-1][2]
+            second, reason = self._step(mid, source)
+            if not second and source == name:
+                second, reason = self._step(mid, inflection.singularize(name))
+            return (first + second, None) if second else ([], reason)
+        target = assoc["target"]
+        if assoc["kind"] == "belongs_to":
+            column = assoc["foreign_key"] or f"{name}_id"
+            if self._table(owner) and column not in self.foreign_keys(owner):
+                return [], f"{self._table(owner)['name']}.{column} is not a foreign key in the schema"
+            if self._table(owner) and self._table(target) and self.foreign_keys(owner)[column] != self._table(target)["name"]:
+                return [], f"{self._table(owner)['name']}.{column} references {self.foreign_keys(owner)[column]}, not {target}"
+            return [(column[:-3] if column.endswith("_id") else column, True, target)], None
+        # has_many / has_one: reverse accessor of the child's foreign key
+        column = self._fk_column(owner, assoc)
+        field = column[:-3] if column.endswith("_id") else column
+        if self._table(target) and column not in self.foreign_keys(target):
+            return [], f"{self._table(target)['name']}.{column} is not a foreign key in the schema"
+        if self._table(target):
+            taken = self.related_names.setdefault(target, {})
+            if taken.get(field, name) != name:
+                return [], f"{owner}.{name} shares {target}.{field} with :{taken[field]}"
+            taken[field] = name
+            accessor = name
+        else:
+            accessor = f"{target.lower()}_set" if assoc["kind"] == "has_many" else target.lower()
+        single = assoc["kind"] == "has_one" and self._unique(target, column)
+        return [(accessor, single, target)], None
+
+    def lookup(self, model: str, path: str) -> tuple[str | None, bool, str | None]:
+        """("a__b", select_related?, None) or (None, False, reason)."""
+        parts, single, owner = [], True, model
+        for name in path.split("."):
+            steps, reason = self._step(owner, name)
+            if not steps:
+                return None, False, reason
+            for django_name, one, target in steps:
+                parts.append(django_name)
+                single = single and one
+                owner = target
+        return "__".join(parts), single, None
+
+
+def _queryset_chain(select: list[str], prefetch: list[str]) -> str:
+    chain = ""
+    if select:
+        chain += f".select_related({', '.join(repr(s) for s in select)})"
+    if prefetch:
+        chain += f".prefetch_related({', '.join(repr(p) for p in prefetch)})"
+    return chain
+
+
+def _add_lookups(target: dict, lookups: dict):
+    for key in ("select_related", "prefetch_related"):
+        for item in lookups[key]:
+            if item not in target[key]:
+                target[key].append(item)
+
+
+# ---------------------------------------------------------------------
+# scopes → QuerySet methods
+# ---------------------------------------------------------------------
+def _py_value(value, params: list[str]) -> str | None:
+    if isinstance(value, dict):
+        raw = value.get("__raw__")
+        if raw and _IDENT.fullmatch(raw) and raw.split(".")[0] in params:
+            return raw
+        return None
+    if isinstance(value, list):
+        items = [_py_value(v, params) for v in value]
+        return None if None in items else f"[{', '.join(items)}]"
+    return repr(value)
+
+
+def _filter_args(text: str, params: list[str]) -> str | None:
+    args, kwargs = ruby_dsl.parse_args(text)
+    if args or not kwargs:
+        return None
+    out = []
+    for key, value in kwargs.items():
+        if value is None:
+            out.append(f"{key}__isnull=True")
+            continue
+        py = _py_value(value, params)
+        if py is None:
+            return None
+        out.append(f"{key}__in={py}" if isinstance(value, list) else f"{key}={py}")
+    return ", ".join(out)
+
+
+def _order_args(text: str) -> str | None:
+    args, kwargs = ruby_dsl.parse_args(text)
+    fields = []
+    for arg in args:
+        if not isinstance(arg, str):
+            return None
+        column, _, direction = arg.strip().partition(" ")
+        fields.append(("-" if direction.strip().lower() == "desc" else "") + column)
+    for key, direction in kwargs.items():
+        if direction not in ("asc", "desc"):
+            return None
+        fields.append(("-" if direction == "desc" else "") + key)
+    return ", ".join(repr(f) for f in fields) if fields else None
+
+
+def translate_scope(scope: dict, model: str, scope_names: set, resolver: _Resolver) -> tuple[str | None, str | None]:
+    """Python body expression for a one-line scope, or (None, reason)."""
+    if scope["body"] is None:
+        return None, "multi-line scope"
+    params = scope["params"]
+    parts = ruby_dsl.split_top(scope["body"], ".")
+    expr, negate, sliced = "self", False, False
+    for part in parts:
+        m = re.fullmatch(r"(\w+[?!]?)\s*(?:\((.*)\))?", part.strip(), flags=re.DOTALL)
+        if not m or sliced:
+            return None, f"cannot translate {part.strip()!r}"
+        name, args = m.group(1), m.group(2) or ""
+        if name == "where" and not args:
+            negate = True
+            continue
+        if name in ("where", "not"):
+            if name == "not" and not negate:
+                return None, f"cannot translate {part.strip()!r}"
+            filters = _filter_args(args, params)
+            if filters is None:
+                return None, f"non-literal condition {args!r}"
+            expr += f".{'exclude' if negate else 'filter'}({filters})"
+            negate = False
+        elif name in ("order", "reorder"):
+            order = _order_args(args)
+            if order is None:
+                return None, f"cannot translate order({args})"
+            expr += f".order_by({order})"
+        elif name == "limit" and re.fullmatch(r"\d+|" + "|".join(map(re.escape, params or ["\0"])), args.strip()):
+            expr = f"{expr}[:{args.strip()}]"
+            sliced = True
+        elif name in ("includes", "preload", "eager_load"):
+            select, prefetch = [], []
+            for path in eager_paths(args):
+                lookup, single, reason = resolver.lookup(model, path)
+                if lookup is None:
+                    return None, reason
+                (select if single else prefetch).append(lookup)
+            expr += _queryset_chain(select, prefetch)
+        elif name == "distinct" and not args:
+            expr += ".distinct()"
+        elif name == "all" and not args:
+            continue
+        elif name in scope_names and not args:
+            expr += f".{name}()"
+        else:
+            return None, f"cannot translate {name}()"
+    return expr, None
+
+
+# ---------------------------------------------------------------------
+# conversion
+# ---------------------------------------------------------------------
+def _counter_signals(child: str, fk_field: str, column: str) -> str:
+    """
+    Handlers keeping parent.<column> in step with the child: +1 on create,
+    -1 on delete, and -1/+1 when the foreign key is reassigned (Rails does the
+    same). The key seen at load time is kept on the instance; when it was
+    deferred (.only() / .defer()) a reassignment cannot be detected.
+    """
+    fn = f"{inflection.underscore(child)}_{column}"
+    fk = f"{fk_field}_id"
+    seen = f"_{column}_{fk}"
+    parent = f"instance._meta.get_field({fk_field!r}).related_model"
+    return (
+        f"@receiver(post_init, sender={child})\n"
+        f"def remember_{fn}(sender, instance, **kwargs):\n"
+        f"    if {fk!r} in instance.__dict__:\n"
+        f"        instance.{seen} = instance.{fk}\n"
+        f"\n\n"
+        f"@receiver(post_save, sender={child})\n"
+        f"def update_{fn}(sender, instance, created, **kwargs):\n"
+        f"    if created:\n"
+        f"        previous = None\n"
+        f"    elif hasattr(instance, {seen!r}):\n"
+        f"        previous = instance.{seen}\n"
+        f"    else:\n"
+        f"        return\n"
+        f"    current = instance.{fk}\n"
+        f"    instance.{seen} = current\n"
+        f"    if previous == current:\n"
+        f"        return\n"
+        f"    parent = {parent}\n"
+        f"    if previous:\n"
+        f"        parent.objects.filter(pk=previous).update({column}=F({column!r}) - 1)\n"
+        f"    if current:\n"
+        f"        parent.objects.filter(pk=current).update({column}=F({column!r}) + 1)\n"
+        f"\n\n"
+        f"@receiver(post_delete, sender={child})\n"
+        f"def decrement_{fn}(sender, instance, **kwargs):\n"
+        f"    if instance.{fk}:\n"
+        f"        parent = {parent}\n"
+        f"        parent.objects.filter(pk=instance.{fk}).update({column}=F({column!r}) - 1)\n"
+    )
+
+
+def _declare_foreign_keys(models: dict, tables: dict) -> list[dict]:
+    """
+    Foreign keys named by associations (class_name / foreign_key) that
+    schema_importer cannot infer from the column name alone, e.g.
+    `belongs_to :author, class_name: "User"` over posts.author_id. They are
+    added to the planned schema without a database constraint, like inferred
+    ones, so the FK field exists for select_related and counter caches.
+    """
+    known = set(schema_importer.model_tables({"tables": tables}).values())
+    added = []
+    for owner, info in models.items():
+        for name, assoc in info["associations"].items():
+            if assoc["polymorphic"] or assoc["through"] or assoc["kind"] == "has_and_belongs_to_many":
+                continue
+            if assoc["kind"] == "belongs_to":
+                child, parent, column = owner, assoc["target"], assoc["foreign_key"] or f"{name}_id"
+            else:
+                child, parent = assoc["target"], owner
+                column = assoc["foreign_key"] or f"{inflection.underscore(owner).split('/')[-1]}_id"
+            child_table, parent_table = tables.get(inflection.tableize(child)), inflection.tableize(parent)
+            if not child_table or parent_table not in known or not column.endswith("_id"):
+                continue
+            if column not in {c["name"] for c in child_table["columns"]}:
+                continue
+            if any(fk["column"] == column for fk in child_table["foreign_keys"]) or column[:-3] in child_table["polymorphic"]:
+                continue
+            if inflection.pluralize(column[:-3]) == parent_table:
+                continue  # schema_importer infers this one from the column name
+            child_table["foreign_keys"].append({
+                "column": column, "to_table": parent_table, "primary_key": "id",
+                "on_delete": None, "name": None, "constraint": False,
+            })
+            added.append({"table": child_table["name"], "column": column, "to_table": parent_table,
+                          "association": f"{owner}.{name}"})
+    return added
+
+
+def plan(hints: dict, schema: dict) -> dict:
+    """
+    Resolve every eager load, counter cache and scope against the schema.
+
+    Returns {"schema": schema with counter columns and association foreign
+    keys, "model_extras": {...} for schema_importer, "views": {ViewClass: {...}},
+    "eager_loads": [...], "counter_caches": [...], "scopes": {...},
+    "foreign_keys": [...]}.
+    """
+    models = (hints or {}).get("models", {})
+    schema = copy.deepcopy(schema or {"tables": {}})
+    foreign_keys = _declare_foreign_keys(models, schema.get("tables", {}))
+    resolver = _Resolver(models, schema)
+    extras, views, per_model = {}, {}, {}
+    loads = []
+
+    for load in (hints or {}).get("eager_loads", []):
+        model, guessed = _receiver(load, models)
+        row = {
+            "file": load["file"], "line": load["line"], "call": f"{load['method']}({', '.join(load['paths'])})",
+            "model": model, "receiver_guessed": guessed,
+            "select_related": [], "prefetch_related": [], "dropped_paths": [],
+        }
+        if model is None:
+            row.update(status="dropped", reason="receiver model not found")
+            loads.append(row)
+            continue
+        for path in load["paths"]:
+            lookup, single, reason = resolver.lookup(model, path)
+            if lookup is None:
+                row["dropped_paths"].append({"path": path, "reason": reason})
+            else:
+                row["select_related" if single else "prefetch_related"].append(lookup)
+        if not row["select_related"] and not row["prefetch_related"]:
+            row.update(status="dropped", reason="; ".join(d["reason"] for d in row["dropped_paths"]))
+        elif load.get("controller") and load.get("action"):
+            view = routes_compiler.view_name(load["controller"], load["action"])
+            entry = views.setdefault(view, {"model": model, "select_related": [], "prefetch_related": [], "loads": []})
+            if entry["model"] == model:
+                _add_lookups(entry, row)
+                entry["loads"].append(len(loads))
+                row.update(status="pending", target=f"views.{view}")
+            else:
+                row.update(status="dropped", reason=f"{view} already loads {entry['model']}")
+        elif load.get("scope"):
+            row.update(status="pending", target=f"{model}QuerySet.{load['scope']}")
+        else:
+            row.update(status="mapped", target=f"{model}QuerySet.with_related")
+        if row["status"] != "dropped":
+            _add_lookups(per_model.setdefault(model, {"select_related": [], "prefetch_related": []}), row)
+        loads.append(row)
+
+    # Counter caches: a column on the parent plus signal handlers on the child
+    counters = []
+    for child, info in models.items():
+        for name, assoc in info["associations"].items():
+            cache = assoc["counter_cache"]
+            if assoc["kind"] != "belongs_to" or not cache:
+                continue
+            parent = assoc["target"]
+            column = cache if isinstance(cache, str) else f"{inflection.tableize(child).split('/')[-1]}_count"
+            fk_column = assoc["foreign_key"] or f"{name}_id"
+            row = {"child": child, "parent": parent, "column": column}
+            parent_table, child_table = resolver._table(parent), resolver._table(child)
+            if not parent_table or not child_table:
+                row.update(status="dropped", reason="model not in schema")
+            elif fk_column not in {c["name"] for c in child_table["columns"]}:
+                row.update(status="dropped", reason=f"{child_table['name']}.{fk_column} not in schema")
+            elif fk_column not in resolver.foreign_keys(child):
+                row.update(status="dropped", reason=f"{child_table['name']}.{fk_column} is not a foreign key in the schema")
+            else:
+                if column not in {c["name"] for c in parent_table["columns"]}:
+                    parent_table["columns"].append(
+                        schema_importer._column(column, "integer", {"default": 0, "null": False})
+                    )
+                    row["column_added"] = True
+                child_extra = extras.setdefault(child, {})
+                child_extra.setdefault("after", []).append(_counter_signals(child, fk_column[:-3], column))
+                child_extra.setdefault("imports", set()).update({
+                    "from django.db.models import F",
+                    "from django.db.models.signals import post_delete, post_init, post_save",
+                    "from django.dispatch import receiver",
+                })
+                row.update(status="mapped", handles=["create", "delete", "foreign key change"])
+            counters.append(row)
+
+    # Scopes and eager loads of each model → <Model>QuerySet as the default manager
+    scopes = {"translated": [], "dropped": []}
+    for model, info in models.items():
+        names = {s["name"] for s in info["scopes"]}
+        methods = []
+        for scope in info["scopes"]:
+            body, reason = translate_scope(scope, model, names, resolver)
+            if body is None:
+                scopes["dropped"].append({"model": model, "scope": scope["name"], "reason": reason})
+                continue
+            args = "".join(f", {p}" for p in scope["params"])
+            methods.append(f"    def {scope['name']}(self{args}):\n        return {body}\n")
+            scopes["translated"].append({"model": model, "scope": scope["name"]})
+        related = per_model.get(model)
+        if related:
+            methods.append(
+                f"    def with_related(self):\n"
+                f"        return self{_queryset_chain(related['select_related'], related['prefetch_related'])}\n"
+            )
+        if methods and resolver._table(model):
+            extra = extras.setdefault(model, {})
+            extra["before"] = [f"class {model}QuerySet(models.QuerySet):\n" + "\n".join(methods)]
+            extra["lines"] = [f"objects = {model}QuerySet.as_manager()"]
+        elif methods:
+            for s in scopes["translated"]:
+                if s["model"] == model:
+                    s["status"] = "model not in schema"
+
+    translated = {(s["model"], s["scope"]) for s in scopes["translated"] if "status" not in s}
+    for row in loads:
+        if row["status"] == "pending" and row["target"].startswith(f"{row['model']}QuerySet."):
+            scope = row["target"].rsplit(".", 1)[1]
+            if (row["model"], scope) in translated:
+                row["status"] = "mapped"
+            else:
+                row.update(status="dropped", reason=f"scope {scope} not translated")
+        elif row["status"] == "mapped" and not resolver._table(row["model"] or ""):
+            row.update(status="dropped", reason="model not in schema (no local QuerySet)")
+
+    for child, fields in resolver.related_names.items():
+        extras.setdefault(child, {})["related_names"] = fields
+    for extra in extras.values():
+        if "imports" in extra:
+            extra["imports"] = sorted(extra["imports"])
+
+    return {
+        "schema": schema,
+        "model_extras": extras,
+        "views": views,
+        "eager_loads": loads,
+        "counter_caches": counters,
+        "scopes": scopes,
+        "foreign_keys": foreign_keys,
+    }
+
+
+def prompt_section(orm_plan: dict) -> str:
+    """QUERY PLAN payload for the blueprint prompt."""
+    lines = [
+        f"- {view}: {entry['model']}.objects{_queryset_chain(entry['select_related'], entry['prefetch_related'])}"
+        for view, entry in (orm_plan or {}).get("views", {}).items()
+    ]
+    if not lines:
+        return ""
+    return "QUERY PLAN (view: queryset):\n" + "\n".join(lines) + "\n\n"
+
+
+_CLASS_BLOCK = re.compile(r"^class\s+(\w+)\b.*?(?=^\S|\Z)", re.MULTILINE | re.DOTALL)
+
+
+def apply_to_blueprint(blueprint: dict, orm_plan: dict) -> dict:
+    """
+    Inject planned querysets into the routed view classes and return the full
+    report (every eager load mapped or dropped, counter caches, scopes).
+    """
+    loads = [dict(row) for row in (orm_plan or {}).get("eager_loads", [])]
+    for view, entry in (orm_plan or {}).get("views", {}).items():
+        model = entry["model"]
+        chain = _queryset_chain(entry["select_related"], entry["prefetch_related"])
+        status, reason = "dropped", f"view {view} not found"
+        for app in blueprint.get("apps", []):
+            code = app.get("views_code") or ""
+            block = next((m for m in _CLASS_BLOCK.finditer(code) if m.group(1) == view), None)
+            if not block:
+                continue
+            text = block.group(0)
+            model_line = re.search(rf"^(\s+)model\s*=\s*{model}\s*$", text, flags=re.MULTILINE)
+            if "select_related" in text or "prefetch_related" in text:
+                status = "mapped"
+            elif model_line and not re.search(r"^\s+(?:queryset\s*=|def get_queryset\b)", text, flags=re.MULTILINE):
+                line = f"\n{model_line.group(1)}queryset = {model}.objects{chain}"
+                text = text[:model_line.end()] + line + text[model_line.end():]
+                status = "mapped"
+            elif re.search(rf"\b{model}\.objects\.", text):
+                text = re.sub(rf"\b{model}\.objects\.", f"{model}.objects{chain}.", text, count=1)
+                status = "mapped"
+            else:
+                reason = f"no {model} queryset in {view}"
+                break
+            app["views_code"] = code[:block.start()] + text + code[block.end():]
+            break
+        for i in entry["loads"]:
+            loads[i]["status"] = status
+            if status == "dropped":
+                loads[i]["reason"] = reason
+    return {
+        "eager_loads": loads,
+        "mapped": sum(1 for r in loads if r["status"] == "mapped"),
+        "dropped": sum(1 for r in loads if r["status"] == "dropped"),
+        "counter_caches": (orm_plan or {}).get("counter_caches", []),
+        "scopes": (orm_plan or {}).get("scopes", {"translated": [], "dropped": []}),
+        "foreign_keys": (orm_plan or {}).get("foreign_keys", []),
+    }
@@ -0,0 +1,166 @@
+# tools/profiling.py
+"""
+Opt-in CPU and memory profiling of graph nodes.
+
+    PROFILE_CPU=1       wrap each node in cProfile      → logs/profile/<node>.prof
+    PROFILE_MEMORY=1    wrap each node in tracemalloc   → logs/profile/<node>.alloc.txt
+    PROFILE_NODES=discovery,converter   only profile these nodes (default: all)
+    PROFILE_TOP=25      allocation sites / functions kept in the reports
+
+Every profiled node also writes logs/profile/<node>.json (wall time, top
+cumulative functions, peak and net memory deltas) and a `profile` event.
+When neither toggle is set, build_graph registers the plain node functions,
+so there is no overhead at all.
+
+cProfile only sees the thread that runs the node; work done in the
+file-reading or template pools shows up as time spent waiting on futures.
+
+Inspect a profile:
+    python -m tools.profiling out_django/logs/profile/converter.prof
+"""
+
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import tracemalloc
+from tools import file_tools, log_utils
+
+TOP = int(os.getenv("PROFILE_TOP", "25"))
+
+
+def settings() -> dict:
+    """Profiling toggles from the environment."""
+    nodes = os.getenv("PROFILE_NODES", "")
+    return {
+        "cpu": os.getenv("PROFILE_CPU") == "1",
+        "memory": os.getenv("PROFILE_MEMORY") == "1",
+        "nodes": {n.strip() for n in nodes.split(",") if n.strip()} or None,
+    }
+
+
+def enabled_for(name: str, opts: dict | None = None) -> bool:
+    opts = opts or settings()
+    return (opts["cpu"] or opts["memory"]) and (opts["nodes"] is None or name in opts["nodes"])
+
+
+def _output_dir(state) -> str:
+    output_dir = getattr(state, "output_dir", None)
+    if output_dir is None and isinstance(state, dict):
+        output_dir = state.get("output_dir")
+    return os.path.join(output_dir or ".", "logs", "profile")
+
+
+def _top_functions(prof: cProfile.Profile, limit: int) -> list[dict]:
+    stats = pstats.Stats(prof)
+    rows = []
+    for (filename, line, func), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({func})",
+            "calls": ncalls,
+            "tottime_s": round(tottime, 4),
+            "cumtime_s": round(cumtime, 4),
+        })
+    rows.sort(key=lambda r: -r["cumtime_s"])
+    return rows[:limit]
+
+
+def _format_allocations(diff: list, limit: int) -> tuple[str, list[dict]]:
+    lines, rows = [], []
+    for stat in diff[:limit]:
+        frame = stat.traceback[0]
+        rows.append({
+            "site": f"{frame.filename}:{frame.lineno}",
+            "size_diff_kb": round(stat.size_diff / 1024, 1),
+            "count_diff": stat.count_diff,
+        })
+        lines.append(str(stat))
+    return "\n".join(lines) + "\n", rows
+
+
+_NOISE = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, __file__),
+)
+
+
+def wrap(name: str, fn, opts: dict | None = None):
+    """Return `fn` wrapped with cProfile and/or tracemalloc according to `opts`."""
+    opts = opts or settings()
+
+    def profiled(state):
+        out_dir = _output_dir(state)
+        os.makedirs(out_dir, exist_ok=True)
+        report = {"node": name}
+
+        own_tracing = False
+        if opts["memory"]:
+            own_tracing = not tracemalloc.is_tracing()
+            if own_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot().filter_traces(_NOISE)
+            base_bytes = tracemalloc.get_traced_memory()[0]
+        prof = cProfile.Profile() if opts["cpu"] else None
+        started = time.perf_counter()
+        if prof:
+            prof.enable()
+        try:
+            return fn(state)
+        finally:
+            if prof:
+                prof.disable()
+            report["wall_s"] = round(time.perf_counter() - started, 3)
+            if prof:
+                prof_path = os.path.join(out_dir, f"{name}.prof")
+                prof.dump_stats(prof_path)
+                report["prof"] = prof_path
+                report["top_functions"] = _top_functions(prof, TOP)
+            if opts["memory"]:
+                current, peak = tracemalloc.get_traced_memory()
+                diff = tracemalloc.take_snapshot().filter_traces(_NOISE).compare_to(before, "lineno")
+                if own_tracing:
+                    tracemalloc.stop()
+                text, rows = _format_allocations(diff, TOP)
+                alloc_path = os.path.join(out_dir, f"{name}.alloc.txt")
+                with open(alloc_path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                report.update({
+                    "peak_delta_mb": round((peak - base_bytes) / 2**20, 2),
+                    "net_delta_mb": round((current - base_bytes) / 2**20, 2),
+                    "top_allocations": rows,
+                    "allocations": alloc_path,
+                })
+            file_tools.write_json(os.path.join(out_dir, f"{name}.json"), report)
+            log_utils.log_event(
+                name, "profile", wall_s=report["wall_s"],
+                peak_delta_mb=report.get("peak_delta_mb"), net_delta_mb=report.get("net_delta_mb"),
+            )
+            memory = f", peak +{report['peak_delta_mb']} MB" if "peak_delta_mb" in report else ""
+            print(f"⏱️ Profile {name}: {report['wall_s']}s wall{memory} → {out_dir}")
+
+    profiled.__name__ = getattr(fn, "__name__", name)
+    profiled.__doc__ = fn.__doc__
+    return profiled
+
+
+def maybe_wrap(name: str, fn, opts: dict | None = None):
+    """`fn` itself when profiling is off for this node, else the profiled wrapper."""
+    opts = opts or settings()
+    return wrap(name, fn, opts) if enabled_for(name, opts) else fn
+
+
+def print_stats(path: str, limit: int = TOP, sort: str = "cumulative"):
+    out = io.StringIO()
+    pstats.Stats(path, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+    print(out.getvalue())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python -m tools.profiling <node.prof> [cumulative|tottime|calls]")
+        sys.exit(2)
+    print_stats(sys.argv[1], sort=sys.argv[2] if len(sys.argv) > 2 else "cumulative")
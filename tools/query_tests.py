@@ -0,0 +1,394 @@
+# tools/query_tests.py
+"""
+Query-count regression tests for the generated Django project.
+
+builder_node writes, next to the converted code:
+
+- querycount.py               fixture factory (fills fields and foreign keys
+                              from each model's _meta) and QueryCountTestCase
+- <app>/test_queries.py       one test per GET view routed in <app>/urls.py
+- <app>/query_baselines.json  {ViewClass: query count}; null until recorded
+- query_report.py             runs the tests and prints queries / response time per view
+
+Each test requests its URL once to warm up, measures it against one row per
+model, adds two more rows per model and asserts with assertNumQueries that
+the count did not grow (an N+1) and matches the recorded baseline. The
+tests run on a dummy cache, so cached views are measured uncached.
+
+    python manage.py test                         # plain test run
+    python query_report.py [app ...]              # per-view report → query_report.json
+    python query_report.py --update-baselines     # record current counts as baselines
+"""
+
+import re
+import json
+from pathlib import Path
+from tools import file_tools, inflection
+
+_URL_PATH = re.compile(r"""path\(\s*["']([^"']*)["']\s*,\s*(.+?)\)\s*,?\s*$""", re.MULTILINE)
+_GET_VIEW = re.compile(r"""["']GET["']\s*:\s*views\.(\w+)\.as_view\(""")
+_PLAIN_VIEW = re.compile(r"""^views\.(\w+)\.as_view\(""")
+_INCLUDE = re.compile(r"""path\(\s*["']([^"']*)["']\s*,\s*include\(\s*["'](\w+)\.urls["']""")
+_CONVERTER = re.compile(r"<(?:(\w+):)?(\w+)>")
+_MODEL_CLASS = re.compile(r"^class\s+(\w+)\((?:[\w.]*Model|models\.Model)\b", re.MULTILINE)
+
+SUPPORT_MODULE = '''"""
+Query-count test support: model-driven fixtures and QueryCountTestCase.
+
+Fixtures are built from each model's _meta: fields without a default get
+a value of their type, foreign keys point at an existing row of the target
+model (created first if there is none). URL parameters are resolved in
+route order, so in a nested route each row is one that belongs, through its
+foreign key, to the row of the enclosing segment. Tests run on a dummy cache,
+so cache_page and low-level caches neither need the project's cache server
+nor hide the queries being counted. Measurements are collected in RESULTS
+for query_report.py.
+"""
+
+import json
+import time
+import uuid
+import decimal
+import datetime
+from pathlib import Path
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import connection, models
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+RESULTS = []
+FIXTURE_ERRORS = []
+_seq = iter(range(1, 10**9))
+
+
+def _value(field, n):
+    if field.choices:
+        return field.choices[0][0]
+    if isinstance(field, models.EmailField):
+        return f"user{n}@example.com"
+    if isinstance(field, models.URLField):
+        return f"https://example.com/{n}"
+    if isinstance(field, models.SlugField):
+        return f"{field.name}-{n}"
+    if isinstance(field, models.GenericIPAddressField):
+        return "127.0.0.1"
+    if isinstance(field, (models.CharField, models.TextField)):
+        value = f"{field.name} {n}"
+        return value[:field.max_length] if field.max_length else value
+    if isinstance(field, models.BooleanField):
+        return True
+    if isinstance(field, models.DecimalField):
+        return decimal.Decimal(n % 10 ** max(field.max_digits - field.decimal_places, 1))
+    if isinstance(field, models.FloatField):
+        return float(n)
+    if isinstance(field, (models.IntegerField, models.BigIntegerField, models.SmallIntegerField)):
+        return n % 32767
+    if isinstance(field, models.DateTimeField):
+        return timezone.now()
+    if isinstance(field, models.DateField):
+        return datetime.date.today()
+    if isinstance(field, models.TimeField):
+        return datetime.time(12, 0)
+    if isinstance(field, models.DurationField):
+        return datetime.timedelta(minutes=n)
+    if isinstance(field, models.UUIDField):
+        return uuid.uuid4()
+    if isinstance(field, models.JSONField):
+        return {}
+    if isinstance(field, models.BinaryField):
+        return b""
+    if isinstance(field, models.FileField):
+        return f"fixtures/{field.name}-{n}.txt"
+    return f"{field.name} {n}"
+
+
+def make(model, _depth=0, **overrides):
+    """Create and save one instance of `model` with its fields and foreign keys filled."""
+    n = next(_seq)
+    values = {}
+    for field in model._meta.concrete_fields:
+        if field.primary_key or field.name in overrides or getattr(field, "auto_now", False) \\
+                or getattr(field, "auto_now_add", False) or field.db_default is not models.NOT_PROVIDED:
+            continue
+        if field.is_relation:
+            target = field.related_model
+            candidates = target._default_manager.order_by("pk")
+            if field.unique:
+                candidates = candidates.filter(**{f"{field.related_query_name()}__isnull": True})
+            existing = candidates.first()
+            if existing is None and _depth < (5 if not field.null else 1):
+                existing = make(target, _depth + 1)
+            if existing is not None:
+                values[field.name] = existing
+        elif not field.has_default():
+            values[field.name] = _value(field, n)
+    values.update(overrides)
+    return model._default_manager.create(**values)
+
+
+def build_fixtures(labels, count=1):
+    """`count` more rows of every model in `labels` ("app.Model")."""
+    for label in labels:
+        model = apps.get_model(label)
+        for _ in range(count):
+            try:
+                make(model)
+            except Exception as e:
+                FIXTURE_ERRORS.append({"model": label, "error": str(e)})
+                break
+
+
+def load_baselines(test_file):
+    path = Path(test_file).with_name("query_baselines.json")
+    if not path.exists():
+        return {}
+    return {k: v for k, v in json.loads(path.read_text()).items() if v is not None}
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}})
+class QueryCountTestCase(TestCase):
+    """Requests one URL per test and asserts its query count does not grow with the data."""
+
+    app_label = None
+    fixture_models = []
+    baselines = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        build_fixtures(cls.fixture_models, 1)
+
+    def setUp(self):
+        user_model = get_user_model()
+        user = user_model._default_manager.order_by("pk").first() or make(user_model)
+        self.client.force_login(user)
+
+    def _url(self, path, params):
+        values, parents = {}, []
+        for name, label in params.items():
+            model = apps.get_model(label)
+            links = {}
+            for parent in parents:
+                fk = next((f.name for f in model._meta.concrete_fields if f.is_relation and f.many_to_one
+                           and f.related_model._meta.concrete_model is parent._meta.concrete_model), None)
+                if fk:
+                    links[fk] = parent
+            if parents and parents[-1]._meta.concrete_model is not model._meta.concrete_model \
+                    and parents[-1] not in links.values():
+                self.skipTest(f"{label} has no foreign key to {parents[-1]._meta.label} for <{name}>")
+            obj = model._default_manager.filter(**links).order_by("pk").first()
+            if obj is None and links:
+                try:
+                    obj = make(model, **links)
+                except Exception as e:
+                    FIXTURE_ERRORS.append({"model": label, "error": str(e)})
+            if obj is None:
+                self.skipTest(f"no {label} fixture")
+            values[name] = obj.pk
+            parents.append(obj)
+        return path.format(**values)
+
+    def _measure(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = self.client.get(url)
+            ms = (time.perf_counter() - started) * 1000
+        return response, len(ctx.captured_queries), ms
+
+    def check_view(self, view, path, **params):
+        url = self._url(path, params)
+        row = {"app": self.app_label, "view": view, "url": url, "baseline": self.baselines.get(view)}
+        RESULTS.append(row)
+        self.client.get(url)  # warm-up: sessions, content types, template loading
+        response, row["queries"], row["ms"] = self._measure(url)
+        row["status"] = response.status_code
+        self.assertLess(response.status_code, 500, f"{view} returned {response.status_code}")
+        if response.status_code == 404:
+            # Counting the queries of a 404 page would record a meaningless baseline
+            self.skipTest(f"{url} returned 404: the fixtures do not match this route")
+        build_fixtures(self.fixture_models, 2)
+        expected = row["baseline"] if row["baseline"] is not None else row["queries"]
+        with CaptureQueriesContext(connection) as scaled:
+            try:
+                with self.assertNumQueries(expected):
+                    self.client.get(url)
+            finally:
+                row["queries_scaled"] = len(scaled.captured_queries)
+'''
+
+RUNNER = '''#!/usr/bin/env python3
+"""
+Run the query-count tests and report queries and response time per view.
+
+    python query_report.py                      # all apps
+    python query_report.py blog shop            # some apps
+    python query_report.py --update-baselines   # record current counts in <app>/query_baselines.json
+"""
+
+import os
+import sys
+import json
+from pathlib import Path
+
+APPS = {apps}
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    update = "--update-baselines" in sys.argv
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "{project_name}.settings")
+    import django
+    from django.conf import settings
+    from django.test.utils import get_runner
+    django.setup()
+    import querycount
+
+    labels = [f"{{app}}.test_queries" for app in (args or APPS)]
+    failures = get_runner(settings)(verbosity=0).run_tests(labels)
+
+    rows = sorted(querycount.RESULTS, key=lambda r: -(r.get("queries_scaled") or r.get("queries") or 0))
+    print(f"{{'view':<45}} {{'status':>6}} {{'queries':>8}} {{'+rows':>6}} {{'baseline':>8}} {{'ms':>8}}")
+    for r in rows:
+        print(
+            f"{{r['app'] + '.' + r['view']:<45}} {{r.get('status', '-'):>6}} {{r.get('queries', '-'):>8}} "
+            f"{{r.get('queries_scaled', '-'):>6}} {{str(r['baseline']):>8}} {{round(r.get('ms', 0), 1):>8}}"
+        )
+    for err in querycount.FIXTURE_ERRORS:
+        print(f"fixture error: {{err['model']}}: {{err['error']}}")
+    Path("query_report.json").write_text(json.dumps(
+        {{"results": rows, "fixture_errors": querycount.FIXTURE_ERRORS, "failures": failures}}, indent=2, default=str
+    ))
+
+    if update:
+        for app in {{r["app"] for r in rows}}:
+            path = Path(app) / "query_baselines.json"
+            baselines = json.loads(path.read_text()) if path.exists() else {{}}
+            baselines.update({{r["view"]: r["queries"] for r in rows if r["app"] == app and "queries" in r}})
+            path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\\n")
+        print("Baselines updated.")
+    sys.exit(1 if failures and not update else 0)
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+
+def _app_prefixes(root_urls: str) -> dict:
+    """{app: prefix} from include("app.urls") lines of the root urls.py."""
+    return {app: prefix for prefix, app in _INCLUDE.findall(root_urls or "")}
+
+
+def get_views(urls_code: str) -> list[tuple[str, str]]:
+    """[(pattern, ViewClass)] for every URL of an app urls.py that answers GET."""
+    out = []
+    for pattern, target in _URL_PATH.findall(urls_code or ""):
+        m = _GET_VIEW.search(target) if target.startswith("_by_method") else _PLAIN_VIEW.match(target.strip())
+        if m:
+            out.append((pattern, m.group(1)))
+    return out
+
+
+def _labels(blueprint: dict) -> dict:
+    """{ModelClass: "app.ModelClass"} across all apps."""
+    labels = {}
+    for app in blueprint.get("apps", []):
+        names = list(app.get("models") or []) + _MODEL_CLASS.findall(app.get("models_code") or "")
+        for name in names:
+            labels.setdefault(name, f"{app.get('name', 'app')}.{name}")
+    return labels
+
+
+def _view_model(views_code: str, view: str) -> str | None:
+    m = re.search(rf"^class\s+{view}\b.*?(?=^\S|\Z)", views_code or "", flags=re.MULTILINE | re.DOTALL)
+    if not m:
+        return None
+    model = re.search(r"^\s+model\s*=\s*(\w+)", m.group(0), flags=re.MULTILINE)
+    return model.group(1) if model else None
+
+
+def test_module(app: dict, cases: list[dict], fixture_models: list[str]) -> str:
+    name = app.get("name", "app")
+    class_name = inflection.camelize(name) + "QueryCountTests"
+    lines = [
+        "from querycount import QueryCountTestCase, load_baselines",
+        "",
+        "",
+        f"class {class_name}(QueryCountTestCase):",
+        f"    app_label = {name!r}",
+        f"    fixture_models = {fixture_models!r}",
+        "    baselines = load_baselines(__file__)",
+    ]
+    for case in cases:
+        params = "".join(f", {k}={v!r}" for k, v in case["params"].items())
+        lines += [
+            "",
+            f"    def {case['test']}(self):",
+            f"        self.check_view({case['view']!r}, {case['path']!r}{params})",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def generate(blueprint: dict) -> tuple[dict, dict]:
+    """({relative path: content}, report) for the whole project."""
+    apps = blueprint.get("apps", []) or []
+    labels = _labels(blueprint)
+    prefixes = _app_prefixes(blueprint.get("urls_code"))
+    files, report = {}, {"apps": {}, "tests": 0, "skipped": []}
+    for app in apps:
+        name = app.get("name", "app")
+        cases, seen = [], set()
+        own = [labels[m] for m in labels if labels[m].startswith(f"{name}.")]
+        fixture_models = list(own)
+        for pattern, view in get_views(app.get("urls_code")):
+            params, reason = {}, None
+            for converter, param in _CONVERTER.findall(pattern):
+                if converter not in ("", "int"):
+                    reason = f"<{converter}:{param}> has no fixture value"
+                    break
+                model = _view_model(app.get("views_code"), view) if param == "pk" else inflection.classify(param[:-3])
+                if param == "pk" and not model:
+                    # PostsEditView → Post, by the longest pluralised model name the view starts with
+                    model = next((m for m in sorted(labels, key=len, reverse=True)
+                                  if view.startswith(inflection.pluralize(m))), None)
+                if model not in labels:
+                    reason = f"no model for <{param}>"
+                    break
+                params[param] = labels[model]
+                if labels[model] not in fixture_models:
+                    fixture_models.append(labels[model])
+            if reason:
+                report["skipped"].append({"app": name, "view": view, "pattern": pattern, "reason": reason})
+                continue
+            path = "/" + prefixes.get(name, "") + _CONVERTER.sub(lambda m: "{" + m.group(2) + "}", pattern)
+            test = "test_" + inflection.underscore(view[:-4] if view.endswith("View") else view)
+            if test in seen:
+                continue
+            seen.add(test)
+            cases.append({"test": test, "view": view, "path": path.replace("//", "/"), "params": params})
+        if not cases:
+            continue
+        files[f"{name}/test_queries.py"] = test_module(app, cases, fixture_models)
+        files[f"{name}/query_baselines.json"] = json.dumps({c["view"]: None for c in cases}, indent=2, sort_keys=True) + "\n"
+        report["apps"][name] = len(cases)
+        report["tests"] += len(cases)
+    if files:
+        project_name = blueprint.get("project_name", "converted_project")
+        files["querycount.py"] = SUPPORT_MODULE
+        files["query_report.py"] = RUNNER.format(apps=sorted(report["apps"]), project_name=project_name)
+    return files, report
+
+
+def write(project_root, blueprint: dict) -> tuple[list[str], dict]:
+    """Write the query-count tests; existing baselines files are kept."""
+    files, report = generate(blueprint)
+    written = []
+    for rel, content in files.items():
+        path = Path(project_root) / rel
+        if rel.endswith("query_baselines.json") and path.exists():
+            recorded = json.loads(path.read_text(encoding="utf-8"))
+            content = json.dumps({**json.loads(content), **recorded}, indent=2, sort_keys=True) + "\n"
+        file_tools.write_file(str(path), content)
+        written.append(str(path))
+    return written, report
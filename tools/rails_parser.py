@@ -9,6 +9,7 @@ import json
 import math
 from openai import OpenAI
 from dotenv import load_dotenv
+from tools import llm_utils, model_router, chunking
 
 load_dotenv()
 
@@ -16,6 +17,43 @@ load_dotenv()
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
 
+# Static prompt prefixes: byte-identical across calls so provider-side prompt
+# caching can reuse them; the variable chunk/batch always comes last.
+SUMMARIZE_SYSTEM = (
+    "You are an expert in Ruby on Rails project architecture. "
+    "Analyze the file paths given by the user and classify them into models, controllers, routes, and views. "
+    "Output ONLY valid JSON with keys: models, controllers, routes_files, views."
+)
+
+ANALYZE_SYSTEM = """You are a Ruby on Rails expert. Analyze the files given by the user to extract:
+- models (attributes, associations)
+- controllers (actions, filters)
+- routes (resources, verbs)
+- views (variables, partials)
+Output ONLY JSON with keys: models, controllers, routes, views, dependencies.
+
+The user message is a JSON object mapping file paths to file contents.
+Each key of the output is a list; use this shape:
+{
+  "models": [{"name": "Post", "file": "app/models/post.rb", "attributes": ["title", "body"],
+              "associations": [{"type": "belongs_to", "name": "author", "class_name": "User"}],
+              "validations": ["validates :title, presence: true"], "scopes": ["published"]}],
+  "controllers": [{"name": "PostsController", "file": "app/controllers/posts_controller.rb",
+                   "actions": ["index", "show"], "filters": ["before_action :set_post"]}],
+  "routes": [{"resource": "posts", "verbs": ["GET", "POST"]}],
+  "views": [{"path": "app/views/posts/index.html.erb", "variables": ["@posts"], "partials": ["posts/_post"]}],
+  "dependencies": [{"from": "PostsController", "to": "Post"}]
+}"""
+
+
+def _parse_json(response, raw_key: str) -> dict:
+    text = response.choices[0].message.content.strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return {"error": "invalid_json", raw_key: text}
+
+
 # ---------------------------------------------------------------------
 # summarize_structure
 # ---------------------------------------------------------------------
@@ -39,28 +77,28 @@ def summarize_structure(tree_json: dict):
         end = start + chunk_size
         subset = {"files": all_files[start:end]}
 
-        prompt = (
-            "You are an expert in Ruby on Rails project architecture. "
-            "Analyze the following file paths and classify them into models, controllers, routes, and views. "
-            "Output ONLY valid JSON with keys: models, controllers, routes_files, views.\n\n"
-            f"Chunk {i + 1}/{total_chunks}:\n{subset}"
-        )
-
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {"role": "system", "content": "Return only valid JSON."},
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=1500,
-        )
-
-        content = response.choices[0].message.content.strip()
-
-        try:
-            summaries.append(json.loads(content))
-        except json.JSONDecodeError:
-            summaries.append({"error": "invalid_json", "raw": content})
+        prompt = f"Chunk {i + 1}/{total_chunks}:\n{subset}"
+
+        def call(model, prompt=prompt):
+            return llm_utils.chat(
+                client,
+                "discovery_node",
+                model=model,
+                messages=[
+                    {"role": "system", "content": SUMMARIZE_SYSTEM},
+                    {"role": "user", "content": prompt},
+                ],
+                max_tokens=1500,
+                log_fields={"step": "summarize_structure"},
+            )
+
+        # Classifying paths is easy: always starts on the fast tier
+        summaries.append(model_router.run(
+            "summarize_structure", [], call,
+            parse=lambda r: _parse_json(r, "raw"),
+            validate=model_router.valid_json_keys(),
+            strong_model=MODEL,
+        ))
 
     # Merge summaries
     merged = {"models": [], "controllers": [], "routes_files": [], "views": []}
@@ -78,63 +116,96 @@ def summarize_structure(tree_json: dict):
 # ---------------------------------------------------------------------
 # analyze_units
 # ---------------------------------------------------------------------
-def analyze_units(units: dict):
-    """
-    Deeply analyze Rails models, controllers, routes, and views via LLM.
+def _unit_text(value) -> str:
+    """Accept either raw text or a file_tools record ({"content": ...})."""
+    if isinstance(value, dict):
+        return value.get("content", "")
+    return value or ""
 
-    Args:
-        units (dict): mapping of {path: content} for selected files.
 
-    Returns:
-        dict: structured analysis including models, controllers, routes, views, dependencies
+def _iter_batches(units, batch_size: int, max_chars: int | None = None):
     """
-    if not units:
-        return {"models": [], "controllers": [], "routes": [], "views": [], "dependencies": []}
-
-    file_paths = list(units.keys())
-    batch_size = 20
-    total_batches = math.ceil(len(file_paths) / batch_size)
-    results = []
-
-    for i in range(total_batches):
-        batch_files = file_paths[i * batch_size : (i + 1) * batch_size]
-        batch_content = {p: units[p][:80000] for p in batch_files}  # limit size per file
-
-        prompt = (
-            "You are a Ruby on Rails expert. Analyze these files to extract:\n"
-            "- models (attributes, associations)\n"
-            "- controllers (actions, filters)\n"
-            "- routes (resources, verbs)\n"
-            "- views (variables, partials)\n"
-            "Output ONLY JSON with keys: models, controllers, routes, views, dependencies.\n\n"
-            f"Batch {i + 1}/{total_batches}:\n"
-            f"{json.dumps(batch_content)[:12000]}"
-        )
-
-        response = client.chat.completions.create(
-            model=MODEL,
+    Yield lists of (path, text) from a dict or a lazy (path, record) stream.
+    With `max_chars`, a batch is closed before it would exceed that many characters
+    and larger files are split into #partXofN units (tools/chunking).
+    """
+    items = units.items() if isinstance(units, dict) else units
+    batch, chars = [], 0
+    for path, value in items:
+        text = _unit_text(value)
+        pieces = chunking.split_source(path, text, max_chars) if max_chars and len(text) > max_chars else [(path, text)]
+        for name, piece in pieces:
+            if batch and (len(batch) >= batch_size or (max_chars and chars + len(piece) > max_chars)):
+                yield batch
+                batch, chars = [], 0
+            batch.append((name, piece))
+            chars += len(piece)
+    if batch:
+        yield batch
+
+
+def _analyze_batch(label: str, batch: list[tuple[str, str]]) -> list[dict]:
+    """Analyze one batch; output cut off at max_tokens is retried as two half batches."""
+    prompt = f"Batch {label}:\n{json.dumps(dict(batch))}"
+
+    def call(model, prompt=prompt):
+        return llm_utils.chat(
+            client,
+            "discovery_node",
+            model=model,
             messages=[
-                {"role": "system", "content": "Return only valid JSON."},
+                {"role": "system", "content": ANALYZE_SYSTEM},
                 {"role": "user", "content": prompt},
             ],
             max_tokens=4000,
+            log_fields={"step": "analyze_units"},
         )
 
-        text = response.choices[0].message.content.strip()
-        try:
-            parsed = json.loads(text)
-        except json.JSONDecodeError:
-            parsed = {"error": "invalid_json", "raw_text": text}
+    # Batches of small, plain files go to the fast tier
+    parsed, reason = model_router.run(
+        "analyze_units", batch, call,
+        parse=lambda r: (_parse_json(r, "raw_text"), chunking.finish_reason(r)),
+        validate=lambda v: v[1] != "length" and model_router.valid_json_keys()(v[0]),
+        strong_model=MODEL,
+    )
+    if reason != "length":
+        return [parsed]
+    names = [p for p, _ in batch]
+    chunking.record_truncation("analyze_output", f"batch {label}", units=names, max_tokens=4000, recovered=len(batch) > 1)
+    if len(batch) == 1:
+        return [parsed]
+    half = len(batch) // 2
+    return _analyze_batch(f"{label}a", batch[:half]) + _analyze_batch(f"{label}b", batch[half:])
+
+
+def analyze_units(units):
+    """
+    Deeply analyze Rails models, controllers, routes, and views via LLM.
 
-        results.append(parsed)
+    Args:
+        units: mapping of {path: content | file record}, or an iterable of
+            (path, record) pairs such as file_tools.iter_files() — consumed lazily.
 
-    # Merge batch results
+    Returns:
+        dict: structured analysis including models, controllers, routes, views, dependencies
+    """
     merged = {"models": [], "controllers": [], "routes": [], "views": [], "dependencies": []}
-    for r in results:
-        for key in merged.keys():
-            if key in r and isinstance(r[key], list):
-                merged[key].extend(r[key])
+    if not units:
+        return merged
 
+    batch_size = 20
+    split = False
+    for i, batch in enumerate(_iter_batches(units, batch_size, chunking.ANALYZE_BATCH_CHARS)):
+        split = split or any("#part" in p for p, _ in batch)
+        # Merge batch results as they arrive
+        for parsed in _analyze_batch(str(i + 1), batch):
+            for key in merged.keys():
+                if key in parsed and isinstance(parsed[key], list):
+                    merged[key].extend(parsed[key])
+
+    # Entries of files analyzed in parts describe the same unit: merge them back by name
+    if split:
+        merged = {key: chunking.merge_entries(entries) for key, entries in merged.items()}
     return merged
 
 
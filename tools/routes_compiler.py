@@ -0,0 +1,457 @@
+# tools/routes_compiler.py
+"""
+Deterministic compiler from Rails config/routes.rb to Django urls.py.
+
+Supported DSL: resources/resource (only, except, path, controller, as, param,
+module, concerns), member/collection blocks and `on:`, namespace, scope
+(path/module/as/controller), controller blocks, root, get/post/put/patch/delete
+and match (to:, via:, as:, controller:/action:, "path" => "c#a"), redirect(),
+concern/concerns. Anything else (devise_for, mount, constraints lambdas, ...)
+is recorded under "skipped" so nothing disappears silently.
+
+    table = routes_compiler.parse_routes(open("config/routes.rb").read())
+    report = routes_compiler.apply_to_blueprint(blueprint, table)
+"""
+
+import re
+from tools import inflection, ruby_dsl
+
+HTTP_VERBS = ("get", "post", "put", "patch", "delete")
+RESOURCE_ACTIONS = ["index", "create", "new", "edit", "show", "update", "destroy"]
+SINGULAR_RESOURCE_ACTIONS = ["create", "new", "edit", "show", "update", "destroy"]
+_TRANSPARENT_BLOCKS = {"constraints", "defaults", "authenticate", "authenticated", "unauthenticated",
+                       "devise_scope", "with_options", "if", "unless", "begin", "case", "while"}
+
+
+# ---------------------------------------------------------------------
+# Evaluation
+# ---------------------------------------------------------------------
+def _join_path(*parts) -> str:
+    segs = []
+    for p in parts:
+        if not p:
+            continue
+        segs.extend(s for s in str(p).split("/") if s)
+    return "/" + "/".join(segs)
+
+
+def _join_name(*parts) -> str:
+    return "_".join(p for p in parts if p)
+
+
+class _Compiler:
+    def __init__(self):
+        self.routes = []
+        self.skipped = []
+        self.concerns = {}
+
+    # ctx: path, module, name, controller, scope (None|"resources"|"resource"|"member"|"collection"), res
+    def run(self, statements, ctx):
+        for stmt in statements:
+            method = stmt.get("method")
+            handler = getattr(self, f"_do_{method}", None) if method else None
+            if method in HTTP_VERBS or method == "match":
+                self._verb(stmt, ctx)
+            elif handler:
+                handler(stmt, ctx)
+            elif method in _TRANSPARENT_BLOCKS and stmt["block"]:
+                self.run(stmt["children"], ctx)
+            elif method == "draw":
+                self._skip(stmt, "routes split across files (draw) — compile each file separately")
+            else:
+                self._skip(stmt, "unsupported routes DSL")
+
+    def _skip(self, stmt, reason):
+        self.skipped.append({"line": stmt.get("line"), "code": stmt.get("code"), "reason": reason})
+
+    def _add(self, verbs, path, controller, action, name=None, redirect=None, stmt=None):
+        if not controller and not redirect:
+            self._skip(stmt or {}, "route without a resolvable controller")
+            return
+        self.routes.append({
+            "verbs": [v.upper() for v in verbs],
+            "path": path,
+            "controller": controller,
+            "action": action,
+            "name": name or None,
+            "redirect": redirect,
+            "line": (stmt or {}).get("line"),
+        })
+
+    def _controller(self, ctx, name):
+        return "/".join(p for p in (*ctx["module"], name) if p)
+
+    # --- scoping ------------------------------------------------------
+    def _do_namespace(self, stmt, ctx):
+        name = stmt["args"][0] if stmt["args"] else None
+        kw = stmt["kwargs"]
+        self.run(stmt["children"], {
+            **ctx,
+            "path": ctx["path"] + [kw.get("path", name)],
+            "module": ctx["module"] + [kw.get("module", name)],
+            "name": ctx["name"] + [kw.get("as", name)],
+            "scope": None,
+        })
+
+    def _do_scope(self, stmt, ctx):
+        kw = stmt["kwargs"]
+        path = stmt["args"][0] if stmt["args"] and isinstance(stmt["args"][0], str) else kw.get("path")
+        new = {**ctx, "path": ctx["path"] + [path]}
+        if kw.get("module"):
+            new["module"] = ctx["module"] + [kw["module"]]
+        if kw.get("as"):
+            new["name"] = ctx["name"] + [kw["as"]]
+        if kw.get("controller"):
+            new["controller"] = self._controller(new, kw["controller"])
+        self.run(stmt["children"], new)
+
+    def _do_controller(self, stmt, ctx):
+        name = stmt["args"][0] if stmt["args"] else None
+        self.run(stmt["children"], {**ctx, "controller": self._controller(ctx, name)})
+
+    def _do_concern(self, stmt, ctx):
+        if stmt["args"]:
+            self.concerns[stmt["args"][0]] = stmt["children"]
+
+    def _do_concerns(self, stmt, ctx):
+        for name in stmt["args"]:
+            for concern in ruby_dsl.as_list(name):
+                self._apply_concern(concern, stmt, ctx)
+
+    def _apply_concern(self, name, stmt, ctx):
+        if name not in self.concerns:
+            self._skip(stmt, f"unknown concern {name!r}")
+            return
+        self.run(self.concerns[name], ctx)
+
+    def _do_root(self, stmt, ctx):
+        kw = stmt["kwargs"]
+        target = kw.get("to") or (stmt["args"][0] if stmt["args"] else None)
+        controller, action = self._target(target, kw, ctx)
+        self._add(["get"], _join_path(*ctx["path"]) if ctx["path"] else "/", controller, action,
+                  _join_name(*ctx["name"], "root"), stmt=stmt)
+
+    def _do_member(self, stmt, ctx):
+        if ctx.get("scope") in ("resources", "resource"):
+            self.run(stmt["children"], {**ctx, "scope": "member"})
+        else:
+            self._skip(stmt, "member block outside resources")
+
+    def _do_collection(self, stmt, ctx):
+        if ctx.get("scope") == "resources":
+            self.run(stmt["children"], {**ctx, "scope": "collection"})
+        else:
+            self._skip(stmt, "collection block outside resources")
+
+    def _do_devise_for(self, stmt, ctx):
+        self._skip(stmt, "devise_for — map to django.contrib.auth / allauth urls manually")
+
+    def _do_mount(self, stmt, ctx):
+        self._skip(stmt, "mounted Rack/engine application")
+
+    # --- resources ----------------------------------------------------
+    def _do_resources(self, stmt, ctx, singular=False):
+        kw = stmt["kwargs"]
+        names = [a for a in stmt["args"] if isinstance(a, str)]
+        for res_name in names:
+            plural = res_name if not singular else inflection.pluralize(res_name)
+            single = inflection.singularize(res_name)
+            res_path = kw.get("path", res_name)
+            as_name = kw.get("as")
+            module_ctx = {**ctx, "module": ctx["module"] + ([kw["module"]] if kw.get("module") else [])}
+            controller = self._controller(module_ctx, kw.get("controller", plural))
+            param = kw.get("param", "id")
+            base_path = ctx["path"] + [res_path]
+            coll_name = ctx["name"] + [as_name or (res_name if singular else plural)]
+            member_name = ctx["name"] + [as_name and inflection.singularize(as_name) or single]
+            member_path = base_path if singular else base_path + [f":{param}"]
+
+            actions = list(SINGULAR_RESOURCE_ACTIONS if singular else RESOURCE_ACTIONS)
+            if "only" in kw:
+                only = set(ruby_dsl.as_list(kw["only"]))
+                actions = [a for a in actions if a in only]
+            if "except" in kw:
+                excluded = set(ruby_dsl.as_list(kw["except"]))
+                actions = [a for a in actions if a not in excluded]
+
+            res = {"controller": controller, "plural": plural, "singular": single,
+                   "collection_path": base_path, "member_path": member_path,
+                   "collection_name": coll_name, "member_name": member_name, "singular_resource": singular}
+            for action in actions:
+                if action == "index":
+                    self._add(["get"], _join_path(*base_path), controller, action, _join_name(*coll_name), stmt=stmt)
+                elif action == "create":
+                    self._add(["post"], _join_path(*base_path), controller, action,
+                              _join_name(*coll_name) if singular else None, stmt=stmt)
+                elif action == "new":
+                    self._add(["get"], _join_path(*base_path, "new"), controller, action,
+                              _join_name("new", *member_name), stmt=stmt)
+                elif action == "edit":
+                    self._add(["get"], _join_path(*member_path, "edit"), controller, action,
+                              _join_name("edit", *member_name), stmt=stmt)
+                elif action == "show":
+                    self._add(["get"], _join_path(*member_path), controller, action, _join_name(*member_name), stmt=stmt)
+                elif action == "update":
+                    self._add(["patch", "put"], _join_path(*member_path), controller, action, stmt=stmt)
+                elif action == "destroy":
+                    self._add(["delete"], _join_path(*member_path), controller, action, stmt=stmt)
+
+            nested_path = base_path if singular else base_path + [f":{single}_id"]
+            child_ctx = {**ctx, "path": nested_path, "name": member_name, "scope": "resource" if singular else "resources",
+                         "res": res, "controller": None}
+            for concern in ruby_dsl.as_list(kw.get("concerns")):
+                self._apply_concern(concern, stmt, child_ctx)
+            if stmt["children"]:
+                self.run(stmt["children"], child_ctx)
+
+    def _do_resource(self, stmt, ctx):
+        self._do_resources(stmt, ctx, singular=True)
+
+    # --- verbs --------------------------------------------------------
+    def _target(self, target, kw, ctx):
+        if isinstance(target, dict) and "__redirect__" in target:
+            return None, None
+        if isinstance(target, str) and "#" in target:
+            controller, action = target.split("#", 1)
+            return self._controller(ctx, controller), action
+        if kw.get("controller") or kw.get("action"):
+            controller = self._controller(ctx, kw["controller"]) if kw.get("controller") else ctx.get("controller")
+            return controller, kw.get("action")
+        return ctx.get("controller"), target if isinstance(target, str) else None
+
+    def _verb(self, stmt, ctx):
+        kw = stmt["kwargs"]
+        method = stmt["method"]
+        verbs = [method] if method != "match" else [v for v in ruby_dsl.as_list(kw.get("via", "get")) if v]
+        if "all" in verbs:
+            verbs = list(HTTP_VERBS)
+        raw_path = stmt["args"][0] if stmt["args"] else None
+        if not isinstance(raw_path, str):
+            self._skip(stmt, "route path is not a literal")
+            return
+        redirect = kw.get("to", {}).get("__redirect__") if isinstance(kw.get("to"), dict) else None
+        scope = ctx.get("scope")
+        on = kw.get("on")
+        if on in ("member", "collection"):
+            scope = on
+
+        res = ctx.get("res")
+        if scope in ("member", "collection", "resources", "resource") and res and "to" not in kw:
+            action = kw.get("action", raw_path.strip("/").split("/")[-1])
+            segment = kw.get("path", raw_path)
+            if scope == "member":
+                path = _join_path(*res["member_path"], segment)
+                name = _join_name(kw.get("as", action), *res["member_name"])
+            elif scope == "collection":
+                path = _join_path(*res["collection_path"], segment)
+                name = _join_name(kw.get("as", action), *res["collection_name"])
+            else:
+                path = _join_path(*ctx["path"], segment)
+                name = _join_name(*ctx["name"], kw.get("as", action))
+            self._add(verbs, path, kw.get("controller") and self._controller(ctx, kw["controller"]) or res["controller"],
+                      action, name, stmt=stmt)
+            return
+
+        path = _join_path(*ctx["path"], raw_path)
+        target = kw.get("to")
+        controller, action = self._target(target, kw, ctx)
+        if controller is None and not redirect:
+            # get "pages/about" → pages#about
+            segs = [s for s in raw_path.strip("/").split("/") if s and not s.startswith((":", "*", "("))]
+            if len(segs) >= 2:
+                controller, action = self._controller(ctx, "/".join(segs[:-1])), segs[-1]
+        if action is None and not redirect:
+            segs = [s for s in raw_path.strip("/").split("/") if s and not s.startswith((":", "*", "("))]
+            action = segs[-1] if segs else None
+        name = kw.get("as")
+        if name is None and not re.search(r"[:*(]", raw_path):
+            auto = re.sub(r"\W+", "_", raw_path.strip("/")).strip("_")
+            name = _join_name(*ctx["name"], auto) if auto else None
+        elif name is not None:
+            name = _join_name(*ctx["name"], name)
+        self._add(verbs, path, controller, action, name, redirect=redirect, stmt=stmt)
+
+
+def parse_routes(source: str) -> dict:
+    """Parse routes.rb source into {"routes": [...], "skipped": [...]}."""
+    tree = ruby_dsl.build_tree(source)
+    # Unwrap Rails.application.routes.draw do ... end
+    statements = []
+    for stmt in tree:
+        if (stmt.get("method") or "").endswith("routes.draw") or (stmt.get("method") is None and stmt["block"]):
+            statements.extend(stmt["children"])
+        else:
+            statements.append(stmt)
+    compiler = _Compiler()
+    compiler.run(statements, {"path": [], "module": [], "name": [], "controller": None, "scope": None, "res": None})
+    return {"routes": compiler.routes, "skipped": compiler.skipped}
+
+
+# ---------------------------------------------------------------------
+# Django generation
+# ---------------------------------------------------------------------
+def view_name(controller: str, action: str) -> str:
+    """admin/posts + index → AdminPostsIndexView."""
+    return f"{inflection.camelize(controller)}{inflection.camelize(action)}View"
+
+
+def django_path(rails_path: str) -> str:
+    """/posts/:post_id/comments/:id(.:format) → posts/<int:post_id>/comments/<int:pk>/"""
+    path = re.sub(r"\(\.:format\)", "", rails_path)
+    path = re.sub(r"\([^)]*\)", "", path)  # optional segments are dropped
+    segs = []
+    for seg in path.strip("/").split("/"):
+        if not seg:
+            continue
+        if seg == ":id":
+            segs.append("<int:pk>")
+        elif re.fullmatch(r":\w+_id", seg):
+            segs.append(f"<int:{seg[1:]}>")
+        elif seg.startswith(":"):
+            segs.append(f"<str:{seg[1:]}>")
+        elif seg.startswith("*"):
+            segs.append(f"<path:{seg[1:] or 'path'}>")
+        else:
+            segs.append(seg)
+    return "/".join(segs) + "/" if segs else ""
+
+
+def route_summary(table: dict) -> list[str]:
+    """Compact one-line-per-route listing, used in prompts and rails_units."""
+    lines = []
+    for r in table.get("routes", []):
+        target = f"redirect {r['redirect']}" if r.get("redirect") else view_name(r["controller"], r["action"] or "")
+        name = f" (name: {r['name']})" if r.get("name") else ""
+        lines.append(f"{'/'.join(r['verbs'])} {r['path']} → {target}{name}")
+    return lines
+
+
+def required_views(table: dict) -> dict:
+    """{controller: [ViewClassName, ...]} for every routed action."""
+    views = {}
+    for r in table.get("routes", []):
+        if r.get("redirect") or not r.get("controller") or not r.get("action"):
+            continue
+        names = views.setdefault(r["controller"], [])
+        v = view_name(r["controller"], r["action"])
+        if v not in names:
+            names.append(v)
+    return views
+
+
+_DISPATCH_HELPER = '''
+
+def _by_method(handlers):
+    """Route one URL to per-HTTP-method views, honouring Rails' _method override."""
+
+    def dispatch(request, *args, **kwargs):
+        method = request.method
+        if method == "POST":
+            method = request.POST.get("_method", method).upper()
+        handler = handlers.get(method)
+        if handler is None:
+            return HttpResponseNotAllowed(list(handlers))
+        # Class-based views dispatch on request.method: make it the overridden verb
+        request.method = method
+        return handler(request, *args, **kwargs)
+
+    return dispatch
+'''
+
+
+def _defined_classes(code: str) -> set[str]:
+    return set(re.findall(r"^class\s+(\w+)\s*[\(:]", code or "", flags=re.MULTILINE))
+
+
+def assign_routes(table: dict, apps_views: dict) -> tuple[dict, list]:
+    """
+    Bind each route to the app whose views_code defines its view class.
+    Returns ({app: [route, ...]}, [unbound routes]).
+    """
+    owners = {}
+    for app, code in apps_views.items():
+        for cls in _defined_classes(code):
+            owners.setdefault(cls, app)
+    default_app = next(iter(apps_views), None)
+    bound, unbound = {app: [] for app in apps_views}, []
+    for r in table.get("routes", []):
+        if r.get("redirect"):
+            if default_app:
+                bound[default_app].append(r)
+            continue
+        app = owners.get(view_name(r["controller"], r["action"] or ""))
+        if app:
+            bound[app].append(r)
+        else:
+            unbound.append(r)
+    return bound, unbound
+
+
+def generate_app_urls(routes: list[dict]) -> str:
+    """Generate one app's urls.py from its bound routes."""
+    grouped = {}
+    for r in routes:
+        entry = grouped.setdefault(django_path(r["path"]), {"handlers": {}, "name": None})
+        target = (f'RedirectView.as_view(url="{r["redirect"]}", permanent=True)' if r.get("redirect")
+                  else f"views.{view_name(r['controller'], r['action'])}.as_view()")
+        for verb in r["verbs"]:
+            entry["handlers"].setdefault(verb, target)
+        entry["name"] = entry["name"] or r.get("name")
+
+    needs_dispatch = any(len(set(e["handlers"].values())) > 1 for e in grouped.values())
+    needs_redirect = any(r.get("redirect") for r in routes)
+    lines = ["from django.urls import path"]
+    if needs_dispatch:
+        lines.insert(0, "from django.http import HttpResponseNotAllowed")
+    if needs_redirect:
+        lines.append("from django.views.generic import RedirectView")
+    lines.append("from . import views")
+    code = "\n".join(lines) + "\n"
+    if needs_dispatch:
+        code += _DISPATCH_HELPER
+    code += "\n\nurlpatterns = [\n"
+    for pattern, entry in grouped.items():
+        targets = set(entry["handlers"].values())
+        if len(targets) == 1:
+            view = targets.pop()
+        else:
+            pairs = ", ".join(f'"{verb}": {target}' for verb, target in entry["handlers"].items())
+            view = f"_by_method({{{pairs}}})"
+        name = f', name="{entry["name"]}"' if entry["name"] else ""
+        code += f'    path("{pattern}", {view}{name}),\n'
+    code += "]\n"
+    return code
+
+
+def generate_root_urls(app_names: list[str], table: dict) -> str:
+    """Root urls.py: Django admin plus an include() per app (apps carry full paths)."""
+    rails_admin = any(r["path"].strip("/").split("/")[0] == "admin" for r in table.get("routes", []))
+    admin_prefix = "django-admin/" if rails_admin else "admin/"
+    code = "from django.contrib import admin\nfrom django.urls import include, path\n\nurlpatterns = [\n"
+    code += f'    path("{admin_prefix}", admin.site.urls),\n'
+    for app in app_names:
+        code += f'    path("", include("{app}.urls")),\n'
+    code += "]\n"
+    return code
+
+
+def apply_to_blueprint(blueprint: dict, table: dict) -> dict:
+    """
+    Replace urls_code in the blueprint with compiled routes.
+    Returns a report with bound/unbound/skipped counts.
+    """
+    apps = blueprint.get("apps", []) or []
+    if not table.get("routes") or not apps:
+        return {"routes": len(table.get("routes", [])), "applied": False}
+    bound, unbound = assign_routes(table, {a.get("name", "app"): a.get("views_code", "") for a in apps})
+    for app in apps:
+        app["urls_code"] = generate_app_urls(bound.get(app.get("name", "app"), []))
+    blueprint["urls_code"] = generate_root_urls([a.get("name", "app") for a in apps], table)
+    return {
+        "routes": len(table["routes"]),
+        "applied": True,
+        "bound": sum(len(v) for v in bound.values()),
+        "unbound": [f"{'/'.join(r['verbs'])} {r['path']} → {view_name(r['controller'] or '', r['action'] or '')}"
+                    for r in unbound],
+        "skipped": table.get("skipped", []),
+    }
@@ -0,0 +1,201 @@
+# tools/ruby_dsl.py
+"""
+Small line-oriented parser for Ruby DSL files (routes.rb, schema.rb, migrations).
+
+It does not try to understand Ruby in general: each logical line becomes a
+statement {"method", "args", "kwargs", "block", "children"}, `do ... end`
+(and class/def/if bodies) nest, and literal arguments (symbols, strings,
+arrays, %i[], hashes) are decoded. Anything else is kept as {"__raw__": text}.
+"""
+
+import re
+
+def strip_comment(line: str) -> str:
+    quote = None
+    for i, ch in enumerate(line):
+        if quote:
+            if ch == "\\":
+                continue
+            if ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch == "#" and not line[i:i + 2] == "#{":
+            return line[:i].rstrip()
+    return line.rstrip()
+
+
+def split_top(text: str, sep: str = ",") -> list[str]:
+    """Split on sep outside quotes and brackets."""
+    parts, depth, quote, buf = [], 0, None, []
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            buf.append(ch)
+            if ch == "\\" and i + 1 < len(text):
+                buf.append(text[i + 1])
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+            buf.append(ch)
+        elif ch in "([{":
+            depth += 1
+            buf.append(ch)
+        elif ch in ")]}":
+            depth -= 1
+            buf.append(ch)
+        elif ch == sep and depth == 0:
+            parts.append("".join(buf).strip())
+            buf = []
+        else:
+            buf.append(ch)
+        i += 1
+    if "".join(buf).strip():
+        parts.append("".join(buf).strip())
+    return parts
+
+
+def parse_value(text: str):
+    text = text.strip()
+    if not text:
+        return None
+    if text[0] in "\"'" and text[-1] == text[0]:
+        return text[1:-1]
+    if text.startswith(":") and re.fullmatch(r":\w+[?!]?", text):
+        return text[1:]
+    if text.startswith(":\"") or text.startswith(":'"):
+        return text[2:-1]
+    m = re.fullmatch(r"%[iwIW][\[\(\{](.*)[\]\)\}]", text, flags=re.DOTALL)
+    if m:
+        return m.group(1).split()
+    if text.startswith("[") and text.endswith("]"):
+        return [parse_value(p) for p in split_top(text[1:-1])]
+    if text.startswith("{") and text.endswith("}"):
+        return parse_args(text[1:-1])[1]
+    if text in ("true", "false"):
+        return text == "true"
+    if text == "nil":
+        return None
+    if re.fullmatch(r"-?\d[\d_]*", text):
+        return int(text.replace("_", ""))
+    if re.fullmatch(r"-?\d[\d_]*\.\d+", text):
+        return float(text.replace("_", ""))
+    m = re.fullmatch(r"redirect\(?\s*(['\"])(.*?)\1.*", text)
+    if m:
+        return {"__redirect__": m.group(2)}
+    return {"__raw__": text}
+
+
+def parse_args(text: str) -> tuple[list, dict]:
+    """Parse a Ruby call's argument list into (positional, keyword) values."""
+    args, kwargs = [], {}
+    for part in split_top(text):
+        m = re.match(r"^(\w+):\s+(.*)$", part, flags=re.DOTALL) or re.match(r"^(\w+):(?!:)(.+)$", part, flags=re.DOTALL)
+        if m:
+            kwargs[m.group(1)] = parse_value(m.group(2))
+            continue
+        if "=>" in part:
+            key, value = part.split("=>", 1)
+            key_val = parse_value(key)
+            if isinstance(key_val, str) and key.strip().startswith(":"):
+                kwargs[key_val] = parse_value(value)
+            else:
+                # "path" => "controller#action"
+                args.append(key_val)
+                kwargs["to"] = parse_value(value)
+            continue
+        args.append(parse_value(part))
+    return args, kwargs
+
+
+_HEREDOC = re.compile(r"<<[-~]?(['\"]?)([A-Z_][A-Z0-9_]*)\1")
+_BLOCK_KEYWORDS = ("if", "unless", "case", "while", "until", "begin", "class", "module", "def")
+
+
+def logical_lines(source: str):
+    """
+    Yield (line_no, text) joining continuation lines (trailing comma / open
+    bracket). Heredoc bodies are swallowed into the statement that opens them.
+    """
+    buf, start, depth, heredoc = [], None, 0, None
+    for no, raw in enumerate(source.splitlines(), start=1):
+        if heredoc:
+            if raw.strip() == heredoc:
+                heredoc = None
+                if depth <= 0:
+                    yield start, " ".join(buf)
+                    buf, start, depth = [], None, 0
+            continue
+        line = strip_comment(raw).strip()
+        if not line and not buf:
+            continue
+        if start is None:
+            start = no
+        buf.append(line)
+        m = _HEREDOC.search(line)
+        if m:
+            heredoc = m.group(2)
+            continue
+        depth += sum(line.count(c) for c in "([") - sum(line.count(c) for c in ")]")
+        if depth > 0 or line.endswith((",", "\\")):
+            continue
+        yield start, " ".join(buf).replace("\\ ", " ")
+        buf, start, depth = [], None, 0
+    if buf:
+        yield start, " ".join(buf)
+
+
+def parse_statement(line: str) -> dict:
+    """Parse one logical line; `method` may carry a receiver (e.g. "t.string")."""
+    block = False
+    m = re.search(r"\s+do(\s*\|[^|]*\|)?\s*$", line)
+    if m:
+        block = True
+        line = line[:m.start()]
+    conditional = False
+    m = re.search(r"\s+(if|unless)\s+[^\"']+$", line)
+    if m and not line.startswith(("if ", "unless ")):
+        conditional = True
+        line = line[:m.start()]
+    m = re.match(r"^((?:\w+\.)*[a-z_]\w*[?!]?)\s*(\((.*)\)\s*$|\s+(.*)$|$)", line, flags=re.DOTALL)
+    if not m:
+        return {"method": None, "code": line, "block": block, "children": []}
+    method = m.group(1)
+    arg_text = m.group(3) if m.group(3) is not None else (m.group(4) or "")
+    if method in _BLOCK_KEYWORDS:
+        block = True
+        args, kwargs = [arg_text.strip()], {}
+    else:
+        args, kwargs = parse_args(arg_text) if arg_text else ([], {})
+    return {"method": method, "args": args, "kwargs": kwargs, "code": line,
+            "block": block, "conditional": conditional, "children": []}
+
+
+def build_tree(source: str) -> list[dict]:
+    """Parse source into nested statements following do/end (and keyword) blocks."""
+    root = {"children": []}
+    stack = [root]
+    for no, line in logical_lines(source):
+        if line == "end" or line.startswith(("end ", "end.", "end)")):
+            if len(stack) > 1:
+                stack.pop()
+            continue
+        if line.startswith(("else", "elsif", "when ", "rescue", "ensure")):
+            continue
+        stmt = parse_statement(line)
+        stmt["line"] = no
+        stack[-1]["children"].append(stmt)
+        if stmt["block"]:
+            stack.append(stmt)
+    return root["children"]
+
+
+def as_list(value) -> list:
+    """Wrap scalars in a list; None becomes []."""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
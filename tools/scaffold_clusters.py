@@ -0,0 +1,390 @@
+# tools/scaffold_clusters.py
+"""
+Clustering of scaffold-style controllers.
+
+Controllers are normalised (resource names → placeholders, permitted params
+→ a single marker, comments and whitespace dropped), cut into token
+shingles and grouped greedily by Jaccard similarity against each cluster's
+exemplar (the first controller seen). Only exemplars are sent to the LLM
+in discovery; in conversion the LLM writes views for exemplars only and
+the members' Django views are produced locally by renaming the exemplar's
+view classes and swapping its permitted fields for the member's.
+
+    SCAFFOLD_SIMILARITY=0.9   Jaccard threshold for joining a cluster
+"""
+
+import os
+import re
+import json
+from tools import inflection, template_dedup
+
+SIMILARITY = float(os.getenv("SCAFFOLD_SIMILARITY", "0.9"))
+SHINGLE = 5
+
+_COMMENT = re.compile(r"#[^{\n][^\n]*")
+_PERMIT = re.compile(r"\.permit\(([^)]*)\)", re.DOTALL)
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_CLASS_BLOCK = re.compile(r"^class\s+(\w+)\b.*?(?=^\S|\Z)", re.MULTILINE | re.DOTALL)
+_IMPORT = re.compile(r"^(?:from\s+\S+\s+import\s+.+|import\s+.+)$", re.MULTILINE)
+_FROM_IMPORT = re.compile(r"^from\s+(\S+)\s+import\s+(\([^)]*\)|.+)$", re.MULTILINE)
+_PLAIN_IMPORT = re.compile(r"^import\s+.+$", re.MULTILINE)
+# Blueprint field holding the code of an app module, to check what it defines
+_MODULE_CODE = {"models": "models_code", "views": "views_code", "urls": "urls_code", "admin": "admin_code",
+                "tasks": "tasks_code"}
+_LITERAL_LIST = re.compile(r"[\[\(]\s*((?:['\"]\w+['\"]\s*,\s*)*['\"]\w+['\"]\s*,?)\s*[\]\)]")
+
+
+def controller_path(path: str) -> str | None:
+    norm = path.replace("\\", "/")
+    m = re.search(r"(?:^|/)app/controllers/(.+)_controller\.rb$", norm)
+    return m.group(1) if m else None
+
+
+def resource_of(ctrl_path: str) -> str | None:
+    """Resource of a controller path, or None when renaming it would be unsafe."""
+    resource = ctrl_path.split("/")[-1]
+    if resource == "application" or inflection.singularize(resource).lower() in template_dedup._UNSAFE_RESOURCES:
+        return None
+    return resource
+
+
+def permitted_params(source: str) -> list[str]:
+    """Attribute names from `.permit(:a, :b, tag_ids: [])`."""
+    names = []
+    for args in _PERMIT.findall(source):
+        names += re.findall(r":(\w+)(?!\s*=>)|(\w+):\s", args)
+    out = []
+    for sym, key in names:
+        name = sym or key
+        if name and name not in out:
+            out.append(name)
+    return out
+
+
+def _variants(resource: str) -> list[tuple[str, str]]:
+    return template_dedup._variants(resource)
+
+
+def substitute(text: str, exemplar_resource: str, resource: str) -> str:
+    """
+    Rename one resource to another in Ruby/Python code. Unlike templates,
+    CamelCase names may be embedded in longer class names (AdminPostsIndexView).
+    """
+    pairs = _variants(exemplar_resource)
+    lookup = dict(pairs)
+    alternatives = []
+    for word, _ in pairs:
+        if word[:1].isupper():
+            alternatives.append(r"(?<![A-Z0-9])" + re.escape(word) + r"(?![a-z0-9])")
+        else:
+            alternatives.append(r"(?<![A-Za-z0-9])" + re.escape(word) + r"(?![a-z0-9])")
+    pattern = re.compile("(" + "|".join(alternatives) + ")")
+    placeheld = pattern.sub(lambda m: lookup[m.group(1)], text)
+    for word, placeholder in _variants(resource):
+        placeheld = placeheld.replace(placeholder, word)
+    return placeheld
+
+
+def normalise(source: str, resource: str | None) -> str:
+    text = _COMMENT.sub("", source)
+    text = _PERMIT.sub(".permit(__PARAMS__)", text)
+    if resource:
+        text = template_dedup._substitute(text, _variants(resource))
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def shingles(text: str, k: int = SHINGLE) -> set:
+    tokens = _TOKEN.findall(text)
+    if len(tokens) <= k:
+        return {tuple(tokens)}
+    return {tuple(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class ControllerClusters:
+    """Greedy online clustering; add() tells whether a controller is an exemplar."""
+
+    def __init__(self, threshold: float = SIMILARITY):
+        self.threshold = threshold
+        self.controllers = 0
+        self.clusters = []   # [{"exemplar": path, "shingles": set, "members": [path]}]
+        self.info = {}       # path -> {"controller": ctrl_path, "resource", "params"}
+        self.member_of = {}  # member path -> exemplar path
+
+    def add(self, path: str, source: str) -> bool:
+        """Record a controller; returns False if it joined an existing cluster."""
+        ctrl = controller_path(path)
+        if ctrl is None:
+            return True
+        self.controllers += 1
+        resource = resource_of(ctrl)
+        self.info[path] = {"controller": ctrl, "resource": resource, "params": permitted_params(source)}
+        sig = shingles(normalise(source, resource))
+        if resource:
+            namespace = ctrl.rpartition("/")[0]
+            for cluster in self.clusters:
+                ex = self.info[cluster["exemplar"]]
+                if ex["resource"] and ex["controller"].rpartition("/")[0] == namespace \
+                        and jaccard(sig, cluster["shingles"]) >= self.threshold:
+                    cluster["members"].append(path)
+                    self.member_of[path] = cluster["exemplar"]
+                    return False
+        self.clusters.append({"exemplar": path, "shingles": sig, "members": []})
+        return True
+
+    def summary(self) -> dict:
+        families = []
+        for cluster in self.clusters:
+            if not cluster["members"]:
+                continue
+            ex = self.info[cluster["exemplar"]]
+            families.append({
+                "exemplar": {"path": cluster["exemplar"], **ex},
+                "members": [{"path": m, **self.info[m]} for m in cluster["members"]],
+            })
+        return {
+            "controllers": self.controllers,
+            "clusters": len(self.clusters),
+            "families": families,
+            "members": len(self.member_of),
+        }
+
+
+# ---------------------------------------------------------------------
+# discovery: analysis entries for members
+# ---------------------------------------------------------------------
+def expand_analysis(analysis: dict, summary: dict) -> int:
+    """Add rails_units entries for cluster members, renamed from their exemplar's entries."""
+    added = 0
+    for family in summary.get("families", []):
+        ex = family["exemplar"]
+        ex_class = f"{inflection.camelize(ex['controller'])}Controller"
+        ruby_class = "::".join(inflection.camelize(p) for p in ex["controller"].split("/")) + "Controller"
+        names = (ruby_class, ex_class, f"{ex['controller']}_controller")
+        pattern = re.compile(r"(?<![\w:])(?:" + "|".join(re.escape(n) for n in names) + r")(?!\w)")
+        for key in ("controllers", "routes", "dependencies"):
+            entries = analysis.get(key)
+            if not isinstance(entries, list):
+                continue
+            exemplar_entries = [e for e in entries if pattern.search(json.dumps(e))]
+            for member in family["members"]:
+                for entry in exemplar_entries:
+                    text = substitute(json.dumps(entry), ex["resource"], member["resource"])
+                    try:
+                        clone = json.loads(text)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(clone, dict) and key == "controllers":
+                        clone["permitted_params"] = member["params"]
+                        clone["generated_from"] = ex_class
+                    entries.append(clone)
+                    added += 1
+    return added
+
+
+# ---------------------------------------------------------------------
+# conversion: member views from exemplar views
+# ---------------------------------------------------------------------
+def prompt_section(summary: dict) -> str:
+    """SCAFFOLD FAMILIES payload for the blueprint prompt."""
+    lines = []
+    for family in summary.get("families", []):
+        ex = family["exemplar"]
+        members = ", ".join(f"{inflection.camelize(m['controller'])}Controller" for m in family["members"])
+        lines.append(f"- {inflection.camelize(ex['controller'])}Controller (exemplar) → {members}")
+    if not lines:
+        return ""
+    return "SCAFFOLD FAMILIES (exemplar → members generated locally):\n" + "\n".join(lines) + "\n\n"
+
+
+def _swap_params(code: str, old: list[str], new: list[str]) -> str:
+    if not old or not new:
+        return code
+
+    def repl(m):
+        items = re.findall(r"['\"](\w+)['\"]", m.group(1))
+        if set(items) != set(old):
+            return m.group(0)
+        quote = "'" if "'" in m.group(0) and '"' not in m.group(0) else '"'
+        body = ", ".join(f"{quote}{p}{quote}" for p in new)
+        return m.group(0)[0] + body + m.group(0)[-1]
+
+    return _LITERAL_LIST.sub(repl, code)
+
+
+def _class_blocks(code: str) -> dict[str, str]:
+    return {m.group(1): m.group(0).rstrip() + "\n" for m in _CLASS_BLOCK.finditer(code or "")}
+
+
+def _import_names(clause: str) -> list[str]:
+    """"a, b as c" or "(a,\n b)" → ["a", "b as c"]."""
+    return [" ".join(n.split()) for n in clause.strip().strip("()").split(",") if n.strip()]
+
+
+def _bound(name: str) -> str:
+    """Name an import entry binds: "b as c" → "c"."""
+    return name.split(" as ")[-1]
+
+
+def _defines(app: dict, leaf: str, name: str) -> bool:
+    if leaf == "models" and name in (app.get("models") or []):
+        return True
+    code = app.get(_MODULE_CODE.get(leaf, ""), "") or ""
+    pattern = rf"^(?:class|def|async\s+def)\s+{re.escape(name)}\b|^{re.escape(name)}\s*[:=]"
+    return bool(re.search(pattern, code, flags=re.MULTILINE))
+
+
+def _locate(apps: list[dict], module: str, name: str, target: dict) -> str | None:
+    """
+    Module to import `name` from in the target app: the target's own module
+    (relative) or another app's (absolute); None if no app defines it. Modules
+    outside the generated apps are taken as they are.
+    """
+    by_name = {a.get("name"): a for a in apps}
+    head, _, leaf = module.lstrip(".").rpartition(".")
+    if not module.startswith(".") and head not in by_name:
+        return module
+    leaf = leaf or module.lstrip(".")
+    preferred = by_name.get(head) if head else target
+    for app in [preferred] + [a for a in apps if a is not preferred]:
+        if app is not None and _defines(app, leaf, name.split(" as ")[0]):
+            return f".{leaf}" if app is target else f"{app.get('name')}.{leaf}"
+    return None
+
+
+def _member_imports(
+    owner: dict, target: dict, apps: list[dict], ex_resource: str, resource: str,
+) -> tuple[dict[str, list[str]], list[str], dict[str, str]]:
+    """
+    Imports of the exemplar's views renamed for one member:
+    ({module: [names]}, plain `import` lines, {renamed: original}). A renamed
+    name that no app defines (e.g. a member form nobody wrote) is not renamed:
+    it is imported from where the exemplar gets it and reverted in the views.
+    """
+    code = owner.get("views_code") or ""
+    modules, reverts = {}, {}
+    for m in _FROM_IMPORT.finditer(code):
+        module = m.group(1)
+        for name in _import_names(m.group(2)):
+            renamed, renamed_module = substitute(name, ex_resource, resource), substitute(module, ex_resource, resource)
+            where = _locate(apps, renamed_module, renamed, target)
+            if where is None and renamed_module.endswith("models") and renamed_module.startswith("."):
+                where = renamed_module  # models from db/schema.rb are only assigned to apps later
+            if where is None and (renamed, renamed_module) != (name, module):
+                reverts[_bound(renamed)] = _bound(name)
+                renamed, renamed_module = name, module
+                where = _locate(apps, module, name, target)
+            if where is None:
+                # Defined nowhere we can see: keep the exemplar's import, from the exemplar's app
+                where = f"{owner.get('name')}{module}" if module.startswith(".") and target is not owner else module
+            names = modules.setdefault(where, [])
+            if renamed not in names:
+                names.append(renamed)
+    plain = [substitute(line, ex_resource, resource) for line in _PLAIN_IMPORT.findall(code)]
+    return modules, plain, reverts
+
+
+def _merge_imports(code: str, modules: dict[str, list[str]], plain: list[str], used: str) -> str:
+    """Add the names `used` needs to the existing `from X import` statements of `code`, or as new ones."""
+    bound = set()
+    for m in _FROM_IMPORT.finditer(code):
+        bound.update(_bound(n) for n in _import_names(m.group(2)))
+    additions = []
+    for module, names in modules.items():
+        names = [n for n in names if _bound(n) not in bound and re.search(rf"\b{re.escape(_bound(n))}\b", used)]
+        if not names:
+            continue
+        bound.update(_bound(n) for n in names)
+        existing = re.search(rf"^from\s+{re.escape(module)}\s+import\s+(\([^)]*\)|.+)$", code, flags=re.MULTILINE)
+        if existing:
+            merged = _import_names(existing.group(1)) + names
+            clause = existing.group(1).strip()
+            if clause.startswith("("):
+                statement = f"from {module} import (\n" + "".join(f"    {n},\n" for n in merged) + ")"
+            else:
+                statement = f"from {module} import {', '.join(merged)}"
+            code = code[:existing.start()] + statement + code[existing.end():]
+        else:
+            additions.append(f"from {module} import {', '.join(names)}")
+    additions += [line for line in dict.fromkeys(plain) if line not in code]
+    if additions:
+        # New imports go right after the existing ones
+        last = list(_IMPORT.finditer(code))
+        at = last[-1].end() if last else 0
+        if last and last[-1].group(0).rstrip().endswith("("):
+            at = code.index(")", at) + 1
+        code = code[:at] + ("\n" if at else "") + "\n".join(additions) + ("" if at else "\n") + code[at:]
+    return code
+
+
+def apply_to_blueprint(blueprint: dict, summary: dict) -> dict:
+    """
+    Generate member views from each exemplar's view classes (renamed, with the
+    member's permitted fields) and add them to the member's app.
+    """
+    report = {
+        "families": len(summary.get("families", [])), "members": 0, "views_generated": 0,
+        "member_views": 0, "missing_exemplar": [],
+    }
+    apps = blueprint.get("apps", [])
+    if not apps:
+        return report
+    for family in summary.get("families", []):
+        ex = family["exemplar"]
+        prefix = inflection.camelize(ex["controller"])
+        owner, blocks = None, {}
+        for app in apps:
+            found = {n: b for n, b in _class_blocks(app.get("views_code")).items() if n.startswith(prefix)}
+            if found:
+                owner, blocks = app, found
+                break
+        if not owner:
+            report["missing_exemplar"].append(ex["controller"])
+            continue
+        helper_blocks = {n: b for n, b in _class_blocks(owner.get("views_code")).items() if n not in blocks}
+        for member in family["members"]:
+            report["members"] += 1
+            resource = member["resource"]
+            target = next(
+                (a for a in apps if (a.get("name") or "").lower() in (resource, inflection.singularize(resource))),
+                owner,
+            )
+            code = target.get("views_code") or ""
+            existing = _class_blocks(code)
+            new_blocks = []
+            for block in blocks.values():
+                renamed = _swap_params(substitute(block, ex["resource"], resource), ex["params"], member["params"])
+                name = re.match(r"class\s+(\w+)", renamed).group(1)
+                if name not in existing:
+                    new_blocks.append(renamed)
+            if not new_blocks:
+                continue
+            # Helper classes the views use (PostForm → UserForm) are renamed along, ahead of the views
+            helpers = []
+            for name, block in helper_blocks.items():
+                renamed_name = substitute(name, ex["resource"], resource)
+                if renamed_name != name and renamed_name not in existing and any(
+                    re.search(rf"\b{renamed_name}\b", b) for b in new_blocks
+                ):
+                    helpers.append(_swap_params(substitute(block, ex["resource"], resource), ex["params"], member["params"]))
+            new_blocks = helpers + new_blocks
+            modules, plain, reverts = _member_imports(owner, target, apps, ex["resource"], resource)
+            for renamed, original in reverts.items():
+                new_blocks = [re.sub(rf"\b{re.escape(renamed)}\b", original, b) for b in new_blocks]
+            code = _merge_imports(code, modules, plain, "\n".join(new_blocks))
+            target["views_code"] = code.rstrip() + "\n\n\n" + "\n\n".join(new_blocks) + "\n"
+            report["views_generated"] += len(new_blocks) - len(helpers)
+
+    # Member view classes present after this pass (stable across re-application)
+    prefixes = tuple(
+        inflection.camelize(m["controller"]) for f in summary.get("families", []) for m in f["members"]
+    )
+    report["member_views"] = sum(
+        1 for app in apps for name in _class_blocks(app.get("views_code")) if prefixes and name.startswith(prefixes)
+    )
+    return report
@@ -0,0 +1,813 @@
+# tools/schema_importer.py
+"""
+Local importer for the Rails database schema (db/schema.rb, or db/migrate/*.rb
+replayed in order when schema.rb is missing).
+
+Produces a table description with columns, primary keys, indexes (unique,
+composite, partial, ordered) and foreign keys, then generates Django
+`models_code` with matching field types, Meta.indexes / constraints and
+initial migrations, so none of that has to be guessed by the LLM.
+
+    schema = schema_importer.import_schema("./my_rails_app")
+    report = schema_importer.apply_to_blueprint(blueprint, schema)
+"""
+
+import os
+import re
+import glob
+import hashlib
+from tools import inflection, ruby_dsl
+
+INTERNAL_TABLES = {"schema_migrations", "ar_internal_metadata"}
+FRAMEWORK_TABLE_PREFIXES = ("active_storage_", "action_text_", "action_mailbox_", "solid_queue_", "solid_cache_")
+
+COLUMN_TYPES = {
+    "string", "text", "integer", "bigint", "float", "decimal", "numeric", "boolean", "date",
+    "datetime", "timestamp", "timestamptz", "time", "binary", "blob", "json", "jsonb", "uuid",
+    "inet", "cidr", "citext", "hstore", "interval", "serial", "bigserial", "primary_key",
+}
+_ON_DELETE = {"cascade": "models.CASCADE", "nullify": "models.SET_NULL", "restrict": "models.RESTRICT"}
+# What makemigrations writes for the implicit primary key (apps use default_auto_field = BigAutoField)
+AUTO_ID_FIELD = "models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')"
+# models.CompositePrimaryKey is new in Django 5.2
+COMPOSITE_PK_REQUIREMENT = "Django>=5.2,<6"
+
+
+# ---------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------
+def _column(name, col_type, opts) -> dict:
+    return {
+        "name": str(name),
+        "type": str(col_type),
+        "null": opts.get("null", True) is not False,
+        "default": opts.get("default"),
+        "limit": opts.get("limit"),
+        "precision": opts.get("precision"),
+        "scale": opts.get("scale"),
+        "array": bool(opts.get("array")),
+        "comment": opts.get("comment"),
+    }
+
+
+class _SchemaBuilder:
+    def __init__(self):
+        self.tables = {}
+        self.skipped = []
+
+    def _skip(self, stmt, reason):
+        self.skipped.append({"line": stmt.get("line"), "code": stmt.get("code"), "reason": reason})
+
+    def _table(self, name) -> dict | None:
+        return self.tables.get(str(name))
+
+    # --- statements ---------------------------------------------------
+    def run(self, statements):
+        for stmt in statements:
+            method = stmt.get("method") or ""
+            handler = getattr(self, f"_do_{method}", None)
+            if handler:
+                handler(stmt)
+            elif method == "def":
+                # Migrations: replay change/up, ignore down
+                if stmt["args"] and str(stmt["args"][0]).split("(")[0].strip() in ("change", "up", "self.up"):
+                    self.run(stmt["children"])
+            elif stmt["block"] and (method in ("class", "module", "reversible", "") or method.endswith(".define")):
+                self.run(stmt["children"])
+            elif method in ("enable_extension", "disable_extension", "execute", "create_schema",
+                            "create_enum", "drop_enum", "say", "say_with_time", "require"):
+                self._skip(stmt, f"{method} is database-specific — review manually")
+            elif method:
+                self._skip(stmt, "unsupported schema statement")
+
+    def _do_create_table(self, stmt):
+        name = str(stmt["args"][0]) if stmt["args"] else None
+        if not name:
+            return
+        kw = stmt["kwargs"]
+        pk = kw.get("primary_key")
+        table = {
+            "name": name,
+            "id": kw.get("id", True),
+            "primary_key": pk if isinstance(pk, str) else None,
+            "composite_primary_key": pk if isinstance(pk, list) else None,
+            "columns": [],
+            "indexes": [],
+            "foreign_keys": [],
+            "polymorphic": [],
+            "comment": kw.get("comment"),
+        }
+        self.tables[name] = table
+        self._table_body(table, stmt["children"])
+
+    def _do_change_table(self, stmt):
+        table = self._table(stmt["args"][0]) if stmt["args"] else None
+        if table is None:
+            self._skip(stmt, "change_table on unknown table")
+            return
+        self._table_body(table, stmt["children"])
+
+    def _table_body(self, table, children):
+        for child in children:
+            method = (child.get("method") or "").split(".")[-1]
+            args, kw = child.get("args", []), child.get("kwargs", {})
+            if method in COLUMN_TYPES:
+                for col in args:
+                    self._add_column(table, col, method, kw)
+            elif method == "column" and len(args) >= 2:
+                self._add_column(table, args[0], args[1], kw)
+            elif method in ("references", "belongs_to"):
+                for ref in args:
+                    self._add_reference(table, ref, kw)
+            elif method == "timestamps":
+                for col in ("created_at", "updated_at"):
+                    self._add_column(table, col, "datetime", {"null": kw.get("null", False)})
+            elif method == "index":
+                self._add_index(table, args[0] if args else None, kw, child)
+            elif method == "remove":
+                for col in args:
+                    self._remove_column(table, col)
+            elif method == "rename" and len(args) >= 2:
+                self._rename_column(table, args[0], args[1])
+            elif method == "remove_index":
+                self._remove_index(table, args[0] if args else None, kw)
+            elif method == "remove_references":
+                for ref in args:
+                    self._remove_column(table, f"{ref}_id")
+            else:
+                self._skip(child, f"unsupported column statement in {table['name']}")
+
+    def _add_column(self, table, name, col_type, kw):
+        if col_type in ("primary_key", "serial", "bigserial") and kw.get("primary_key", True):
+            table["primary_key"] = str(name)
+        self._remove_column(table, name)
+        table["columns"].append(_column(name, col_type, kw))
+
+    def _remove_column(self, table, name):
+        table["columns"] = [c for c in table["columns"] if c["name"] != str(name)]
+        table["foreign_keys"] = [fk for fk in table["foreign_keys"] if fk["column"] != str(name)]
+
+    def _rename_column(self, table, old, new):
+        for c in table["columns"]:
+            if c["name"] == str(old):
+                c["name"] = str(new)
+        for idx in table["indexes"]:
+            idx["columns"] = [str(new) if col == str(old) else col for col in idx["columns"]]
+        for fk in table["foreign_keys"]:
+            if fk["column"] == str(old):
+                fk["column"] = str(new)
+
+    def _add_reference(self, table, ref, kw):
+        ref = str(ref)
+        id_type = kw.get("type", "bigint")
+        self._add_column(table, f"{ref}_id", id_type, kw)
+        if kw.get("polymorphic"):
+            self._add_column(table, f"{ref}_type", "string", kw)
+            table["polymorphic"].append(ref)
+            columns = [f"{ref}_type", f"{ref}_id"]
+        else:
+            columns = [f"{ref}_id"]
+        index = kw.get("index", True)
+        if index:
+            opts = index if isinstance(index, dict) else {}
+            table["indexes"].append({"columns": columns, "unique": bool(opts.get("unique")),
+                                     "name": opts.get("name"), "where": opts.get("where"), "order": None})
+        fk = kw.get("foreign_key")
+        if fk:
+            opts = fk if isinstance(fk, dict) else {}
+            table["foreign_keys"].append({
+                "column": f"{ref}_id",
+                "to_table": str(opts.get("to_table", inflection.pluralize(ref))),
+                "primary_key": opts.get("primary_key", "id"),
+                "on_delete": opts.get("on_delete"),
+                "name": opts.get("name"),
+            })
+
+    def _add_index(self, table, columns, kw, stmt=None):
+        if isinstance(columns, str) and ("(" in columns or " " in columns):
+            self._skip(stmt or {}, f"expression index on {table['name']} ({columns}) — not translated")
+            return
+        cols = [str(c) for c in ruby_dsl.as_list(columns)]
+        if not cols:
+            return
+        if kw.get("using") and str(kw["using"]) not in ("btree",):
+            self._skip(stmt or {}, f"{kw['using']} index on {table['name']}({', '.join(cols)}) kept as a B-tree index")
+        table["indexes"] = [i for i in table["indexes"] if i["columns"] != cols]
+        table["indexes"].append({
+            "columns": cols,
+            "unique": bool(kw.get("unique")),
+            "name": kw.get("name"),
+            "where": kw.get("where"),
+            "order": kw.get("order"),
+        })
+
+    def _remove_index(self, table, columns, kw):
+        name = kw.get("name")
+        cols = [str(c) for c in ruby_dsl.as_list(kw.get("column", columns))]
+        table["indexes"] = [
+            i for i in table["indexes"]
+            if not ((name and i.get("name") == name) or (cols and i["columns"] == cols))
+        ]
+
+    # --- top-level migration helpers -----------------------------------
+    def _with_table(self, stmt, fn):
+        table = self._table(stmt["args"][0]) if stmt["args"] else None
+        if table is None:
+            self._skip(stmt, "statement on unknown table")
+            return
+        fn(table, stmt["args"][1:], stmt["kwargs"])
+
+    def _do_drop_table(self, stmt):
+        if stmt["args"]:
+            self.tables.pop(str(stmt["args"][0]), None)
+
+    def _do_rename_table(self, stmt):
+        if len(stmt["args"]) >= 2 and str(stmt["args"][0]) in self.tables:
+            table = self.tables.pop(str(stmt["args"][0]))
+            table["name"] = str(stmt["args"][1])
+            self.tables[table["name"]] = table
+
+    def _do_add_column(self, stmt):
+        self._with_table(stmt, lambda t, a, kw: len(a) >= 2 and self._add_column(t, a[0], a[1], kw))
+
+    def _do_change_column(self, stmt):
+        self._do_add_column(stmt)
+
+    def _do_remove_column(self, stmt):
+        self._with_table(stmt, lambda t, a, kw: [self._remove_column(t, c) for c in a if isinstance(c, str)])
+
+    def _do_remove_columns(self, stmt):
+        self._do_remove_column(stmt)
+
+    def _do_rename_column(self, stmt):
+        self._with_table(stmt, lambda t, a, kw: len(a) >= 2 and self._rename_column(t, a[0], a[1]))
+
+    def _do_change_column_null(self, stmt):
+        def apply(table, args, kw):
+            for c in table["columns"]:
+                if len(args) >= 2 and c["name"] == str(args[0]):
+                    c["null"] = args[1] is not False
+        self._with_table(stmt, apply)
+
+    def _do_change_column_default(self, stmt):
+        def apply(table, args, kw):
+            for c in table["columns"]:
+                if args and c["name"] == str(args[0]):
+                    c["default"] = kw.get("to") if "to" in kw else (args[1] if len(args) > 1 else None)
+        self._with_table(stmt, apply)
+
+    def _do_add_timestamps(self, stmt):
+        self._with_table(stmt, lambda t, a, kw: [self._add_column(t, c, "datetime", {"null": kw.get("null", False)})
+                                                for c in ("created_at", "updated_at")])
+
+    def _do_add_reference(self, stmt):
+        self._with_table(stmt, lambda t, a, kw: a and self._add_reference(t, a[0], kw))
+
+    def _do_add_belongs_to(self, stmt):
+        self._do_add_reference(stmt)
+
+    def _do_remove_reference(self, stmt):
+        self._with_table(stmt, lambda t, a, kw: a and self._remove_column(t, f"{a[0]}_id"))
+
+    def _do_add_index(self, stmt):
+        self._with_table(stmt, lambda t, a, kw: a and self._add_index(t, a[0], kw, stmt))
+
+    def _do_remove_index(self, stmt):
+        self._with_table(stmt, lambda t, a, kw: self._remove_index(t, a[0] if a else None, kw))
+
+    def _do_add_foreign_key(self, stmt):
+        def apply(table, args, kw):
+            if not args:
+                return
+            to_table = str(args[0])
+            table["foreign_keys"] = [fk for fk in table["foreign_keys"]
+                                     if fk["column"] != kw.get("column", f"{inflection.singularize(to_table)}_id")]
+            table["foreign_keys"].append({
+                "column": str(kw.get("column", f"{inflection.singularize(to_table)}_id")),
+                "to_table": to_table,
+                "primary_key": kw.get("primary_key", "id"),
+                "on_delete": kw.get("on_delete"),
+                "name": kw.get("name"),
+            })
+        self._with_table(stmt, apply)
+
+    def _do_remove_foreign_key(self, stmt):
+        def apply(table, args, kw):
+            column = kw.get("column") or (f"{inflection.singularize(str(args[0]))}_id" if args else None)
+            table["foreign_keys"] = [fk for fk in table["foreign_keys"] if fk["column"] != column]
+        self._with_table(stmt, apply)
+
+
+def parse_schema(source: str, builder: _SchemaBuilder | None = None) -> dict:
+    """Parse schema.rb (or one migration, when a builder is passed in) source."""
+    builder = builder or _SchemaBuilder()
+    builder.run(ruby_dsl.build_tree(source))
+    return {"tables": builder.tables, "skipped": builder.skipped}
+
+
+def import_schema(input_dir: str) -> dict:
+    """Read db/schema.rb, or replay db/migrate/*.rb in version order."""
+    schema_path = os.path.join(input_dir, "db", "schema.rb")
+    if os.path.isfile(schema_path):
+        with open(schema_path, "r", encoding="utf-8", errors="ignore") as f:
+            result = parse_schema(f.read())
+        result["source"] = "db/schema.rb"
+        return result
+
+    migrations = sorted(glob.glob(os.path.join(input_dir, "db", "migrate", "*.rb")))
+    if not migrations:
+        return {"tables": {}, "skipped": [], "source": None}
+    builder = _SchemaBuilder()
+    for path in migrations:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            parse_schema(f.read(), builder)
+    return {"tables": builder.tables, "skipped": builder.skipped, "source": f"db/migrate ({len(migrations)} files)"}
+
+
+# ---------------------------------------------------------------------
+# Django code generation
+# ---------------------------------------------------------------------
+def model_tables(schema: dict) -> dict:
+    """{ModelClass: table} for tables that become Django models."""
+    return {
+        inflection.classify(name): name
+        for name in schema.get("tables", {})
+        if name not in INTERNAL_TABLES and not name.startswith(FRAMEWORK_TABLE_PREFIXES)
+    }
+
+
+def _py(value) -> str:
+    if isinstance(value, bool) or value is None:
+        return repr(value)
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return repr(value)
+    if isinstance(value, list):
+        return "[" + ", ".join(_py(v) for v in value) + "]"
+    return repr(str(value))
+
+
+def _index_name(table: str, columns: list[str], suffix: str) -> str:
+    """Django index/constraint names must be <= 30 characters."""
+    base = f"{table}_{'_'.join(c.lstrip('-') for c in columns)}_{suffix}"
+    if len(base) <= 30:
+        return base
+    digest = hashlib.sha1(base.encode()).hexdigest()[:6]
+    return f"{base[:30 - len(suffix) - 8]}_{digest}_{suffix}"
+
+
+def _q_condition(where: str) -> str | None:
+    """Translate simple partial-index WHERE clauses into a Q() expression."""
+    parts = re.split(r"\s+AND\s+", str(where).strip().strip("()"), flags=re.IGNORECASE)
+    terms = []
+    for part in parts:
+        part = part.strip().strip("()").replace('"', "")
+        m = re.fullmatch(r"(\w+)\s+IS\s+(NOT\s+)?NULL", part, flags=re.IGNORECASE)
+        if m:
+            terms.append(f"{m.group(1)}__isnull={'False' if m.group(2) else 'True'}")
+            continue
+        m = re.fullmatch(r"(\w+)\s*=\s*(true|false|\d+|'[^']*')", part, flags=re.IGNORECASE)
+        if m:
+            value = m.group(2)
+            value = value.capitalize() if value.lower() in ("true", "false") else value
+            terms.append(f"{m.group(1)}={value}")
+            continue
+        return None
+    return f"models.Q({', '.join(terms)})"
+
+
+class _ModelGen:
+    """Builds field/index declarations for one table."""
+
+    def __init__(self, table: dict, tables: dict, app_of: dict, app: str, related_names: dict | None = None):
+        self.table = table
+        self.tables = tables
+        self.app_of = app_of
+        self.app = app
+        self.related_names = related_names or {}
+        self.name = inflection.classify(table["name"])
+        self.imports = set()
+        self.notes = []
+        self.composite_pk = None
+        self.fk_columns = self._foreign_keys()
+        for ref in table["polymorphic"]:
+            self.notes.append(f"{table['name']}.{ref}: polymorphic reference kept as {ref}_type/{ref}_id "
+                              f"(consider a GenericForeignKey)")
+
+    def _target(self, to_table: str) -> str:
+        model = inflection.classify(to_table)
+        app = self.app_of.get(model)
+        return f"{app}.{model}" if app else model
+
+    def _foreign_keys(self) -> dict:
+        fks = {fk["column"]: dict(fk, constraint=fk.get("constraint", True)) for fk in self.table["foreign_keys"]}
+        polymorphic_ids = {f"{ref}_id" for ref in self.table["polymorphic"]}
+        for col in self.table["columns"]:
+            name = col["name"]
+            if name in fks or name in polymorphic_ids or not name.endswith("_id"):
+                continue
+            # Rails apps often skip FK constraints: keep the relation, not the constraint
+            guess = inflection.pluralize(name[:-3])
+            if guess in self.tables and inflection.classify(guess) in self.app_of:
+                fks[name] = {"column": name, "to_table": guess, "on_delete": None, "constraint": False}
+        return {k: v for k, v in fks.items() if inflection.classify(v["to_table"]) in self.app_of}
+
+    def field_name(self, column: str) -> str:
+        return column[:-3] if column in self.fk_columns else column
+
+    def _unique_columns(self) -> set[str]:
+        return {
+            i["columns"][0] for i in self.table["indexes"]
+            if i["unique"] and len(i["columns"]) == 1 and not i.get("where")
+        }
+
+    def fields(self, relations: bool) -> list[tuple[str, str]]:
+        """[(field_name, 'models.X(...)')] — only FKs if relations else only plain fields."""
+        out = []
+        table = self.table
+        unique = self._unique_columns()
+        if not relations:
+            if table["id"] in ("uuid", "string") and not table["primary_key"]:
+                if table["id"] == "uuid":
+                    self.imports.add("import uuid")
+                    out.append(("id", "models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)"))
+                else:
+                    out.append(("id", "models.CharField(primary_key=True, max_length=255)"))
+            elif table["id"] in ("integer", "serial"):
+                out.append(("id", "models.AutoField(primary_key=True)"))
+        related_targets = [fk["to_table"] for fk in self.fk_columns.values()]
+        for col in table["columns"]:
+            name = col["name"]
+            is_fk = name in self.fk_columns
+            if is_fk != relations:
+                continue
+            if is_fk:
+                out.append((self.field_name(name), self._fk_field(col, unique, related_targets)))
+            else:
+                out.append((name, self._plain_field(col, unique)))
+        return out
+
+    def _common_opts(self, col, unique) -> list[str]:
+        opts = []
+        if col["null"]:
+            opts += ["null=True", "blank=True"]
+        if col["name"] == self.table["primary_key"]:
+            opts.append("primary_key=True")
+        elif col["name"] in unique:
+            opts.append("unique=True")
+        default = col["default"]
+        if isinstance(default, dict) and "__raw__" in default:
+            raw = default["__raw__"]
+            if re.search(r"CURRENT_TIMESTAMP|now\(\)", raw, flags=re.IGNORECASE):
+                self.imports.add("from django.db.models.functions import Now")
+                opts.append("db_default=Now()")
+            else:
+                self.notes.append(f"{self.table['name']}.{col['name']}: default {raw} not translated")
+        elif isinstance(default, (dict, list)) and not default:
+            opts.append(f"default={type(default).__name__}")
+        elif default is not None and col["name"] not in ("created_at", "updated_at"):
+            opts.append(f"default={_py(default)}")
+        if col.get("comment"):
+            opts.append(f"db_comment={_py(col['comment'])}")
+        return opts
+
+    def _plain_field(self, col, unique) -> str:
+        t, name = col["type"], col["name"]
+        args = []
+        if name == "created_at" and t in ("datetime", "timestamp", "timestamptz"):
+            cls, args = "DateTimeField", ["auto_now_add=True"]
+        elif name == "updated_at" and t in ("datetime", "timestamp", "timestamptz"):
+            cls, args = "DateTimeField", ["auto_now=True"]
+        elif t in ("string", "citext"):
+            cls, args = "CharField", [f"max_length={col['limit'] or 255}"]
+        elif t == "text":
+            cls = "TextField"
+        elif t in ("integer", "serial"):
+            limit = col["limit"]
+            cls = "BigIntegerField" if limit and limit >= 8 else "SmallIntegerField" if limit and limit <= 2 else "IntegerField"
+        elif t in ("bigint", "bigserial"):
+            cls = "BigIntegerField"
+        elif t == "float":
+            cls = "FloatField"
+        elif t in ("decimal", "numeric"):
+            cls = "DecimalField"
+            args = [f"max_digits={col['precision'] or 10}", f"decimal_places={col['scale'] or 0}"]
+        elif t == "boolean":
+            cls = "BooleanField"
+        elif t == "date":
+            cls = "DateField"
+        elif t in ("datetime", "timestamp", "timestamptz"):
+            cls = "DateTimeField"
+        elif t == "time":
+            cls = "TimeField"
+        elif t == "interval":
+            cls = "DurationField"
+        elif t in ("binary", "blob"):
+            cls = "BinaryField"
+        elif t in ("json", "jsonb", "hstore"):
+            cls = "JSONField"
+        elif t == "uuid":
+            cls = "UUIDField"
+        elif t in ("inet", "cidr"):
+            cls = "GenericIPAddressField"
+        else:
+            cls = "TextField"
+            self.notes.append(f"{self.table['name']}.{name}: unknown type {t!r} mapped to TextField")
+        field = f"models.{cls}({', '.join(args + self._common_opts(col, unique))})"
+        if col["array"]:
+            self.imports.add("from django.contrib.postgres.fields import ArrayField")
+            return f"ArrayField({field})"
+        return field
+
+    def _fk_field(self, col, unique, related_targets) -> str:
+        fk = self.fk_columns[col["name"]]
+        cls = "OneToOneField" if col["name"] in unique else "ForeignKey"
+        on_delete = _ON_DELETE.get(str(fk.get("on_delete")), "models.PROTECT")
+        if on_delete == "models.SET_NULL" and not col["null"]:
+            on_delete = "models.PROTECT"
+        opts = [repr(self._target(fk["to_table"])), f"on_delete={on_delete}"]
+        if self.field_name(col["name"]) in self.related_names:
+            opts.append(f"related_name={self.related_names[self.field_name(col['name'])]!r}")
+        elif related_targets.count(fk["to_table"]) > 1:
+            opts.append(f"related_name={repr(self.table['name'] + '_as_' + self.field_name(col['name']))}")
+        if not fk.get("constraint", True):
+            opts.append("db_constraint=False")
+        if col["null"]:
+            opts += ["null=True", "blank=True"]
+        return f"models.{cls}({', '.join(opts)})"
+
+    def meta(self) -> tuple[list[str], list[str], list[str]]:
+        """(options, indexes, constraints) as code strings."""
+        table = self.table
+        options = [f"db_table = {table['name']!r}"]
+        indexes, constraints = [], []
+        fk_single = set(self.fk_columns)
+        for idx in table["indexes"]:
+            cols = idx["columns"]
+            if any(c not in {col["name"] for col in table["columns"]} for c in cols):
+                self.notes.append(f"{table['name']}: index on missing column(s) {cols} dropped")
+                continue
+            fields = []
+            order = idx.get("order") or {}
+            for c in cols:
+                direction = order.get(c) if isinstance(order, dict) else order
+                fields.append(("-" if str(direction).lower() == "desc" else "") + self.field_name(c))
+            condition = None
+            if idx.get("where"):
+                condition = _q_condition(idx["where"])
+                if condition is None:
+                    self.notes.append(f"{table['name']}: partial index condition {idx['where']!r} dropped")
+            if idx["unique"]:
+                if len(cols) == 1 and not condition and not idx.get("where"):
+                    continue  # expressed as unique=True / OneToOneField on the field
+                name = _index_name(table["name"], cols, "uniq")
+                cond = f", condition={condition}" if condition else ""
+                plain = [f.lstrip("-") for f in fields]
+                constraints.append(f"models.UniqueConstraint(fields={plain!r}, name={name!r}{cond})")
+            else:
+                if len(cols) == 1 and cols[0] in fk_single and not condition:
+                    continue  # Django already indexes ForeignKey columns
+                name = _index_name(table["name"], cols, "idx")
+                cond = f", condition={condition}" if condition else ""
+                indexes.append(f"models.Index(fields={fields!r}, name={name!r}{cond})")
+        # Rails 7.1 dumps `primary_key: [...]` without `id: false`
+        if table.get("composite_primary_key") or (table["id"] is False and not table["primary_key"]):
+            composite = table.get("composite_primary_key")
+            if not composite:
+                uniques = [i["columns"] for i in table["indexes"] if i["unique"] and len(i["columns"]) > 1]
+                composite = uniques[0] if uniques else None
+            if composite:
+                self.composite_pk = [self.field_name(c) for c in composite]
+                # The primary key already enforces the unique index it came from
+                constraints = [c for c in constraints if f"fields={self.composite_pk!r}," not in c]
+            else:
+                options.append("managed = False")
+                self.notes.append(f"{table['name']}: table without a primary key imported as managed=False")
+        return options, indexes, constraints
+
+
+def _class_blocks(code: str) -> dict:
+    """{ClassName: source} for top-level classes in existing models_code."""
+    blocks = {}
+    for m in re.finditer(r"^class\s+(\w+)\b.*?(?=^\S|\Z)", code or "", flags=re.MULTILINE | re.DOTALL):
+        blocks[m.group(1)] = m.group(0).rstrip() + "\n"
+    return blocks
+
+
+def _generated_names(model_extras: dict | None) -> set[str]:
+    """Classes and functions the extras add around the models (QuerySets, signal handlers)."""
+    names = set()
+    for model in model_extras or {}:
+        extra = _extras(model_extras, model)
+        for code in extra.get("before", []) + extra.get("after", []):
+            names.update(re.findall(r"^(?:class|def)\s+(\w+)", code, flags=re.MULTILINE))
+    return names
+
+
+def _extras(model_extras: dict | None, model: str) -> dict:
+    """
+    Extras for one model: a list of class-body lines, or a dict with "lines",
+    "before" / "after" (module-level code around the class), "imports" and
+    "related_names" ({fk field: related_name}).
+    """
+    extra = (model_extras or {}).get(model) or {}
+    return {"lines": extra} if isinstance(extra, list) else extra
+
+
+def generate_models_code(tables: list[dict], all_tables: dict, app_of: dict, app: str,
+                         extra_code: str = "", model_extras: dict | None = None) -> tuple[str, list[str]]:
+    """models.py for one app; returns (code, notes)."""
+    imports = {"from django.db import models"}
+    bodies, notes, after = [], [], []
+    for table in tables:
+        extra = _extras(model_extras, inflection.classify(table["name"]))
+        gen = _ModelGen(table, all_tables, app_of, app, extra.get("related_names"))
+        options, indexes, constraints = gen.meta()
+        lines = [f"class {gen.name}(models.Model):"]
+        if gen.composite_pk:
+            lines.append(f"    pk = models.CompositePrimaryKey({', '.join(repr(f) for f in gen.composite_pk)})")
+        for name, field in gen.fields(relations=False) + gen.fields(relations=True):
+            lines.append(f"    {name} = {field}")
+        lines += [f"    {line}" for line in extra.get("lines", [])]
+        lines += ["", "    class Meta:"] + [f"        {o}" for o in options]
+        if indexes:
+            lines.append("        indexes = [")
+            lines += [f"            {i}," for i in indexes]
+            lines.append("        ]")
+        if constraints:
+            lines.append("        constraints = [")
+            lines += [f"            {c}," for c in constraints]
+            lines.append("        ]")
+        bodies += [code.rstrip() + "\n" for code in extra.get("before", [])]
+        bodies.append("\n".join(lines) + "\n")
+        after += [code.rstrip() + "\n" for code in extra.get("after", [])]
+        imports |= gen.imports | set(extra.get("imports", []))
+        notes += gen.notes
+    header = "\n".join(sorted(i for i in imports if i.startswith("import")) +
+                       sorted(i for i in imports if i.startswith("from")))
+    code = header + "\n\n\n" + "\n\n".join(bodies + after)
+    if extra_code.strip():
+        code += "\n\n" + extra_code.strip() + "\n"
+    return code, notes
+
+
+def generate_migrations(tables: list[dict], all_tables: dict, app_of: dict, app: str,
+                        model_extras: dict | None = None) -> dict:
+    """
+    {filename: code}: 0001_initial creates tables without relations, 0002_relations
+    adds foreign keys, indexes and constraints — so cross-app references never
+    form a dependency cycle.
+    """
+    imports = {"from django.db import migrations, models"}
+    create_ops, relation_ops, composite_ops = [], [], []
+    deps_initial, deps_relations = set(), {(app, "0001_initial")}
+    for table in tables:
+        related_names = _extras(model_extras, inflection.classify(table["name"])).get("related_names")
+        gen = _ModelGen(table, all_tables, app_of, app, related_names)
+        options, indexes, constraints = gen.meta()
+        plain = gen.fields(relations=False)
+        relations = gen.fields(relations=True)
+        for fk in gen.fk_columns.values():
+            target_app = app_of.get(inflection.classify(fk["to_table"]))
+            if target_app and target_app != app:
+                (deps_initial if gen.composite_pk else deps_relations).add((target_app, "0001_initial"))
+        if gen.composite_pk:
+            plain = plain + relations
+            relations = []
+        elif not any("primary_key=True" in field for _, field in plain):
+            plain = [("id", AUTO_ID_FIELD)] + plain
+        fields = "".join(f"                ({name!r}, {field}),\n" for name, field in plain)
+        if gen.composite_pk:
+            # The deconstructed form: anything less is re-rendered by makemigrations as an AlterField
+            columns = ", ".join(repr(f) for f in gen.composite_pk)
+            fields += (
+                f"                ('pk', models.CompositePrimaryKey({columns}, blank=True, editable=False, "
+                f"primary_key=True, serialize=False)),\n"
+            )
+        opts = {o.split(" = ")[0]: o.split(" = ")[1] for o in options}
+        opts_code = ", ".join(f"{k!r}: {v}" for k, v in opts.items())
+        # Composite-PK models carry their FKs inline: create them after the tables they reference
+        (composite_ops if gen.composite_pk else create_ops).append(
+            f"        migrations.CreateModel(\n"
+            f"            name={gen.name!r},\n"
+            f"            fields=[\n{fields}            ],\n"
+            f"            options={{{opts_code}}},\n"
+            f"        ),\n"
+        )
+        for name, field in relations:
+            relation_ops.append(
+                f"        migrations.AddField(\n"
+                f"            model_name={gen.name.lower()!r},\n"
+                f"            name={name!r},\n"
+                f"            field={field},\n"
+                f"        ),\n"
+            )
+        for idx in indexes:
+            relation_ops.append(f"        migrations.AddIndex(model_name={gen.name.lower()!r}, index={idx}),\n")
+        for con in constraints:
+            relation_ops.append(f"        migrations.AddConstraint(model_name={gen.name.lower()!r}, constraint={con}),\n")
+        imports |= gen.imports
+
+    header = "\n".join(sorted(i for i in imports if i.startswith("import")) +
+                       sorted(i for i in imports if i.startswith("from")))
+
+    def migration(deps, ops, initial):
+        dep_code = "".join(f"        {d!r},\n" for d in sorted(deps))
+        return (
+            f"{header}\n\n\nclass Migration(migrations.Migration):\n\n"
+            + ("    initial = True\n\n" if initial else "")
+            + f"    dependencies = [\n{dep_code}    ]\n\n"
+            + f"    operations = [\n{''.join(ops)}    ]\n"
+        )
+
+    files = {"0001_initial.py": migration(deps_initial, create_ops + composite_ops, True)}
+    if relation_ops:
+        files["0002_relations.py"] = migration(deps_relations, relation_ops, False)
+    return files
+
+
+def _require_django(blueprint: dict, requirement: str) -> bool:
+    """Replace the Django pin in blueprint requirements; True if it changed."""
+    existing = blueprint.setdefault("requirements", ["Django>=5,<6", "Pillow"])
+    pins = [i for i, r in enumerate(existing) if re.split(r"[<>=~!\[ ]", r, maxsplit=1)[0].lower() == "django"]
+    if pins and all(existing[i] == requirement for i in pins):
+        return False
+    for i in reversed(pins):
+        existing.pop(i)
+    existing.insert(pins[0] if pins else 0, requirement)
+    return True
+
+
+def schema_prompt(schema: dict) -> str:
+    """Compact model listing for prompts: Model(table): field, fk→Target, ..."""
+    lines = []
+    models = model_tables(schema)
+    app_of = {m: "_" for m in models}
+    for model, table_name in models.items():
+        gen = _ModelGen(schema["tables"][table_name], schema["tables"], app_of, "_")
+        cols = []
+        for col in gen.table["columns"]:
+            if col["name"] in gen.fk_columns:
+                cols.append(f"{gen.field_name(col['name'])}→{inflection.classify(gen.fk_columns[col['name']]['to_table'])}")
+            else:
+                cols.append(col["name"])
+        lines.append(f"{model}({table_name}): {', '.join(cols)}")
+    return "\n".join(lines)
+
+
+def assign_models(schema: dict, apps: list[dict]) -> dict:
+    """{ModelClass: app_name} — from each app's `models` list, then its models_code, else the first app."""
+    app_of = {}
+    default_app = apps[0].get("name", "app") if apps else None
+    for model in model_tables(schema):
+        owner = next((a.get("name") for a in apps if model in (a.get("models") or [])), None)
+        if owner is None:
+            owner = next((a.get("name") for a in apps
+                          if re.search(rf"^class\s+{model}\b", a.get("models_code") or "", flags=re.MULTILINE)), None)
+        app_of[model] = owner or default_app
+    return app_of
+
+
+def apply_to_blueprint(blueprint: dict, schema: dict, model_extras: dict | None = None) -> dict:
+    """
+    Replace models_code with schema-derived models and attach initial migrations
+    (app["migrations"] = {filename: code}). Non-schema classes the LLM wrote are kept;
+    classes generated from model_extras are regenerated, so re-applying is idempotent.
+    """
+    apps = blueprint.get("apps", []) or []
+    models = model_tables(schema)
+    if not models or not apps:
+        return {"applied": False, "tables": len(models)}
+    app_of = assign_models(schema, apps)
+    generated = set(models) | _generated_names(model_extras)
+    notes = []
+    indexes = constraints = composite = 0
+    for app in apps:
+        name = app.get("name", "app")
+        owned = [schema["tables"][t] for m, t in models.items() if app_of[m] == name]
+        if not owned:
+            continue
+        kept = {cls: src for cls, src in _class_blocks(app.get("models_code", "")).items() if cls not in generated}
+        code, app_notes = generate_models_code(owned, schema["tables"], app_of, name,
+                                               extra_code="\n\n".join(kept.values()), model_extras=model_extras)
+        app["models_code"] = code
+        app["models"] = [inflection.classify(t["name"]) for t in owned]
+        app["migrations"] = generate_migrations(owned, schema["tables"], app_of, name, model_extras)
+        indexes += code.count("models.Index(")
+        constraints += code.count("models.UniqueConstraint(")
+        composite += code.count("models.CompositePrimaryKey(")
+        notes += app_notes
+    if composite and _require_django(blueprint, COMPOSITE_PK_REQUIREMENT):
+        notes.append(f"{composite} composite primary key(s): requirements pinned to {COMPOSITE_PK_REQUIREMENT}")
+    return {
+        "applied": True,
+        "source": schema.get("source"),
+        "tables": len(models),
+        "indexes": indexes,
+        "unique_constraints": constraints,
+        "composite_primary_keys": composite,
+        "models_by_app": {a: sorted(m for m, owner in app_of.items() if owner == a) for a in set(app_of.values())},
+        "notes": notes,
+        "skipped": schema.get("skipped", []),
+    }
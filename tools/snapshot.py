@@ -0,0 +1,151 @@
+# tools/snapshot.py
+"""
+Binary / compressed snapshots of pipeline state.
+
+Formats (selected with SNAPSHOT_FORMAT or the `fmt` argument):
+    json      — stdlib json.dump(indent=2), the historical default
+    orjson    — compact orjson JSON (.json)
+    json.zst  — orjson JSON compressed with zstd (.json.zst)
+    msgpack   — ormsgpack compressed with zstd (.msgpack.zst)
+
+Benchmark against the current JSON files:
+    python -m tools.snapshot bench out_django/logs/final_state.json
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import orjson
+
+FORMATS = {
+    "json": ".json",
+    "orjson": ".json",
+    "json.zst": ".json.zst",
+    "msgpack": ".msgpack.zst",
+}
+
+
+def snapshot_format() -> str:
+    """Snapshot format chosen via SNAPSHOT_FORMAT (defaults to plain json)."""
+    fmt = os.getenv("SNAPSHOT_FORMAT", "json")
+    if fmt not in FORMATS:
+        print(f"⚠️ Unknown SNAPSHOT_FORMAT={fmt!r}, falling back to json")
+        return "json"
+    return fmt
+
+
+def _encode(obj, fmt: str) -> bytes:
+    if fmt == "json":
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=str).encode("utf-8")
+    if fmt in ("orjson", "json.zst"):
+        data = orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        import ormsgpack
+        data = ormsgpack.packb(obj, default=str, option=ormsgpack.OPT_NON_STR_KEYS)
+    if fmt.endswith("zst") or fmt == "msgpack":
+        import zstandard
+        data = zstandard.ZstdCompressor(level=3).compress(data)
+    return data
+
+
+def _decode(data: bytes, fmt: str):
+    if fmt in ("json.zst", "msgpack"):
+        import zstandard
+        data = zstandard.ZstdDecompressor().decompress(data)
+    if fmt == "msgpack":
+        import ormsgpack
+        return ormsgpack.unpackb(data)
+    return orjson.loads(data)
+
+
+def _format_for(path: str) -> str:
+    if path.endswith(".msgpack.zst"):
+        return "msgpack"
+    if path.endswith(".json.zst"):
+        return "json.zst"
+    return "orjson"
+
+
+def save_snapshot(path_base: str, obj, fmt: str | None = None) -> str:
+    """Write obj to `path_base + extension` in the given format; returns the path."""
+    fmt = fmt or snapshot_format()
+    path = path_base + FORMATS[fmt]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(_encode(obj, fmt))
+    return path
+
+
+def load_snapshot(path: str):
+    """Read any snapshot written by save_snapshot (format from the extension)."""
+    with open(path, "rb") as f:
+        return _decode(f.read(), _format_for(path))
+
+
+def load_state(path: str):
+    """Restore a ConversionState from a final_state snapshot."""
+    from state import ConversionState
+
+    data = load_snapshot(path)
+    # conversion_summary snapshots keep the state fields at top level too
+    return ConversionState(**data)
+
+
+def benchmark(obj, repeat: int = 3) -> list[dict]:
+    """Measure write/read time and size of obj for every format."""
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in FORMATS:
+            base = os.path.join(tmp, f"bench_{fmt.replace('.', '_')}")
+            write_s = read_s = float("inf")
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                path = save_snapshot(base, obj, fmt)
+                t1 = time.perf_counter()
+                if fmt == "json":
+                    with open(path, "r", encoding="utf-8") as f:
+                        json.load(f)
+                else:
+                    load_snapshot(path)
+                t2 = time.perf_counter()
+                write_s, read_s = min(write_s, t1 - t0), min(read_s, t2 - t1)
+            rows.append({
+                "format": fmt,
+                "bytes": os.path.getsize(path),
+                "write_ms": round(write_s * 1000, 2),
+                "read_ms": round(read_s * 1000, 2),
+            })
+    return rows
+
+
+def _print_benchmark(rows: list[dict]):
+    from rich.console import Console
+    from rich.table import Table
+
+    baseline = rows[0]
+    table = Table(title="Snapshot formats", header_style="bold magenta")
+    for col in ("Format", "Size", "Write ms", "Read ms", "vs json size", "vs json write", "vs json read"):
+        table.add_column(col, style="cyan" if col == "Format" else "green")
+    for r in rows:
+        table.add_row(
+            r["format"], f"{r['bytes'] / 1024:.1f} KB", f"{r['write_ms']:.2f}", f"{r['read_ms']:.2f}",
+            f"{r['bytes'] / max(baseline['bytes'], 1):.2f}x",
+            f"{r['write_ms'] / max(baseline['write_ms'], 1e-6):.2f}x",
+            f"{r['read_ms'] / max(baseline['read_ms'], 1e-6):.2f}x",
+        )
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] != "bench":
+        print("usage: python -m tools.snapshot bench <state.json | snapshot>")
+        sys.exit(2)
+    source = sys.argv[2]
+    if source.endswith(".zst"):
+        payload = load_snapshot(source)
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    _print_benchmark(benchmark(payload))
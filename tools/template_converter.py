@@ -1,37 +1,107 @@
 # tools/template_converter.py
 import os
+import re
 from openai import OpenAI
+from tools import llm_utils, model_router, chunking
 
 client = OpenAI()
 
-def convert_template_with_llm(content: str, template_name: str = "") -> str:
-    """
-    Convert an ERB or mixed Rails template to a Django/Jinja2 HTML template using LLM.
-    Returns clean Jinja2-compatible HTML.
-    """
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
+# Static prefix (instructions + examples) shared by every template call;
+# only the template itself varies, and it comes last.
+TEMPLATE_SYSTEM = """You are an expert at converting Ruby on Rails ERB templates into Django Jinja2 templates (.html). Output only the final Jinja2 HTML code. Preserve layout, forms, loops, and logic. Use {% ... %} and {{ ... }} syntax properly. Do not wrap in markdown or explain anything.
+
+Conversion examples:
+<%= @post.title %>                          -> {{ post.title }}
+<%= raw @post.body %>                       -> {{ post.body|safe }}
+<% if @posts.any? %> ... <% else %> ... <% end %>
+                                            -> {% if posts %} ... {% else %} ... {% endif %}
+<% @posts.each do |post| %> ... <% end %>   -> {% for post in posts %} ... {% endfor %}
+<%= link_to "Edit", edit_post_path(@post) %> -> <a href="{% url 'edit_post' post.pk %}">Edit</a>
+<%= render "form", post: @post %>           -> {% include "posts/_form.html" with post=post %}
+<%= form_with model: @post do |f| %>        -> <form method="post">{% csrf_token %}
+<%= yield %>                                -> {% block content %}{% endblock %}
+<%= t("posts.title") %>                     -> {% translate "posts.title" %}
+<%= l(@post.created_at, format: :short) %>  -> {{ post.created_at|date:"SHORT_DATETIME_FORMAT" }}
+<% cache @post do %> ... <% end %>          -> {% load cache %}{% cache None post post.pk post.updated_at %} ... {% endcache %}
+<% cache [@post, "v2"], expires_in: 1.hour do %> ... <% end %>
+                                            -> {% cache 3600 post post.pk post.updated_at "v2" %} ... {% endcache %}
+<% cache_if admin?, @post do %> ... <% end %> -> {% if admin %}{% cache None post post.pk post.updated_at %} ... {% endcache %}{% else %} ... {% endif %}"""
+
+_LOAD_CACHE = re.compile(r"{%-?\s*load\s[^%]*\bcache\b")
+_EXTENDS = re.compile(r"^\s*{%-?\s*extends\s[^%]*%}[ \t]*\n?")
+
+
+def ensure_cache_load(text: str) -> str:
+    """Add {% load cache %} (after any {% extends %}) to templates that use {% cache %}."""
+    if not isinstance(text, str) or not re.search(r"{%-?\s*cache\s", text) or _LOAD_CACHE.search(text):
+        return text
+    m = _EXTENDS.match(text)
+    at = m.end() if m else 0
+    prefix = text[:at] if not m or text[:at].endswith("\n") else text[:at] + "\n"
+    return prefix + "{% load cache %}\n" + text[at:]
+
+
+MAX_TOKENS = 4000
+
+
+def _convert(content: str, template_name: str, context: str = "") -> tuple[str, bool]:
+    """One routed LLM conversion; returns (converted, stopped at max_tokens)."""
+    def call(model):
+        return llm_utils.chat(
+            client,
+            "builder_node",
+            model=model,
             messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an expert at converting Ruby on Rails ERB templates "
-                        "into Django Jinja2 templates (.html). Output only the final Jinja2 HTML code. "
-                        "Preserve layout, forms, loops, and logic. Use {% ... %} and {{ ... }} syntax properly. "
-                        "Do not wrap in markdown or explain anything."
-                    ),
-                },
+                {"role": "system", "content": TEMPLATE_SYSTEM},
                 {
                     "role": "user",
-                    "content": f"Convert this ERB template into a Django Jinja2 template:\n\n---\n{content}\n---",
+                    "content": f"Convert this ERB template into a Django Jinja2 template:\n\n{context}---\n{content}\n---",
                 },
             ],
             temperature=0.3,
-            max_tokens=4000,
+            max_tokens=MAX_TOKENS,
+            log_fields={"step": "template", "template": template_name},
         )
-        new_content = response.choices[0].message.content.strip()
-        return new_content
+
+    # Short, logic-light templates go to the fast tier; escalated if the output is invalid or cut off
+    converted, reason = model_router.run(
+        "template", [(template_name, content)], call,
+        parse=lambda r: (r.choices[0].message.content.strip(), chunking.finish_reason(r)),
+        validate=lambda v: v[1] != "length" and model_router.valid_template(v[0]),
+    )
+    return converted, reason == "length"
+
+
+def _convert_part(chunk: str, part_name: str, context: str) -> str:
+    converted, truncated = _convert(chunk, part_name, context)
+    if truncated:
+        chunking.record_truncation("template_output", part_name, chars=len(chunk), max_tokens=MAX_TOKENS)
+    return converted
+
+
+def convert_template_with_llm(content: str, template_name: str = "") -> str:
+    """
+    Convert an ERB or mixed Rails template to a Django/Jinja2 HTML template using LLM.
+    Returns clean Jinja2-compatible HTML. Oversized templates, and templates whose
+    output was cut off at max_tokens, are converted in chunks (tools/chunking).
+    """
+    try:
+        converted = None
+        if len(content) > chunking.TEMPLATE_CHUNK_CHARS:
+            converted = chunking.convert_in_chunks(content, template_name, _convert_part)
+        if converted is None:
+            converted, truncated = _convert(content, template_name)
+            if truncated:
+                chunked = chunking.convert_in_chunks(
+                    content, template_name, _convert_part, max_chars=max(len(content) // 2, 1)
+                )
+                chunking.record_truncation(
+                    "template_output", template_name, chars=len(content), max_tokens=MAX_TOKENS,
+                    recovered=chunked is not None,
+                )
+                converted = chunked or converted
+        # Fragment caches ({% cache %}) need the cache tag library loaded
+        return ensure_cache_load(converted)
     except Exception as e:
         print(f"⚠️ Template LLM conversion failed for {template_name}: {e}")
         return content
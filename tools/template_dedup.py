@@ -0,0 +1,231 @@
+# tools/template_dedup.py
+"""
+Content-hash deduplication of Rails templates before LLM conversion.
+
+Templates are grouped in two ways:
+- exact:      identical after normalisation (comments and whitespace stripped)
+- structural: identical skeleton once the resource name taken from the view
+              directory (posts/, Post, post, ...) is replaced by placeholders
+
+Only one exemplar per group goes to the LLM; the other members reuse the
+exemplar's conversion, with resource names substituted back locally. Group
+members the converter's blueprint lacks altogether are added from a converted
+groupmate by instantiate_members().
+"""
+
+import os
+import re
+import hashlib
+import threading
+from concurrent.futures import Future
+from tools import inflection
+
+# Resource words that double as HTML/HTTP vocabulary; substituting them in the
+# converted output would corrupt markup (e.g. method="post"), so such templates
+# only take part in exact deduplication.
+_UNSAFE_RESOURCES = {
+    "post", "get", "put", "patch", "delete", "form", "input", "link", "option", "select",
+    "table", "button", "label", "image", "file", "text", "time", "date", "data", "item",
+    "page", "name", "type", "value", "body", "head", "title", "style", "script", "content",
+}
+_GENERIC_DIRS = {"", "layouts", "shared", "application", "partials", "mailers"}
+
+_ERB_COMMENT = re.compile(r"<%#.*?%>", re.DOTALL)
+_HTML_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalise(content: str) -> str:
+    """Strip ERB/HTML comments and collapse whitespace."""
+    content = _ERB_COMMENT.sub("", content)
+    content = _HTML_COMMENT.sub("", content)
+    return _WHITESPACE.sub(" ", content).strip()
+
+
+def resource_of(name: str) -> str | None:
+    """Resource a view belongs to, from its directory (app/views/posts/_form → posts)."""
+    parent = os.path.basename(os.path.dirname(name.replace("\\", "/")))
+    if parent in _GENERIC_DIRS or inflection.singularize(parent).lower() in _UNSAFE_RESOURCES:
+        return None
+    return parent
+
+
+def _variants(resource: str) -> list[tuple[str, str]]:
+    """(word, placeholder) pairs for a resource, longest first."""
+    plural = inflection.pluralize(inflection.singularize(resource))
+    singular = inflection.singularize(resource)
+    pairs = {
+        inflection.camelize(plural): "__RES_CLASSES__",
+        inflection.camelize(singular): "__RES_CLASS__",
+        plural: "__RES_PLURAL__",
+        singular: "__RES_SINGULAR__",
+        plural.replace("_", " "): "__RES_PLURAL_HUMAN__",
+        singular.replace("_", " "): "__RES_SINGULAR_HUMAN__",
+    }
+    return sorted(pairs.items(), key=lambda kv: -len(kv[0]))
+
+
+def _substitute(text: str, pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return text
+    lookup = dict(pairs)
+    pattern = re.compile(r"(?<![A-Za-z0-9])(" + "|".join(re.escape(w) for w, _ in pairs) + r")(?![a-z0-9])")
+    return pattern.sub(lambda m: lookup[m.group(1)], text)
+
+
+def skeleton(content: str, resource: str | None) -> str:
+    """Normalised template with resource names replaced by placeholders."""
+    norm = normalise(content)
+    return _substitute(norm, _variants(resource)) if resource else norm
+
+
+def instantiate(converted: str, exemplar_resource: str, resource: str) -> str:
+    """Re-target an exemplar's converted template to another resource."""
+    to_placeholder = _substitute(converted, _variants(exemplar_resource))
+    for word, placeholder in _variants(resource):
+        to_placeholder = to_placeholder.replace(placeholder, word)
+    return to_placeholder
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class TemplateIndex:
+    """Groups template contents by exact and structural hash (no LLM involved)."""
+
+    def __init__(self):
+        self.templates = 0
+        self.exact = {}
+        self.structural = {}
+        self._skeleton_of = {}   # exact key → structural key
+        self.copies = {}         # exact duplicate → first template with that content
+
+    def add(self, name: str, content: str):
+        self.templates += 1
+        exact_key = _digest(normalise(content))
+        if exact_key in self.exact:
+            self.copies[name] = self.exact[exact_key][0]
+            self.exact[exact_key].append(name)
+            self.structural[self._skeleton_of[exact_key]].append(name)
+            return
+        self.exact[exact_key] = [name]
+        skel_key = _digest(skeleton(content, resource_of(name)))
+        self._skeleton_of[exact_key] = skel_key
+        self.structural.setdefault(skel_key, []).append(name)
+
+    def summary(self) -> dict:
+        groups = [members for members in self.structural.values()]
+        return {
+            "templates": self.templates,
+            "exact_groups": len(self.exact),
+            "groups": len(groups),
+            "dedup_ratio": round(1 - len(groups) / self.templates, 3) if self.templates else 0.0,
+            "families": [g for g in groups if len(g) > 1],
+            "copies": self.copies,
+        }
+
+
+def template_name(path: str) -> str:
+    """Django template name for a Rails view (…/app/views/posts/index.html.erb → posts/index.html)."""
+    name = path.replace("\\", "/").rsplit("app/views/", 1)[-1].removesuffix(".erb")
+    return name if os.path.splitext(name)[1] else name + ".html"
+
+
+def _find_template(apps: list[dict], name: str) -> tuple[dict | None, dict | None]:
+    for exact in (True, False):
+        for app in apps:
+            for tpl in app.get("templates", []):
+                have = template_name(tpl.get("name", ""))
+                if have == name if exact else (have.endswith("/" + name) or name.endswith("/" + have)):
+                    return app, tpl
+    return None, None
+
+
+def instantiate_members(apps: list[dict], template_groups: dict) -> list[dict]:
+    """
+    Add the templates of group members missing from the blueprint, instantiated
+    from a groupmate the blueprint has. Refinement stops at one template per
+    group, so the other members only ever come from here. Each one goes to the
+    app that already holds templates of its view directory, else to the
+    groupmate's app. Returns one row per added template.
+    """
+    copies = template_groups.get("copies") or {}
+    added = []
+    for family in template_groups.get("families", []):
+        found = {m: _find_template(apps, template_name(m)) for m in family}
+        exemplar = next((m for m in family if found[m][1] is not None), None)
+        if exemplar is None:
+            continue
+        source_app, source = found[exemplar]
+        for member in family:
+            if found[member][1] is not None:
+                continue
+            name = template_name(member)
+            content = source.get("content", "")
+            src, dst = resource_of(exemplar), resource_of(member)
+            if copies.get(member, member) != copies.get(exemplar, exemplar) and src and dst and src != dst:
+                content = instantiate(content, src, dst)
+            view_dir = os.path.dirname(name)
+            owner = next((a for a in apps if any(
+                os.path.dirname(template_name(t.get("name", ""))) == view_dir for t in a.get("templates", [])
+            )), source_app)
+            suffix = ".erb" if source.get("name", "").endswith(".erb") else ""
+            owner.setdefault("templates", []).append({"name": name + suffix, "content": content})
+            added.append({"template": name, "from": template_name(exemplar), "app": owner.get("name")})
+    return added
+
+
+class TemplateDeduper:
+    """
+    Converts templates through `convert_fn(content, name)` once per group.
+
+    Thread-safe: concurrent requests for the same group wait on the first
+    conversion instead of issuing a second LLM call.
+    """
+
+    def __init__(self, convert_fn):
+        self.convert_fn = convert_fn
+        self._lock = threading.Lock()
+        self._exact = {}
+        self._structural = {}
+        self.stats = {"templates": 0, "llm_calls": 0, "exact_hits": 0, "structural_hits": 0}
+
+    def convert(self, name: str, content: str) -> str:
+        resource = resource_of(name)
+        exact_key = _digest(normalise(content))
+        skel_key = _digest(skeleton(content, resource)) if resource else None
+
+        with self._lock:
+            self.stats["templates"] += 1
+            if exact_key in self._exact:
+                self.stats["exact_hits"] += 1
+                future, owner = self._exact[exact_key], None
+            elif skel_key and skel_key in self._structural:
+                self.stats["structural_hits"] += 1
+                future, owner = self._structural[skel_key]
+            else:
+                self.stats["llm_calls"] += 1
+                future, owner = Future(), True
+                self._exact[exact_key] = future
+                if skel_key:
+                    self._structural[skel_key] = (future, resource)
+
+        if owner is True:
+            try:
+                future.set_result(self.convert_fn(content, name))
+            except Exception as e:
+                future.set_exception(e)
+                raise
+            return future.result()
+
+        converted = future.result()
+        if owner is None or owner == resource:
+            return converted
+        return instantiate(converted, owner, resource)
+
+    def report(self) -> dict:
+        s = dict(self.stats)
+        s["calls_saved"] = s["exact_hits"] + s["structural_hits"]
+        s["dedup_ratio"] = round(s["calls_saved"] / s["templates"], 3) if s["templates"] else 0.0
+        return s
@@ -0,0 +1,203 @@
+# tools/unit_graph.py
+"""
+Dependency graph over Rails units, built locally during discovery.
+
+Edges:
+- model → model        (belongs_to / has_many / has_one / habtm, incl. class_name:)
+- controller → model   (model constants referenced in the controller)
+- controller → view    (app/views/<controller_path>/*) and → layout (`layout "x"`)
+- view → partial       (render "form", render partial: "shared/x", render @posts)
+
+LLM tasks then receive only the transitive slice of rails_units they need
+instead of the whole analysis.
+"""
+
+import os
+import re
+from tools import inflection
+
+_ASSOC = re.compile(
+    r"^\s*(belongs_to|has_many|has_one|has_and_belongs_to_many)\s+:(\w+)([^\n]*)", re.MULTILINE
+)
+_CLASS_NAME = re.compile(r"class_name:\s*['\"]([\w:]+)['\"]")
+_CLASS = re.compile(r"^\s*class\s+([\w:]+)", re.MULTILINE)
+_CONSTANT = re.compile(r"\b([A-Z][a-z]\w*)\b")
+_LAYOUT = re.compile(r"^\s*layout\s+['\"]([\w/]+)['\"]", re.MULTILINE)
+_RENDER = re.compile(
+    r"render\s*\(?\s*(?:partial:\s*|:partial\s*=>\s*)?['\"]([\w/]+)['\"]"
+    r"|render\s*\(?\s*(?:collection:\s*)?@(\w+)"
+)
+
+
+def _rel(path: str, input_dir: str | None = None) -> str:
+    """
+    Path relative to the Rails root. Without `input_dir`, guessed from the first
+    app/, config/, db/ or lib/ segment (wrong for a root under one of those).
+    """
+    if input_dir:
+        return os.path.relpath(path, input_dir).replace("\\", "/")
+    norm = path.replace("\\", "/")
+    m = re.search(r"(?:^|/)((?:app|config|db|lib)/.*)$", norm)
+    return m.group(1) if m else norm
+
+
+def _kind(rel: str) -> str:
+    if rel.startswith("app/models/"):
+        return "model"
+    if rel.startswith("app/controllers/"):
+        return "controller"
+    if rel.startswith("app/views/"):
+        return "view"
+    return "other"
+
+
+class UnitGraph:
+    """Nodes keyed by Rails-relative path; edges resolved lazily in finalize()."""
+
+    def __init__(self, input_dir: str | None = None):
+        self.input_dir = input_dir
+        self.nodes = {}
+        self.edges = {}
+        self._pending = {}
+
+    # ---------------- building ----------------
+    def add_file(self, path: str, content: str):
+        rel = _rel(path, self.input_dir)
+        kind = _kind(rel)
+        node = {"kind": kind, "path": path, "names": []}
+        pending = {"models": set(), "constants": set(), "partials": set(), "layouts": set()}
+        if kind == "model":
+            m = _CLASS.search(content)
+            name = m.group(1).split("::")[-1] if m else inflection.camelize(os.path.splitext(os.path.basename(rel))[0])
+            node["names"] = [name]
+            for assoc, target, rest in _ASSOC.findall(content):
+                explicit = _CLASS_NAME.search(rest)
+                if explicit:
+                    pending["models"].add(explicit.group(1).split("::")[-1])
+                elif assoc == "belongs_to" or assoc == "has_one":
+                    pending["models"].add(inflection.camelize(target))
+                else:
+                    pending["models"].add(inflection.classify(target))
+        elif kind == "controller":
+            controller_path = rel[len("app/controllers/"):].rsplit("_controller.rb", 1)[0]
+            node["names"] = [f"{inflection.camelize(controller_path)}Controller", controller_path]
+            node["controller_path"] = controller_path
+            pending["constants"] = set(_CONSTANT.findall(content))
+            pending["layouts"] = set(_LAYOUT.findall(content)) or {"application"}
+        elif kind == "view":
+            view_dir = os.path.dirname(rel[len("app/views/"):])
+            node["names"] = [rel]
+            node["view_dir"] = view_dir
+            for partial, ivar in _RENDER.findall(content):
+                if partial:
+                    directory, _, base = partial.rpartition("/")
+                    pending["partials"].add(f"{directory or view_dir}/_{base}")
+                elif ivar:
+                    plural = inflection.pluralize(inflection.singularize(ivar))
+                    pending["partials"].add(f"{plural}/_{inflection.singularize(ivar)}")
+        self.nodes[rel] = node
+        self._pending[rel] = pending
+
+    def finalize(self) -> "UnitGraph":
+        """Resolve names collected by add_file() into edges between known nodes."""
+        model_by_name = {n["names"][0]: rel for rel, n in self.nodes.items() if n["kind"] == "model" and n["names"]}
+        views_by_dir, stems = {}, {}
+        for rel, n in self.nodes.items():
+            if n["kind"] == "view":
+                views_by_dir.setdefault(n["view_dir"], []).append(rel)
+                stems[rel[len("app/views/"):].split(".")[0]] = rel
+        for rel, pending in self._pending.items():
+            node = self.nodes[rel]
+            targets = set()
+            for name in pending["models"] | pending["constants"]:
+                if name in model_by_name and model_by_name[name] != rel:
+                    targets.add(model_by_name[name])
+            for partial in pending["partials"]:
+                if partial in stems:
+                    targets.add(stems[partial])
+            if node["kind"] == "controller":
+                targets.update(views_by_dir.get(node["controller_path"], []))
+                for layout in pending["layouts"]:
+                    if f"layouts/{layout}" in stems:
+                        targets.add(stems[f"layouts/{layout}"])
+            self.edges[rel] = sorted(targets)
+        self._pending = {}
+        return self
+
+    # ---------------- (de)serialisation ----------------
+    def to_dict(self) -> dict:
+        return {"nodes": self.nodes, "edges": self.edges}
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "UnitGraph":
+        graph = cls()
+        if data:
+            graph.nodes = data.get("nodes", {})
+            graph.edges = data.get("edges", {})
+        return graph
+
+    # ---------------- queries ----------------
+    def slice(self, seeds) -> set[str]:
+        """Transitive closure of outgoing edges from the seed nodes."""
+        seen, stack = set(), [s for s in seeds if s in self.nodes]
+        while stack:
+            rel = stack.pop()
+            if rel in seen:
+                continue
+            seen.add(rel)
+            stack.extend(t for t in self.edges.get(rel, []) if t not in seen)
+        return seen
+
+    def seeds_for_app(self, app: dict) -> set[str]:
+        """Controllers and models an app owns, by model list, class names or app name."""
+        owned_models = set(app.get("models") or [])
+        owned_models |= set(re.findall(r"^class\s+(\w+)\(", app.get("models_code") or "", flags=re.MULTILINE))
+        view_classes = set(re.findall(r"^class\s+(\w+)\(", app.get("views_code") or "", flags=re.MULTILINE))
+        app_name = (app.get("name") or "").lower()
+        seeds = set()
+        for rel, node in self.nodes.items():
+            if node["kind"] == "model" and node["names"] and node["names"][0] in owned_models:
+                seeds.add(rel)
+            elif node["kind"] == "controller":
+                prefix = inflection.camelize(node["controller_path"])
+                resource = node["controller_path"].split("/")[-1].lower()
+                if any(v.startswith(prefix) for v in view_classes) or app_name in (
+                    resource, inflection.singularize(resource)
+                ):
+                    seeds.add(rel)
+        return seeds
+
+    def names(self, rels) -> set[str]:
+        """Identifiers (class names, controller paths, view paths) for matching rails_units."""
+        out = set()
+        for rel in rels:
+            node = self.nodes.get(rel, {})
+            out.add(rel)
+            out.update(node.get("names", []))
+        return {n for n in out if n}
+
+
+_IDENTITY_KEYS = ("name", "class", "class_name", "model", "controller", "file", "path", "view", "template")
+
+
+def _mentions(value, pattern: re.Pattern) -> bool:
+    if isinstance(value, dict):
+        return any(_mentions(v, pattern) for k, v in value.items() if k in _IDENTITY_KEYS)
+    if isinstance(value, str):
+        return pattern.search(value) is not None
+    return False
+
+
+def slice_units(rails_units: dict, graph: UnitGraph, rels: set[str]) -> dict:
+    """Filter each rails_units list down to entries mentioning a unit in the slice."""
+    names = sorted(graph.names(rels), key=len, reverse=True)
+    if not names:
+        return {k: [] if isinstance(v, list) else v for k, v in (rails_units or {}).items()}
+    pattern = re.compile(r"(?<![\w/])(?:" + "|".join(re.escape(n) for n in names) + r")(?![\w])")
+    sliced = {}
+    for key, entries in (rails_units or {}).items():
+        if isinstance(entries, list):
+            sliced[key] = [e for e in entries if _mentions(e, pattern)]
+        else:
+            sliced[key] = entries
+    return sliced
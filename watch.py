@@ -0,0 +1,324 @@
+# watch.py
+"""
+Warm watch mode: WATCH=1 python main.py
+
+After the first full run the process stays up and keeps everything warm:
+the compiled graph, the LLM clients (module-level in the nodes), the final
+state (blueprint, unit graph, route table, schema, hint indexes) and the
+source of every watched Rails file. The Rails tree is polled every
+WATCH_INTERVAL seconds; a file counts as changed only when its mtime/size
+moved AND its content hash differs, so saves without edits and `touch`
+are free.
+
+Each batch of changes goes to the cheapest stage that covers it:
+
+    config/routes.rb               routes recompiled locally
+    db/schema.rb, db/migrate/      models + migrations regenerated locally
+    app/models/**                  ORM / cache / job hints re-indexed locally; without
+                                   db/schema.rb one sliced call per owning app (models)
+    config/application.rb, env     CACHES / queue adapter re-read locally
+    app/views/**/*.erb             one template LLM call per edited template
+    app/controllers/**             one sliced refinement call per owning app (views)
+    app/jobs/**, app/mailers/**    one sliced refinement call per owning app (tasks)
+    anything else (added/removed   full re-run on the already compiled graph
+    units, other watched files)
+
+Local passes (converter_node._apply_local) then run over the blueprint and
+only output files whose content changed are rewritten, so `runserver`
+reloads once per batch.
+"""
+
+import os
+import time
+import hashlib
+from pathlib import Path
+from tools import (
+    file_tools, log_utils, unit_graph, routes_compiler, schema_importer, template_converter, django_builder,
+    orm_hints, cache_hints, job_hints, async_views,
+)
+from nodes import converter_node, discovery_node
+
+WATCH_INTERVAL = float(os.getenv("WATCH_INTERVAL", "1.0"))
+CONFIG_GLOBS = ["config/application.rb", "config/environments/*.rb"]
+_INDEXED = ("app/models/", "app/controllers/", "app/views/", "app/jobs/", "app/mailers/")
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def _rel(input_dir: str, path: str) -> str:
+    return os.path.relpath(path, input_dir).replace(os.sep, "/")
+
+
+class TreeSnapshot:
+    """mtime/size per watched file, confirmed by a content hash before reporting a change."""
+
+    def __init__(self, input_dir: str, globs: list[str]):
+        self.input_dir = input_dir
+        self.globs = globs
+        self.stats = {}
+        self.hashes = {}
+        self.sources = {}   # app/ units, for re-indexing without touching disk again
+        self.poll()
+
+    def _read(self, rel: str, path: str) -> bytes | None:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if rel.startswith(_INDEXED):
+            self.sources[rel] = data.decode("utf-8", errors="replace")
+        return data
+
+    def poll(self) -> dict:
+        """{"added": [...], "modified": [...], "deleted": [...]} since the previous poll."""
+        changes = {"added": [], "modified": [], "deleted": []}
+        seen = set()
+        for path in file_tools.list_tree(self.input_dir, self.globs)["files"]:
+            rel = _rel(self.input_dir, path)
+            seen.add(rel)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stat = (st.st_mtime_ns, st.st_size)
+            if self.stats.get(rel) == stat:
+                continue
+            self.stats[rel] = stat
+            data = self._read(rel, path)
+            if data is None:
+                continue
+            digest = _digest(data)
+            if rel not in self.hashes:
+                changes["added"].append(rel)
+            elif self.hashes[rel] != digest:
+                changes["modified"].append(rel)
+            self.hashes[rel] = digest
+        for rel in set(self.hashes) - seen:
+            changes["deleted"].append(rel)
+            self.hashes.pop(rel)
+            self.stats.pop(rel, None)
+            self.sources.pop(rel, None)
+        return changes
+
+
+def classify(rel: str, kind: str) -> str:
+    """Cheapest stage that covers a change to `rel` ("added" / "modified" / "deleted")."""
+    if rel == "config/routes.rb":
+        return "routes"
+    if rel == "db/schema.rb" or rel.startswith("db/migrate/"):
+        return "schema"
+    if rel.startswith("config/"):
+        return "config"
+    if rel.startswith("app/views/") and rel.endswith(".erb") and kind != "deleted":
+        return "template"
+    if kind != "modified":
+        return "full"
+    if rel.startswith("app/models/"):
+        return "models"
+    if rel.startswith("app/controllers/"):
+        return "controller"
+    if rel.startswith(("app/jobs/", "app/mailers/")):
+        return "jobs"
+    return "full"
+
+
+class Watcher:
+    """Keeps the final state of a run warm and applies incremental changes to it."""
+
+    def __init__(self, state: dict, run_full):
+        self.state = state
+        self.run_full = run_full
+        self.input_dir = state["input_dir"]
+        globs = ((state.get("plan") or {}).get("discovery") or {}).get("select_globs") or []
+        self.snapshot = TreeSnapshot(self.input_dir, globs + CONFIG_GLOBS if globs else [])
+
+    # ---------------- local re-indexing ----------------
+    def _reindex(self):
+        """Rebuild the unit graph and hint indexes from in-memory sources (no LLM)."""
+        graph, orm = unit_graph.UnitGraph(self.input_dir), orm_hints.OrmIndex()
+        caching, jobs, io_actions = cache_hints.CacheIndex(), job_hints.JobIndex(), async_views.AsyncIndex()
+        for rel, content in self.snapshot.sources.items():
+            path = os.path.join(self.input_dir, rel)
+            for index in (graph, orm, caching, jobs, io_actions):
+                index.add_file(path, content)
+        graph.finalize()
+        self.state.update({
+            "unit_graph": graph.to_dict(),
+            "orm_hints": orm.summary(),
+            "cache_hints": caching.summary(),
+            "job_hints": jobs.summary(),
+            "async_hints": io_actions.summary(),
+            "cache_store": cache_hints.import_cache_store(self.input_dir),
+            "queue_adapter": job_hints.import_queue_adapter(self.input_dir),
+        })
+        return graph
+
+    def _plans(self) -> tuple[dict, dict, dict, dict]:
+        s = self.state
+        orm_plan = orm_hints.plan(s.get("orm_hints") or {}, s.get("rails_schema") or {})
+        cache_plan = cache_hints.plan(s.get("cache_hints") or {}, s.get("cache_store") or {}, orm_plan["schema"])
+        job_plan = job_hints.plan(s.get("job_hints") or {}, s.get("queue_adapter"))
+        async_plan = async_views.plan(s.get("async_hints") or {}, s.get("route_table") or {}, async_views.mode())
+        return orm_plan, cache_plan, job_plan, async_plan
+
+    # ---------------- LLM steps ----------------
+    def _owning_apps(self, graph, rels: set[str]) -> list[int]:
+        """Apps seeded by one of `rels` (controllers / models), or defining a task converted from it."""
+        apps = self.state["django_blueprint"].get("apps", [])
+        hints = self.state.get("job_hints") or {}
+        tasks = {
+            job_hints.task_name(job) for job, info in hints.get("jobs", {}).items()
+            if _rel(self.input_dir, info["file"]) in rels
+        }
+        for mailer, info in hints.get("mailers", {}).items():
+            if _rel(self.input_dir, info["file"]) in rels:
+                tasks.update(job_hints.task_name(mailer, method) for method in info["methods"])
+        return [
+            i for i, app in enumerate(apps)
+            if graph.seeds_for_app(app) & rels
+            or any(f"def {fn}(" in (app.get("tasks_code") or "") for fn in tasks)
+        ]
+
+    def _refine_apps(self, graph, rels: set[str], field: str) -> int:
+        """Re-write `field` of every app owning one of `rels`, one sliced LLM call per app."""
+        blueprint = self.state["django_blueprint"]
+        required = routes_compiler.required_views(self.state.get("route_table") or {})
+        calls = 0
+        for i in self._owning_apps(graph, rels):
+            app = blueprint["apps"][i]
+            seeds = graph.seeds_for_app(app)
+            units_slice = unit_graph.slice_units(self.state.get("rails_units") or {}, graph, graph.slice(seeds))
+            units_slice["changed_sources"] = {rel: self.snapshot.sources.get(rel, "") for rel in sorted(rels)}
+            controllers = {graph.nodes[r].get("controller_path") for r in seeds}
+            units_slice["required_views"] = {c: v for c, v in required.items() if c in controllers}
+            refined = converter_node._refine_app_with_llm({**app, field: ""}, blueprint.get("project_name"), units_slice)
+            calls += 1
+            if refined and refined.get(field):
+                blueprint["apps"][i] = {**app, field: refined[field]}
+            else:
+                print(f"⚠️ Watch: kept the previous {field} of app {app.get('name')}")
+        return calls
+
+    def _template_target(self, graph, rel: str) -> tuple[dict | None, dict | None, str]:
+        """(app, blueprint template entry, Django template name) for a Rails view."""
+        target = rel[len("app/views/"):].removesuffix(".erb")
+        target = target if target.endswith(".html") else os.path.splitext(target)[0] + ".html"
+        apps = self.state["django_blueprint"].get("apps", [])
+        for exact in (True, False):
+            for app in apps:
+                for tpl in app.get("templates", []):
+                    name = template_converter.convert_filename(tpl.get("name", ""))
+                    if name == target if exact else (name.endswith("/" + target) or target.endswith("/" + name)):
+                        return app, tpl, name
+        view_dir = os.path.dirname(target)
+        for app in apps:
+            seeds = graph.seeds_for_app(app)
+            if any(graph.nodes[s].get("controller_path") == view_dir for s in seeds):
+                return app, None, target
+        return None, None, target
+
+    def _convert_templates(self, graph, rels: list[str], project_root: Path) -> tuple[int, list[str]]:
+        calls, written = 0, []
+        for rel in rels:
+            app, tpl, name = self._template_target(graph, rel)
+            if app is None:
+                print(f"⚠️ Watch: no app owns {rel}; run a full conversion to place it")
+                continue
+            converted = template_converter.convert_template_with_llm(self.snapshot.sources.get(rel, ""), name)
+            calls += 1
+            if tpl is None:
+                app.setdefault("templates", []).append({"name": name, "content": converted})
+            else:
+                tpl.update({"name": name, "content": converted})
+            path = project_root / app.get("name", "app") / "templates" / name
+            if _write_if_changed(path, converted):
+                written.append(str(path))
+        return calls, written
+
+    # ---------------- batches ----------------
+    def apply(self, changes: dict) -> dict:
+        """Route one batch of changes; returns a report row for the event log."""
+        started = time.perf_counter()
+        stages = {}
+        for kind, rels in changes.items():
+            for rel in rels:
+                stages.setdefault(classify(rel, kind), []).append(rel)
+        report = {"changes": {k: v for k, v in changes.items() if v}, "stages": sorted(stages), "llm_calls": 0}
+
+        if "full" in stages:
+            print(f"🔁 Watch: {', '.join(stages['full'])} changed — re-running the full graph")
+            self.state = dict(self.run_full())
+            report.update({"written": "full", "elapsed_s": round(time.perf_counter() - started, 3)})
+            return report
+
+        graph = self._reindex()
+        if "routes" in stages:
+            self.state["route_table"] = discovery_node._compile_routes(self.input_dir)
+        if "schema" in stages:
+            self.state["rails_schema"] = schema_importer.import_schema(self.input_dir)
+
+        project_root = Path(self.state["project_root"])
+        written = []
+        if "models" in stages and not (self.state.get("rails_schema") or {}).get("tables"):
+            # No schema to regenerate models from: models_code is LLM-written
+            report["llm_calls"] += self._refine_apps(graph, set(stages["models"]), "models_code")
+        if "controller" in stages:
+            report["llm_calls"] += self._refine_apps(graph, set(stages["controller"]), "views_code")
+        if "jobs" in stages:
+            report["llm_calls"] += self._refine_apps(graph, set(stages["jobs"]), "tasks_code")
+        if "template" in stages:
+            calls, paths = self._convert_templates(graph, stages["template"], project_root)
+            report["llm_calls"] += calls
+            written += paths
+
+        blueprint = self.state["django_blueprint"]
+        converter_node._apply_local(
+            blueprint, self.state.get("route_table") or {}, self.state.get("controller_clusters") or {}, *self._plans()
+        )
+        written += _sync_project(project_root, blueprint)
+        report.update({"written": written, "elapsed_s": round(time.perf_counter() - started, 3)})
+        return report
+
+    def loop(self, interval: float = WATCH_INTERVAL):
+        print(f"👀 Watching {self.input_dir} ({len(self.snapshot.hashes)} files, every {interval}s) — Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(interval)
+                changes = self.snapshot.poll()
+                if not any(changes.values()):
+                    continue
+                report = self.apply(changes)
+                log_utils.log_event("watch", "batch", **report)
+                files = report["written"] if isinstance(report["written"], str) else f"{len(report['written'])} files"
+                print(
+                    f"⚡ Watch: {', '.join(report['stages'])} → {files} rewritten, "
+                    f"{report['llm_calls']} LLM calls in {report['elapsed_s']}s"
+                )
+        except KeyboardInterrupt:
+            print("👋 Watch stopped")
+
+
+def _write_if_changed(path: Path, content: str) -> bool:
+    try:
+        if path.read_text(encoding="utf-8") == content:
+            return False
+    except OSError:
+        pass
+    file_tools.write_file(str(path), content)
+    return True
+
+
+def _sync_project(project_root: Path, blueprint: dict) -> list[str]:
+    """Rewrite project and app Python files whose content changed; templates are written by their own step."""
+    written = []
+    targets = [(project_root / name, content) for name, content in django_builder.core_files(blueprint).items()]
+    for app in blueprint.get("apps", []):
+        app_dir = project_root / app.get("name", "app")
+        targets += [(app_dir / name, content) for name, content in django_builder.app_files(app).items()]
+    for path, content in targets:
+        if _write_if_changed(path, content):
+            written.append(str(path))
+    return written